@@ -0,0 +1,161 @@
+"""Measures the read throughput of one shared Topology per number of reader threads.
+
+Usage:
+    python -m benchmarks.concurrent_reads --stations 100 --threads 1 2 4 8 --output reads.json
+
+Every reader thread runs the same mix of traversals (Node.get_possible_followers), Signal
+queries, along-track distance lookups and reachability queries under the read lock (see
+yaramo.concurrency). With --writers, as many threads concurrently modify Signals under the
+write lock, as a stress test of the reader/writer discipline; any exception of a thread fails
+the run. On CPython with the GIL, the throughput cannot scale with the threads, on free-threaded
+CPython it should scale with the cores.
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+
+from benchmarks.generator import generate_topology
+from benchmarks.run import write_results
+from yaramo.model import SignalFunction, Topology
+
+# Operations per acquisition of the read lock
+OPERATIONS_PER_LOCK = 50
+
+
+def _reader(topology: Topology, operations: int, seed: int):
+    """Returns a callable that runs operations mixed read operations."""
+
+    generator = random.Random(seed)
+    nodes = list(topology.nodes.values())
+    signals = list(topology.signals.values())
+
+    def traverse():
+        node = generator.choice(nodes)
+        source = None
+        for _ in range(20):
+            followers = node.get_possible_followers(source)
+            if not followers:
+                break
+            source, node = node, generator.choice(followers)
+
+    def query():
+        topology.query_signals().function(SignalFunction.Einfahr_Signal).uuids()
+
+    def distance():
+        topology.signal_distances.next_signals(generator.choice(signals))
+
+    def reachable():
+        topology.connectivity.signal_reachable(generator.choice(signals), generator.choice(signals))
+
+    mix = [traverse, query, distance, reachable]
+
+    def run():
+        done = 0
+        while done < operations:
+            with topology.lock.read():
+                for _ in range(min(OPERATIONS_PER_LOCK, operations - done)):
+                    generator.choice(mix)()
+                    done += 1
+
+    return run
+
+
+def _writer(topology: Topology, stop: threading.Event, seed: int):
+    generator = random.Random(seed)
+    signals = list(topology.signals.values())
+
+    def run():
+        while not stop.is_set():
+            signal = generator.choice(signals)
+            with topology.lock.write():
+                signal.distance_edge = signal.distance_edge
+                topology.update_signal(signal)
+            time.sleep(0.001)
+
+    return run
+
+
+def measure(topology: Topology, threads: int, operations: int, writers: int) -> dict:
+    errors = []
+
+    def guarded(function):
+        def run():
+            try:
+                function()
+            except BaseException as error:  # reported after the run
+                errors.append(repr(error))
+
+        return run
+
+    stop = threading.Event()
+    writer_threads = [
+        threading.Thread(target=guarded(_writer(topology, stop, seed=1000 + index)))
+        for index in range(writers)
+    ]
+    reader_threads = [
+        threading.Thread(target=guarded(_reader(topology, operations, seed=index)))
+        for index in range(threads)
+    ]
+    for thread in writer_threads:
+        thread.start()
+    start = time.perf_counter()
+    for thread in reader_threads:
+        thread.start()
+    for thread in reader_threads:
+        thread.join()
+    duration = time.perf_counter() - start
+    stop.set()
+    for thread in writer_threads:
+        thread.join()
+    if errors:
+        raise RuntimeError(f"{len(errors)} threads failed, the first with {errors[0]}")
+    return {
+        "threads": threads,
+        "writers": writers,
+        "operations": threads * operations,
+        "duration": duration,
+        "throughput": threads * operations / duration,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, default=100)
+    parser.add_argument("--geo-nodes-per-line", type=int, default=10)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--operations", type=int, default=20000, help="per reader thread")
+    parser.add_argument("--writers", type=int, default=0)
+    parser.add_argument("--output", default="concurrent_reads.json")
+    args = parser.parse_args(argv)
+
+    topology = generate_topology(stations=args.stations, geo_nodes_per_line=args.geo_nodes_per_line)
+    topology.prepare_concurrent_reads()
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"GIL {'enabled' if gil else 'disabled'}")
+
+    results = {}
+    baseline = None
+    for threads in args.threads:
+        result = measure(topology, threads, args.operations, args.writers)
+        baseline = baseline or result["throughput"]
+        result["scaling"] = result["throughput"] / baseline
+        results[str(threads)] = result
+        print(
+            f"{threads:3} threads {result['throughput']:12.0f} operations/s"
+            f"  ({result['scaling']:.2f}x)"
+        )
+    parameters = {
+        "stations": args.stations,
+        "geo_nodes_per_line": args.geo_nodes_per_line,
+        "operations": args.operations,
+        "writers": args.writers,
+        "gil": gil,
+    }
+    write_results(args.output, parameters, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Measures garbage collector pauses and teardown times of large topologies per ownership layout.
+
+Usage:
+    python -m benchmarks.gc_pause --stations 1000 --output gc_results.json
+
+Every layout is measured in a fresh interpreter. "cyclic" is the default object graph,
+"weak" stores back-references weakly (see yaramo.ownership) and "weak_frozen" additionally
+moves the loaded Topology out of the collected generations with gc.freeze(); without cycles,
+it is still freed by reference counting. For each layout the results contain the duration of
+full collections while the Topology is alive, the time to drop the Topology (del) and the time
+of the collection that frees what del left behind.
+"""
+
+import argparse
+import gc
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.run import write_results
+
+LAYOUTS = ("cyclic", "weak", "weak_frozen")
+
+
+def measure_layout(layout: str, stations: int, geo_nodes_per_line: int, repeat: int) -> dict:
+    from benchmarks.generator import generate_topology
+    from yaramo import ownership
+
+    if layout != "cyclic":
+        ownership.enable()
+    topology = generate_topology(stations=stations, geo_nodes_per_line=geo_nodes_per_line)
+    gc.collect()
+    if layout == "weak_frozen":
+        gc.freeze()
+
+    pauses = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        gc.collect()
+        pauses.append(time.perf_counter() - start)
+    tracked_objects = len(gc.get_objects())
+
+    start = time.perf_counter()
+    del topology
+    drop = time.perf_counter() - start
+    start = time.perf_counter()
+    unreachable = gc.collect()
+    collection = time.perf_counter() - start
+
+    return {
+        "tracked_objects": tracked_objects,
+        "full_collection": pauses,
+        "full_collection_median": statistics.median(pauses),
+        "drop": drop,
+        "teardown_collection": collection,
+        "teardown": drop + collection,
+        "unreachable_objects": unreachable,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, default=1000)
+    parser.add_argument("--geo-nodes-per-line", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--layout", choices=LAYOUTS, help="measure one layout in this process")
+    parser.add_argument("--output", default="gc_results.json")
+    args = parser.parse_args(argv)
+
+    if args.layout:
+        result = measure_layout(args.layout, args.stations, args.geo_nodes_per_line, args.repeat)
+        print(json.dumps(result))
+        return
+
+    results = {}
+    for layout in LAYOUTS:
+        output = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.gc_pause",
+                "--layout",
+                layout,
+                "--stations",
+                str(args.stations),
+                "--geo-nodes-per-line",
+                str(args.geo_nodes_per_line),
+                "--repeat",
+                str(args.repeat),
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        results[layout] = json.loads(output)
+        print(
+            f"{layout:12} full collection {results[layout]['full_collection_median'] * 1000:8.1f}ms"
+            f"  teardown {results[layout]['teardown'] * 1000:8.1f}ms"
+            f"  unreachable {results[layout]['unreachable_objects']}"
+        )
+    parameters = {
+        "stations": args.stations,
+        "geo_nodes_per_line": args.geo_nodes_per_line,
+        "repeat": args.repeat,
+    }
+    write_results(args.output, parameters, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""Seeded generator for synthetic, realistic looking yaramo topologies.
+
+The generated network is a single line running from west to east between two buffer stops.
+Every station consists of an entry and an exit turnout connected by a main track and a siding.
+Stations are connected by long line edges with many intermediate geo nodes and block signals.
+There are entry, exit and block signals for both directions and routes between all consecutive
+main signals. All edges point from west to east, so SignalDirection.IN means eastbound.
+"""
+
+import math
+import random
+import uuid
+
+from yaramo.model import (
+    Edge,
+    Node,
+    Route,
+    Signal,
+    SignalDirection,
+    SignalFunction,
+    SignalKind,
+    SignalState,
+    SignalSystem,
+    Topology,
+    Wgs84GeoNode,
+)
+from yaramo.vacancy_section import VacancySection
+
+# Distances in degrees of the Wgs84 coordinates (x is the latitude, y the longitude)
+ORIGIN = (52.0, 13.0)
+STATION_LENGTH = 0.01
+SIDING_OFFSET = 0.001
+LINE_LENGTH = 0.1
+LINE_JITTER = 0.0001
+
+SIDING_SPEED = 60
+
+
+class TopologyGenerator(object):
+    """Generates a Topology from a seed, so that the same parameters always yield the same model.
+
+    The size of the model grows linearly with the number of stations. Every station adds
+    3 Nodes, 3 Edges and 6 Signals. Every line between (or in front of) the stations adds
+    one Edge with geo_nodes_per_line intermediate GeoNodes and 2 * block_signals_per_line
+    Signals. There is a Route between every pair of consecutive main signals.
+    """
+
+    def __init__(
+        self,
+        stations: int = 10,
+        geo_nodes_per_line: int = 100,
+        block_signals_per_line: int = 2,
+        seed: int = 0,
+        compute_lengths: bool = True,
+    ):
+        self.stations = stations
+        self.geo_nodes_per_line = geo_nodes_per_line
+        self.block_signals_per_line = block_signals_per_line
+        self.compute_lengths = compute_lengths
+        self.random = random.Random(seed)
+        self.topology = None
+
+    def generate(self) -> Topology:
+        self.topology = Topology(uuid=self._uuid(), name="synthetic")
+        self.topology.created_with = "benchmarks.generator"
+
+        x, y = ORIGIN
+        west_node = self._add_node(x, y)
+        stations = []
+        for _ in range(self.stations):
+            y += LINE_LENGTH
+            entry_node = self._add_node(x, y)
+            siding_node = self._add_node(x + SIDING_OFFSET, y + STATION_LENGTH / 2)
+            y += STATION_LENGTH
+            exit_node = self._add_node(x, y)
+            stations.append((entry_node, siding_node, exit_node))
+        east_node = self._add_node(x, y + LINE_LENGTH)
+
+        line_ends = [west_node] + [
+            node for station in stations for node in (station[0], station[2])
+        ]
+        line_ends.append(east_node)
+        lines = [
+            self._add_line(line_ends[index], line_ends[index + 1])
+            for index in range(0, len(line_ends), 2)
+        ]
+
+        # eastbound and westbound signals on the lines, ordered in their driving direction
+        eastbound = [self._add_block_signals(line, SignalDirection.IN) for line in lines]
+        westbound = [self._add_block_signals(line, SignalDirection.GEGEN) for line in lines]
+
+        for index, (entry_node, siding_node, exit_node) in enumerate(stations):
+            west_line, east_line = lines[index], lines[index + 1]
+            main_track = self._add_edge(entry_node, exit_node)
+            siding_a = self._add_edge(entry_node, siding_node)
+            siding_b = self._add_edge(siding_node, exit_node)
+            self._set_turnout_speeds(entry_node, siding_node)
+            self._set_turnout_speeds(exit_node, siding_node)
+
+            entry_function = SignalFunction.Einfahr_Signal
+            exit_function = SignalFunction.Ausfahr_Signal
+            entry_in = self._add_signal(west_line, 0.95, SignalDirection.IN, entry_function)
+            entry_gegen = self._add_signal(east_line, 0.05, SignalDirection.GEGEN, entry_function)
+            exits_in = [
+                self._add_signal(main_track, 0.9, SignalDirection.IN, exit_function),
+                self._add_signal(siding_b, 0.9, SignalDirection.IN, exit_function),
+            ]
+            exits_gegen = [
+                self._add_signal(main_track, 0.1, SignalDirection.GEGEN, exit_function),
+                self._add_signal(siding_a, 0.1, SignalDirection.GEGEN, exit_function),
+            ]
+
+            self._add_route(entry_in, exits_in[0], [west_line, main_track])
+            self._add_route(entry_in, exits_in[1], [west_line, siding_a, siding_b])
+            self._add_route(entry_gegen, exits_gegen[0], [east_line, main_track])
+            self._add_route(entry_gegen, exits_gegen[1], [east_line, siding_b, siding_a])
+
+            eastbound[index].append(entry_in)
+            eastbound[index + 1].insert(0, exits_in)
+            westbound[index].insert(0, exits_gegen)
+            westbound[index + 1].append(entry_gegen)
+
+        for chain in eastbound + westbound:
+            self._add_routes_along(chain)
+        return self.topology
+
+    def _uuid(self) -> str:
+        return str(uuid.UUID(int=self.random.getrandbits(128), version=4))
+
+    def _add_node(self, x: float, y: float) -> Node:
+        node = Node(uuid=self._uuid(), geo_node=Wgs84GeoNode(x, y, uuid=self._uuid()))
+        node.geo_node.geo_point.uuid = self._uuid()
+        self.topology.add_node(node)
+        return node
+
+    def _add_edge(self, node_a: Node, node_b: Node, intermediate_geo_nodes=None) -> Edge:
+        vacancy_section = VacancySection(uuid=self._uuid())
+        self.topology.add_vacancy_section(vacancy_section)
+        edge = Edge(
+            node_a,
+            node_b,
+            vacancy_section=vacancy_section,
+            intermediate_geo_nodes=intermediate_geo_nodes,
+            maximum_speed=self.random.choice([80, 100, 120, 160]),
+            uuid=self._uuid(),
+        )
+        node_a.connected_nodes.append(node_b)
+        node_b.connected_nodes.append(node_a)
+        if self.compute_lengths:
+            edge.update_length()
+        self.topology.add_edge(edge)
+        return edge
+
+    def _add_line(self, node_a: Node, node_b: Node) -> Edge:
+        start = node_a.geo_node.geo_point
+        end = node_b.geo_node.geo_point
+        geo_nodes = []
+        for index in range(1, self.geo_nodes_per_line + 1):
+            fraction = index / (self.geo_nodes_per_line + 1)
+            geo_node = Wgs84GeoNode(
+                start.x + math.sin(fraction * math.pi) * LINE_JITTER * 20,
+                start.y + (end.y - start.y) * fraction + self.random.uniform(0, LINE_JITTER),
+                uuid=self._uuid(),
+            )
+            geo_node.geo_point.uuid = self._uuid()
+            geo_nodes.append(geo_node)
+        geo_nodes.sort(key=lambda geo_node: geo_node.geo_point.y)
+        return self._add_edge(node_a, node_b, geo_nodes)
+
+    def _set_turnout_speeds(self, turnout: Node, siding_node: Node):
+        turnout.calc_anschluss_of_all_nodes()
+        if turnout.connected_on_left is siding_node:
+            turnout.maximum_speed_on_left = SIDING_SPEED
+            turnout.turnout_side = "left"
+        else:
+            turnout.maximum_speed_on_right = SIDING_SPEED
+            turnout.turnout_side = "right"
+
+    def _add_signal(
+        self,
+        edge: Edge,
+        fraction: float,
+        direction: SignalDirection,
+        function: SignalFunction,
+    ) -> Signal:
+        kind = (
+            SignalKind.Mehrabschnittssignal
+            if function == SignalFunction.Block_Signal
+            else SignalKind.Hauptsignal
+        )
+        signal = Signal(
+            edge,
+            (edge.length or 1.0) * fraction,
+            direction,
+            function,
+            kind,
+            system=SignalSystem.Ks,
+            supported_states={SignalState.HP0, SignalState.KS1, SignalState.KS2},
+            uuid=self._uuid(),
+        )
+        signal.control_member_uuid = self._uuid()
+        edge.signals.append(signal)
+        self.topology.add_signal(signal)
+        return signal
+
+    def _add_block_signals(self, line: Edge, direction: SignalDirection) -> list:
+        fractions = [
+            (index + 1) / (self.block_signals_per_line + 1)
+            for index in range(self.block_signals_per_line)
+        ]
+        if direction == SignalDirection.GEGEN:
+            fractions.reverse()
+        return [
+            self._add_signal(line, fraction, direction, SignalFunction.Block_Signal)
+            for fraction in fractions
+        ]
+
+    def _add_route(self, start_signal: Signal, end_signal: Signal, edges: list[Edge]):
+        route = Route(start_signal, uuid=self._uuid())
+        for edge in edges:
+            route.edges.add(edge)
+            route.vacancy_sections.add(edge.vacancy_section)
+        route.end_signal = end_signal
+        self.topology.add_route(route)
+
+    def _add_routes_along(self, chain: list):
+        """Adds routes between consecutive signals of a chain in driving direction.
+
+        An element of the chain can also be a list of alternative signals (e.g. the exit
+        signals of a station), which all get a route to the next signal.
+        """
+
+        for start, end in zip(chain, chain[1:]):
+            for start_signal in start if isinstance(start, list) else [start]:
+                if isinstance(end, list):
+                    continue
+                self._add_route(start_signal, end, [start_signal.edge, end.edge])
+
+
+def generate_topology(
+    stations: int = 10,
+    geo_nodes_per_line: int = 100,
+    block_signals_per_line: int = 2,
+    seed: int = 0,
+    compute_lengths: bool = True,
+) -> Topology:
+    """Returns a synthetic Topology, see TopologyGenerator for the parameters."""
+
+    return TopologyGenerator(
+        stations=stations,
+        geo_nodes_per_line=geo_nodes_per_line,
+        block_signals_per_line=block_signals_per_line,
+        seed=seed,
+        compute_lengths=compute_lengths,
+    ).generate()
@@ -0,0 +1,81 @@
+"""Measures the cold start time of typical yaramo workloads in fresh interpreters.
+
+Usage:
+    python -m benchmarks.import_time --output import_results.json
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+from benchmarks.run import write_results
+
+SCENARIOS = {
+    "python": "pass",
+    "import yaramo.model": "import yaramo.model",
+    "import Topology": "from yaramo.model import Topology",
+    "read json and traverse": (
+        "from yaramo.model import Topology\n"
+        "topology = Topology.from_json(JSON)\n"
+        "for node in topology.nodes.values():\n"
+        "    node.get_possible_followers(None)\n"
+    ),
+    "convert coordinates": (
+        "from yaramo.model import Wgs84GeoNode\n" "Wgs84GeoNode(52.39, 13.12).to_dbref()\n"
+    ),
+}
+
+_TEMPLATE = """
+import sys, time
+start = time.perf_counter()
+JSON = {json!r}
+{code}
+print(time.perf_counter() - start, "pyproj" in sys.modules, len(sys.modules))
+"""
+
+
+def _small_topology_json() -> str:
+    from benchmarks.generator import generate_topology
+
+    return generate_topology(stations=2, geo_nodes_per_line=10).to_json()
+
+
+def measure_scenario(code: str, repeat: int, json_str: str = "") -> dict:
+    source = _TEMPLATE.format(json=json_str, code=code)
+    timings, imports_pyproj, modules = [], False, 0
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", source], capture_output=True, text=True, check=True
+        ).stdout.split()
+        timings.append(float(output[0]))
+        imports_pyproj = output[1] == "True"
+        modules = int(output[2])
+    return {
+        "timings": timings,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "imports_pyproj": imports_pyproj,
+        "loaded_modules": modules,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", default="import_results.json")
+    args = parser.parse_args(argv)
+
+    json_str = _small_topology_json()
+    results = {}
+    for name, code in SCENARIOS.items():
+        results[name] = measure_scenario(code, args.repeat, json_str)
+        print(
+            f"{name:24} {results[name]['median'] * 1000:8.1f}ms "
+            f"pyproj: {results[name]['imports_pyproj']}"
+        )
+    write_results(args.output, {"repeat": args.repeat}, results)
+
+
+if __name__ == "__main__":
+    main()
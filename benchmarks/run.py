@@ -0,0 +1,220 @@
+"""Timing and memory benchmarks of the main yaramo operations on synthetic topologies.
+
+Usage:
+    python -m benchmarks.run --stations 1000 --output results.json
+    python -m benchmarks.run --stations 1000 --compare results.json
+
+The results file contains the environment, the generator parameters and for every benchmark
+the timings of all repetitions and the peak memory allocated during one run.
+"""
+
+import argparse
+import gc
+import importlib.metadata
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+from benchmarks.generator import generate_topology
+from yaramo.model import Topology
+
+BENCHMARKS: dict[str, Callable] = {}
+
+
+def benchmark(name: str):
+    """Registers a benchmark.
+
+    The decorated function receives the generated Topology and returns
+    the callable that is measured.
+    """
+
+    def decorator(setup: Callable):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return decorator
+
+
+@benchmark("to_serializable")
+def _to_serializable(topology: Topology):
+    return topology.to_serializable
+
+
+@benchmark("to_json")
+def _to_json(topology: Topology):
+    return topology.to_json
+
+
+@benchmark("from_json")
+def _from_json(topology: Topology):
+    json_str = topology.to_json()
+    return lambda: Topology.from_json(json_str)
+
+
+@benchmark("get_edge_by_nodes")
+def _get_edge_by_nodes(topology: Topology):
+    edges = random.Random(0).sample(list(topology.edges.values()), min(100, len(topology.edges)))
+
+    def run():
+        for edge in edges:
+            topology.get_edge_by_nodes(edge.node_b, edge.node_a)
+
+    return run
+
+
+@benchmark("route_get_edges_in_order")
+def _get_edges_in_order(topology: Topology):
+    def run():
+        for route in topology.routes.values():
+            route.get_edges_in_order()
+
+    return run
+
+
+@benchmark("calc_anschluss_of_all_nodes")
+def _calc_anschluss(topology: Topology):
+    turnouts = [node for node in topology.nodes.values() if len(node.connected_nodes) == 3]
+
+    def run():
+        for node in turnouts:
+            node.calc_anschluss_of_all_nodes()
+
+    return run
+
+
+@benchmark("topology_builder")
+def _topology_builder(topology: Topology):
+    from yaramo.builder import TopologyBuilder
+
+    def coordinates(geo_node):
+        return geo_node.geo_point.x, geo_node.geo_point.y
+
+    index = {uuid: i for i, uuid in enumerate(topology.nodes)}
+    nodes = [coordinates(node.geo_node) for node in topology.nodes.values()]
+    edges = list(topology.edges.values())
+    endpoints = [(index[edge.node_a.uuid], index[edge.node_b.uuid]) for edge in edges]
+    intermediate = [[coordinates(geo) for geo in edge.intermediate_geo_nodes] for edge in edges]
+    edge_index = {edge.uuid: i for i, edge in enumerate(edges)}
+    signals = [
+        (edge_index[signal.edge.uuid], signal.distance_edge, signal.direction)
+        for signal in topology.signals.values()
+    ]
+
+    def run():
+        builder = TopologyBuilder()
+        builder.add_nodes(nodes)
+        builder.add_edges(endpoints, intermediate_coordinates=intermediate)
+        builder.add_signals(signals)
+        builder.build()
+
+    return run
+
+
+def measure(func: Callable, repeat: int) -> dict:
+    """Returns the wall times of repeat runs of func and the peak memory of one extra run."""
+
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "timings": timings,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "peak_memory_bytes": peak_memory,
+    }
+
+
+def environment() -> dict:
+    try:
+        version = importlib.metadata.version("yaramo")
+    except importlib.metadata.PackageNotFoundError:
+        version = None
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "yaramo_version": version,
+        "git_commit": commit,
+        "python": sys.version,
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+    }
+
+
+def write_results(path: str, parameters: dict, results: dict):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(
+            {"environment": environment(), "parameters": parameters, "results": results},
+            file,
+            indent=2,
+        )
+
+
+def compare(path: str, results: dict):
+    """Prints the change of the median timings compared to an earlier results file."""
+
+    with open(path, encoding="utf-8") as file:
+        baseline = json.load(file)["results"]
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]["median"], result["median"]
+        print(f"{name:32} {before:10.4f}s -> {after:10.4f}s ({after / before:.2f}x)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, default=100)
+    parser.add_argument("--geo-nodes-per-line", type=int, default=100)
+    parser.add_argument("--block-signals-per-line", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="*", choices=sorted(BENCHMARKS), default=None)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", default=None, help="an earlier results file")
+    args = parser.parse_args(argv)
+
+    parameters = {
+        "stations": args.stations,
+        "geo_nodes_per_line": args.geo_nodes_per_line,
+        "block_signals_per_line": args.block_signals_per_line,
+        "seed": args.seed,
+        "repeat": args.repeat,
+    }
+    generator_parameters = {key: value for key, value in parameters.items() if key != "repeat"}
+    results = {"generate_topology": measure(lambda: generate_topology(**generator_parameters), 1)}
+    topology = generate_topology(**generator_parameters)
+    for name in args.only or BENCHMARKS:
+        results[name] = measure(BENCHMARKS[name](topology), args.repeat)
+        print(
+            f"{name:32} {results[name]['median']:10.4f}s {results[name]['peak_memory_bytes']:>14}B"
+        )
+
+    write_results(args.output, parameters, results)
+    if args.compare:
+        compare(args.compare, results)
+
+
+if __name__ == "__main__":
+    main()
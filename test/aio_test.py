@@ -0,0 +1,74 @@
+import asyncio
+import os
+import stat
+
+from benchmarks.generator import generate_topology
+from yaramo.model import Topology
+
+
+class _MemoryStream(object):
+    def __init__(self):
+        self.chunks = []
+
+    async def write(self, chunk: bytes):
+        self.chunks.append(chunk)
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+def test_async_save_and_load(tmp_path):
+    topology = generate_topology(stations=2, geo_nodes_per_line=5)
+    path = tmp_path / "topology.json"
+
+    async def run():
+        await topology.asave(path)
+        return await Topology.aload(path)
+
+    loaded = asyncio.run(run())
+    assert list(loaded.nodes) == list(topology.nodes)
+    assert list(loaded.signals) == list(topology.signals)
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_async_streaming():
+    topology = generate_topology(stations=2, geo_nodes_per_line=500)
+    stream = _MemoryStream()
+
+    async def run():
+        async def serve(reader, writer):
+            await topology.asave_stream(writer)
+            writer.close()
+
+        server = await asyncio.start_server(serve, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            received = await Topology.aload_stream(reader)
+            writer.close()
+
+        await topology.asave_stream(stream)
+        return received, await Topology.aload_stream(stream)
+
+    received, from_chunks = asyncio.run(run())
+    assert len(stream.chunks) > 1
+    assert list(received.edges) == list(topology.edges)
+    assert list(from_chunks.edges) == list(topology.edges)
+
+
+def test_async_save_keeps_file_modes(tmp_path):
+    topology = generate_topology(stations=1, geo_nodes_per_line=2)
+    new_path, existing_path = tmp_path / "new.json", tmp_path / "existing.json"
+    existing_path.write_text("{}")
+    os.chmod(existing_path, 0o640)
+
+    async def run():
+        await topology.asave(new_path)
+        await topology.asave(existing_path)
+
+    asyncio.run(run())
+    umask = os.umask(0)
+    os.umask(umask)
+    assert stat.S_IMODE(new_path.stat().st_mode) == 0o666 & ~umask
+    assert stat.S_IMODE(existing_path.stat().st_mode) == 0o640
@@ -0,0 +1,89 @@
+import pytest
+
+from yaramo.model import DbrefGeoNode, Node, SignalDirection, SignalState, Topology
+
+from .helpers import add_nodes, add_route, add_signal, connect, create_turnout
+
+
+def _create_line():
+    """A - B - C along the x axis with a Signal on both Edges and a Route between them."""
+
+    topology = Topology()
+    a, b, c = add_nodes(
+        topology, (Node(geo_node=DbrefGeoNode(x, 0.0)) for x in (0.0, 100.0, 200.0))
+    )
+    edges = [
+        connect(topology, node_a, node_b, length=100.0, maximum_speed=speed)
+        for node_a, node_b, speed in ((a, b, 100), (b, c, 80))
+    ]
+    start, end = (add_signal(topology, edge, 10.0) for edge in edges)
+    route = add_route(topology, start, end, [end.edge])
+    return topology, (a, b, c), edges, route
+
+
+def test_batch_defers_index_maintenance():
+    topology, (a, b, c), edges, route = _create_line()
+    assert len(topology.signal_index) == 2 and len(topology.connectivity.components()) == 1
+    d = Node()
+
+    with topology.batch():
+        signal = add_signal(topology, edges[0], 50.0, supported_states={SignalState.HP0})
+        topology.add_node(d)
+        temporary = add_signal(topology, edges[1], 50.0)
+        topology.remove_signal(temporary)
+        edges[1].signals.remove(temporary)
+        assert len(topology.signal_index) == 2 and len(topology.signals) == 3
+
+    assert len(topology.signal_index) == 3
+    assert topology.query_signals().supporting(SignalState.HP0).all() == [signal]
+    assert len(topology.connectivity.components()) == 2
+    assert topology.signal_distances.distance(edges[0].signals[0], signal) == 40.0
+
+
+def test_commit_recomputes_lengths_and_speeds():
+    topology, (a, b, c), edges, route = _create_line()
+
+    with topology.batch() as batch:
+        batch.modify(c).geo_node = DbrefGeoNode(250.0, 0.0)
+        batch.modify(edges[1]).maximum_speed = 60
+        topology.update_node(c)
+
+    assert edges[0].length == 100.0 and edges[1].length == 150.0
+    assert route.maximum_speed == 60
+
+
+def test_rollback_on_error():
+    topology, (a, b, c), edges, route = _create_line()
+    assert topology.connectivity.connected(a, c)
+    d = Node()
+
+    with pytest.raises(RuntimeError):
+        with topology.batch() as batch:
+            topology.add_node(d)
+            batch.modify(b).connected_nodes.remove(c)
+            batch.modify(c).connected_nodes.remove(b)
+            topology.remove_edge(edges[1])
+            batch.modify(edges[0]).signals.clear()
+            raise RuntimeError("abort")
+
+    assert topology._batch is None
+    assert d.uuid not in topology.nodes and edges[1].uuid in topology.edges
+    assert b.connected_nodes == [a, c] and c.connected_nodes == [b]
+    assert len(edges[0].signals) == 1
+    assert topology.connectivity.connected(a, c)
+
+
+def test_turnout_changes_update_the_directional_reachability():
+    topology, (h, t, l, r), (ht, tl, tr), _ = create_turnout()
+    t.connected_on_head, t.connected_on_left, t.connected_on_right = h, l, r
+    connectivity = topology.connectivity
+    assert connectivity.edge_reachable(ht, SignalDirection.IN, tr, SignalDirection.IN)
+
+    # H becomes the left branch, trains from H can only continue to the head L
+    t.connected_on_head, t.connected_on_left = l, h
+    topology.update_node(t)
+    assert not connectivity.edge_reachable(ht, SignalDirection.IN, tr, SignalDirection.IN)
+
+    with topology.batch():
+        t.connected_on_head, t.connected_on_left = h, l
+    assert connectivity.edge_reachable(ht, SignalDirection.IN, tr, SignalDirection.IN)
@@ -0,0 +1,119 @@
+import pickle
+
+from yaramo.additional_signal import AdditionalSignalZs2v, AdditionalSignalZs3
+from yaramo.bitset import EnumList, EnumSet, member_from_string
+from yaramo.model import (
+    Edge,
+    Node,
+    Signal,
+    SignalDirection,
+    SignalFunction,
+    SignalKind,
+    SignalState,
+    Topology,
+)
+
+Zs3 = AdditionalSignalZs3.AdditionalSignalSymbolZs3
+
+
+def test_enum_set_behaves_like_a_set():
+    states = EnumSet(SignalState, [SignalState.KS1, "SignalState.HP0", "SH1"])
+    assert states == {SignalState.HP0, SignalState.KS1, SignalState.SH1}
+    assert list(states) == [SignalState.HP0, SignalState.KS1, SignalState.SH1]
+    assert SignalState.KS1 in states and SignalState.KS2 not in states and "KS1" not in states
+
+    states.discard(SignalState.KS1)
+    states.add(SignalState.ZS3)
+    assert len(states) == 3
+    assert states | {SignalState.KS2} == {
+        SignalState.HP0,
+        SignalState.SH1,
+        SignalState.ZS3,
+        SignalState.KS2,
+    }
+    assert states & EnumSet(SignalState, [SignalState.SH1]) == {SignalState.SH1}
+    assert {SignalState.HP0} <= states and not states <= {SignalState.HP0}
+    assert states.strings() == ["SignalState.HP0", "SignalState.SH1", "SignalState.ZS3"]
+    assert pickle.loads(pickle.dumps(states)) == states
+
+    assert member_from_string(SignalState, "SignalState.HP0") is SignalState.HP0
+    assert Zs3.from_number(8) is Zs3.EIGHT and Zs3.from_number(42) is None
+    assert AdditionalSignalZs2v.symbol_from_string("AdditionalSignalSymbolZs2.off") is not None
+
+
+def test_signals_store_states_and_symbols_as_bitmasks():
+    topology = Topology()
+    a, b = Node(), Node()
+    edge = Edge(a, b, length=100.0)
+    signal = Signal(
+        edge,
+        10.0,
+        SignalDirection.IN,
+        SignalFunction.Block_Signal,
+        SignalKind.Hauptsignal,
+        supported_states={SignalState.HP0, SignalState.KS1},
+    )
+    signal.additional_signals.append(AdditionalSignalZs3([Zs3.SIX, Zs3.FOUR]))
+    for element, add in ((a, topology.add_node), (b, topology.add_node), (edge, topology.add_edge)):
+        add(element)
+    topology.add_signal(signal)
+
+    assert isinstance(signal.supported_states, EnumSet)
+    symbols = signal.additional_signals[0].symbols
+    assert isinstance(symbols, EnumList)
+    assert symbols == [Zs3.SIX, Zs3.FOUR] and symbols[0] is Zs3.SIX
+    symbols.append("AdditionalSignalSymbolZs3.ONE")
+    symbols[1:2] = [Zs3.TWO]
+    assert symbols == [Zs3.SIX, Zs3.TWO, Zs3.ONE] and Zs3.FOUR not in symbols
+    assert pickle.loads(pickle.dumps(symbols)) == symbols
+
+    copy = Topology.from_json(topology.to_json()).signals[signal.uuid]
+    assert copy.supported_states == {SignalState.HP0, SignalState.KS1}
+
+
+def test_unknown_strings_are_skipped(caplog):
+    signal = Signal(
+        Edge(Node(), Node(), length=100.0),
+        10.0,
+        SignalDirection.IN,
+        SignalFunction.Block_Signal,
+        SignalKind.Hauptsignal,
+        supported_states=["SignalState.HP0", "SignalState.FOO"],
+    )
+    assert signal.supported_states == {SignalState.HP0}
+    assert "SignalState.FOO" in caplog.text
+
+
+def test_queries_on_state_columns():
+    topology = Topology()
+    a, b = Node(), Node()
+    edge = Edge(a, b, length=100.0)
+    signals = []
+    for index, states in enumerate(
+        [{SignalState.HP0}, {SignalState.HP0, SignalState.ZS1}, {SignalState.SH1}]
+    ):
+        signal = Signal(
+            edge,
+            10.0 * index,
+            SignalDirection.IN,
+            SignalFunction.Block_Signal,
+            SignalKind.Hauptsignal,
+            supported_states=states,
+        )
+        signals.append(signal)
+        topology.add_signal(signal)
+    first, second, third = signals
+    query = topology.query_signals()
+
+    assert query.supporting(SignalState.HP0).uuids() == {first.uuid, second.uuid}
+    assert query.supporting(SignalState.HP0, SignalState.ZS1).all() == [second]
+    assert query.supporting_any(SignalState.ZS1, SignalState.SH1).uuids() == {
+        second.uuid,
+        third.uuid,
+    }
+
+    topology.remove_signal(second)
+    first.supported_states.add(SignalState.ZS1)
+    topology.update_signal(first)
+    assert query.supporting(SignalState.HP0, SignalState.ZS1).all() == [first]
+    assert query.supporting(SignalState.HP0).supporting_any(SignalState.SH1).all() == []
@@ -0,0 +1,102 @@
+import gc
+import uuid
+
+from yaramo.builder import BatchIds, TopologyBuilder
+from yaramo.model import (
+    DbrefGeoNode,
+    Edge,
+    Node,
+    Signal,
+    SignalDirection,
+    SignalFunction,
+    SignalKind,
+    SignalState,
+    Topology,
+)
+
+
+def _build(seed=0):
+    builder = TopologyBuilder(seed=seed, geo_node_class=DbrefGeoNode)
+    nodes = builder.add_nodes([(0.0, 0.0), (100.0, 0.0), (200.0, 10.0), None])
+    edges = builder.add_edges(
+        [(nodes[0], nodes[1]), (nodes[1], nodes[2])],
+        intermediate_coordinates=[[], [(150.0, 5.0)]],
+        maximum_speeds=[80, 60],
+    )
+    builder.add_signals(
+        [(edges[0], 50.0, SignalDirection.IN), (edges[1], 20.0, SignalDirection.GEGEN)],
+        function=SignalFunction.Einfahr_Signal,
+        kind=SignalKind.Hauptsignal,
+        supported_states=[SignalState.HP0, SignalState.HP1],
+    )
+    return builder.build(compute_lengths=True)
+
+
+def test_builder_creates_connected_topology():
+    topology = _build()
+    assert len(topology.nodes) == 4 and len(topology.edges) == 2 and len(topology.signals) == 2
+
+    first, second = topology.edges.values()
+    assert first.node_b is second.node_a
+    assert first.node_b.connected_nodes == [first.node_a, second.node_b]
+    assert first.length == 100.0
+    assert second.intermediate_geo_nodes[0].geo_point.x == 150.0
+
+    signal = second.signals[0]
+    assert signal.edge is second and signal.side_distance == -3.950
+    assert signal.previous_node() is second.node_b
+    assert topology.query_signals().supporting(SignalState.HP1).uuids() == set(topology.signals)
+    Topology.from_json(topology.to_json())
+
+
+def test_builder_elements_match_constructed_elements():
+    topology = _build()
+    node = next(iter(topology.nodes.values()))
+    edge = next(iter(topology.edges.values()))
+    signal = next(iter(topology.signals.values()))
+
+    constructed_node = Node(geo_node=DbrefGeoNode(0.0, 0.0))
+    constructed_edge = Edge(constructed_node, constructed_node)
+    constructed_signal = Signal(constructed_edge, 0.0, "in", "Block_Signal", "Hauptsignal")
+    assert list(vars(node)) == list(vars(constructed_node))
+    assert list(vars(node.geo_node)) == list(vars(constructed_node.geo_node))
+    assert list(vars(node.geo_node.geo_point)) == list(vars(constructed_node.geo_node.geo_point))
+    assert list(vars(edge)) == list(vars(constructed_edge))
+    assert list(vars(signal)) == list(vars(constructed_signal))
+
+
+def test_builder_ids_are_deterministic():
+    assert list(_build(seed=1).nodes) == list(_build(seed=1).nodes)
+    first, second = _build(seed=1), _build(seed=1)
+    first_node, second_node = (next(iter(built.nodes.values())) for built in (first, second))
+    assert first_node.geo_node.geo_point.uuid == second_node.geo_node.geo_point.uuid
+    assert [signal.control_member_uuid for signal in first.signals.values()] == [
+        signal.control_member_uuid for signal in second.signals.values()
+    ]
+    assert not set(_build(seed=1).nodes) & set(_build(seed=2).nodes)
+
+    ids = BatchIds(seed=3).take(1000)
+    assert len(set(ids)) == 1000
+    assert all(uuid.UUID(generated).version == 4 for generated in ids)
+
+
+def test_default_builders_generate_disjoint_ids():
+    first, second = TopologyBuilder(), TopologyBuilder()
+    first.add_nodes([(52.0, 13.0)])
+    second.add_nodes([(52.0, 13.0)])
+    assert first.topology.uuid != second.topology.uuid
+    assert not set(first.topology.nodes) & set(second.topology.nodes)
+    assert not set(BatchIds().take(100)) & set(BatchIds().take(100))
+
+
+def test_builder_pauses_gc_only_when_asked():
+    states = []
+
+    class RecordingTopology(Topology):
+        def add_node(self, node):
+            states.append(gc.isenabled())
+            super().add_node(node)
+
+    TopologyBuilder(topology=RecordingTopology()).add_nodes([(0.0, 0.0)])
+    TopologyBuilder(topology=RecordingTopology(), pause_gc=True).add_nodes([(0.0, 0.0)])
+    assert states == [True, False] and gc.isenabled()
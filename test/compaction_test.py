@@ -0,0 +1,78 @@
+import math
+
+from yaramo.compaction import simplify_polyline
+from yaramo.model import DbrefGeoNode, Node, SignalDirection, Topology
+from yaramo.vacancy_section import VacancySection
+
+from .helpers import add_nodes, add_route, add_signal, connect
+
+
+def _create_chain():
+    """A straight track A - B - C - D along the x axis with B and C having two neighbours,
+    the middle Edge pointing backwards and many almost collinear GeoNodes."""
+
+    topology = Topology()
+    vacancy_section = VacancySection()
+    topology.add_vacancy_section(vacancy_section)
+    nodes = add_nodes(
+        topology, (Node(geo_node=DbrefGeoNode(x, 0.0)) for x in (0.0, 100.0, 200.0, 300.0))
+    )
+
+    edges = []
+    for node_a, node_b in [(nodes[0], nodes[1]), (nodes[2], nodes[1]), (nodes[2], nodes[3])]:
+        start, end = node_a.geo_node.geo_point.x, node_b.geo_node.geo_point.x
+        geo_nodes = [
+            DbrefGeoNode(start + (end - start) * i / 10, 0.01 * (i % 2)) for i in range(1, 10)
+        ]
+        edge = connect(
+            topology,
+            node_a,
+            node_b,
+            vacancy_section=vacancy_section,
+            intermediate_geo_nodes=geo_nodes,
+        )
+        edge.update_length()
+        edges.append(edge)
+
+    signals = [
+        add_signal(topology, edge, distance) for edge, distance in zip(edges, (50.0, 30.0, 80.0))
+    ]
+    route = add_route(topology, signals[0], signals[2], edges)
+    return topology, nodes, signals, route
+
+
+def test_simplify_polyline():
+    points = [(float(x), 0.001 * math.sin(x)) for x in range(100)]
+    assert simplify_polyline(points, 0.01) == [0, 99]
+    points = [(0.0, 0.0), (1.0, 1.0), (2.0, 0.0)]
+    assert simplify_polyline(points, 0.5) == [0, 1, 2]
+
+
+def test_compact_contracts_chains_and_simplifies_geometry():
+    topology, nodes, signals, route = _create_chain()
+    report = topology.compact(tolerance=0.05)
+
+    assert report.before["nodes"] == 4 and report.after["nodes"] == 2
+    assert report.before["edges"] == 3 and report.after["edges"] == 1
+    assert report.after["intermediate_geo_nodes"] < report.before["intermediate_geo_nodes"]
+
+    (edge,) = topology.edges.values()
+    assert {edge.node_a, edge.node_b} == {nodes[0], nodes[3]}
+    assert nodes[0].connected_nodes == [nodes[3]] and nodes[3].connected_nodes == [nodes[0]]
+    assert math.isclose(edge.length, 300.0, rel_tol=1e-3)
+    assert edge.vacancy_section in topology.vacancy_sections.values()
+
+    forward = edge.node_a is nodes[0]
+    expected = [
+        (50.0, SignalDirection.IN),
+        (170.0, SignalDirection.GEGEN),
+        (280.0, SignalDirection.IN),
+    ]
+    for signal, (distance, direction) in zip(signals, expected):
+        assert signal.edge is edge
+        if not forward:
+            distance = edge.length - distance
+        assert math.isclose(signal.distance_edge, distance, rel_tol=1e-3)
+        assert (signal.direction == direction) == forward
+    assert route.edges == {edge}
+    assert route.get_edges_in_order() == [edge]
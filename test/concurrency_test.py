@@ -0,0 +1,100 @@
+import threading
+
+import pytest
+
+from benchmarks.concurrent_reads import measure
+from benchmarks.generator import generate_topology
+from yaramo.concurrency import ReadWriteLock
+from yaramo.model import DbrefGeoNode, Node
+
+
+def test_reads_do_not_modify_nodes():
+    switch = Node(geo_node=DbrefGeoNode(0.0, 0.0))
+    head = Node(geo_node=DbrefGeoNode(-10.0, 0.0))
+    left = Node(geo_node=DbrefGeoNode(10.0, 2.0))
+    right = Node(geo_node=DbrefGeoNode(10.0, -2.0))
+    for node in (head, left, right):
+        switch.connected_nodes.append(node)
+        node.connected_nodes.append(switch)
+
+    assert set(switch.get_possible_followers(head)) == {left, right}
+    assert switch.get_possible_followers(left) == [head]
+    assert switch.get_anschluss_of_other(head) is not None
+    assert switch.connected_on_head is None and switch.connected_on_left is None
+
+
+def test_read_write_lock():
+    lock = ReadWriteLock()
+    active = []
+    observed = []
+
+    def read():
+        with lock.read():
+            with lock.read():
+                active.append(1)
+                observed.append(len(active))
+                active.pop()
+
+    def write():
+        with lock.write():
+            with lock.read():
+                observed.append(-len(active))
+
+    threads = [threading.Thread(target=read if index % 4 else write) for index in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(observed) == 40
+    assert all(value == 0 for value in observed if value <= 0)
+    with lock.read():
+        with pytest.raises(RuntimeError):
+            lock.acquire_write()
+
+
+def test_write_lock_released_before_read_lock():
+    lock = ReadWriteLock()
+    lock.acquire_write()
+    lock.acquire_read()
+    lock.release_write()
+    assert lock._readers == 1
+
+    acquired = threading.Event()
+
+    def write():
+        with lock.write():
+            acquired.set()
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    assert not acquired.wait(0.05)
+    lock.release_read()
+    assert acquired.wait(5)
+    writer.join()
+    assert lock._readers == 0
+
+    with lock.write():
+        with lock.read():
+            pass
+    assert lock._readers == 0 and lock._writer is None
+
+
+def test_concurrent_reads_with_writers():
+    topology = generate_topology(stations=3, geo_nodes_per_line=5)
+    barrier = threading.Barrier(8)
+    indexes = []
+
+    def build():
+        barrier.wait()
+        indexes.append(topology.connectivity)
+
+    threads = [threading.Thread(target=build) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(index is indexes[0] for index in indexes)
+
+    result = measure(topology, threads=4, operations=500, writers=2)
+    assert result["operations"] == 2000
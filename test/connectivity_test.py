@@ -0,0 +1,76 @@
+from yaramo.model import DbrefGeoNode, Edge, Node, SignalDirection, Topology
+
+from .helpers import add_nodes, add_signal, connect
+
+
+def _create_turnout():
+    """H - T - L - X and T - R with the turnout T (head H), plus the island Y - Z."""
+
+    topology = Topology()
+    h, t, l, r, x, y, z = add_nodes(
+        topology,
+        (
+            Node(geo_node=DbrefGeoNode(*coordinates))
+            for coordinates in (
+                (0, 0),
+                (100, 0),
+                (200, 10),
+                (200, -10),
+                (300, 10),
+                (0, 50),
+                (50, 50),
+            )
+        ),
+    )
+    edges = [
+        connect(topology, node_a, node_b, length=100.0)
+        for node_a, node_b in ((h, t), (t, l), (t, r), (l, x), (y, z))
+    ]
+    return topology, (h, t, l, r, x, y, z), edges
+
+
+def test_components_and_articulation_points():
+    topology, (h, t, l, r, x, y, z), (ht, tl, tr, lx, yz) = _create_turnout()
+    connectivity = topology.connectivity
+
+    components = connectivity.components()
+    assert [len(component) for component in components] == [5, 2]
+    assert connectivity.connected(h, x) and not connectivity.connected(h, y)
+    assert connectivity.articulation_points() == {t.uuid, l.uuid}
+
+    topology.remove_edge(tr)
+    assert not connectivity.connected(h, r)
+    assert sorted(len(component) for component in connectivity.components()) == [1, 2, 4]
+    assert connectivity.articulation_points() == {t.uuid, l.uuid}
+
+    topology.add_edge(Edge(r, y, length=10.0))
+    assert connectivity.connected(r, z) and not connectivity.connected(h, z)
+    assert connectivity.articulation_points() == {t.uuid, l.uuid, y.uuid}
+
+
+def test_directional_reachability():
+    topology, (h, t, l, r, x, y, z), (ht, tl, tr, lx, yz) = _create_turnout()
+    connectivity = topology.connectivity
+
+    towards_turnout = add_signal(topology, ht, 50.0, SignalDirection.IN)
+    behind = add_signal(topology, ht, 20.0, SignalDirection.IN)
+    to_left = add_signal(topology, tl, 50.0, SignalDirection.IN)
+    from_left = add_signal(topology, tl, 50.0, SignalDirection.GEGEN)
+    to_right = add_signal(topology, tr, 50.0, SignalDirection.IN)
+    leaving = add_signal(topology, ht, 50.0, SignalDirection.GEGEN)
+
+    assert connectivity.signal_reachable(towards_turnout, to_left)
+    assert connectivity.signal_reachable(towards_turnout, to_right)
+    assert connectivity.signal_reachable(behind, towards_turnout)
+    assert not connectivity.signal_reachable(towards_turnout, behind)
+    # Trains cannot reverse or run from the left to the right branch
+    assert not connectivity.signal_reachable(towards_turnout, from_left)
+    assert not connectivity.signal_reachable(from_left, to_right)
+    assert connectivity.signal_reachable(from_left, leaving)
+    assert connectivity.reachable_edges(ht, SignalDirection.IN) == {tl.uuid, tr.uuid, lx.uuid}
+
+    # A connection from the buffer stop X back to H closes a loop
+    connect(topology, x, h, length=300.0)
+    connectivity.invalidate_directions()
+    assert connectivity.signal_reachable(towards_turnout, behind)
+    assert not connectivity.signal_reachable(towards_turnout, from_left)
@@ -0,0 +1,112 @@
+import math
+
+import pytest
+
+from yaramo.curvature import apply_speed_limits, route_radius_profile
+from yaramo.lookahead import END, SPEED
+from yaramo.model import DbrefGeoNode, Node, Route, SignalDirection, Topology
+
+from .helpers import add_nodes, add_signal, connect
+
+
+def _arc(radius, start_degrees, stop_degrees, step=5):
+    return [
+        DbrefGeoNode(
+            radius * math.sin(math.radians(angle)), radius - radius * math.cos(math.radians(angle))
+        )
+        for angle in range(start_degrees, stop_degrees + 1, step)
+    ]
+
+
+def _create_curve():
+    """A 500 m curve to the left from A to B followed by a straight Edge from B to C."""
+
+    topology = Topology()
+    arc = _arc(500.0, 0, 30)
+    end = arc[-1].geo_point
+    a, b, c = add_nodes(
+        topology,
+        (
+            Node(geo_node=arc[0]),
+            Node(geo_node=arc[-1]),
+            Node(geo_node=DbrefGeoNode(end.x + 100 * math.cos(math.radians(30)), end.y + 50)),
+        ),
+    )
+    curve = connect(topology, a, b, intermediate_geo_nodes=arc[1:-1])
+    straight = connect(topology, c, b)
+    return topology, (a, b, c), (curve, straight)
+
+
+def test_minimum_radius_and_speed_limits():
+    topology, (a, b, c), (curve, straight) = _create_curve()
+
+    analysis = topology.curvature()
+    assert analysis.minimum_radius(curve) == pytest.approx(500.0)
+    assert analysis.minimum_radius(straight) == math.inf
+    assert all(value > 0 for value in analysis.curvatures(curve)[1:-1])
+    # sqrt(500 * 200 / 11.8) = 92.06
+    assert analysis.speed_limits() == {curve.uuid: 90, straight.uuid: None}
+
+    curve.maximum_speed = 80
+    apply_speed_limits(topology, cant=150.0)
+    assert curve.maximum_speed == 80
+    assert straight.maximum_speed is None
+
+
+def test_route_radius_profile():
+    topology, (a, b, c), (curve, straight) = _create_curve()
+    start = add_signal(topology, curve, 0.0)
+    end = add_signal(topology, straight, 10.0, SignalDirection.GEGEN)
+    route = Route(start)
+    route.edges.add(straight)
+    route.end_signal = end
+
+    profile = route_radius_profile(route)
+    assert len(profile) == 8
+    assert profile[0] == (0.0, math.inf)
+    assert profile[3][1] == pytest.approx(500.0)
+    assert profile[-1][0] == pytest.approx(6 * 2 * 500 * math.sin(math.radians(2.5)) + 100.0)
+
+
+def test_turnout_speed_limits():
+    topology = Topology()
+    head, turnout, straight, branch = add_nodes(
+        topology,
+        (
+            Node(geo_node=DbrefGeoNode(-50.0, 0.0)),
+            Node(geo_node=DbrefGeoNode(0.0, 0.0)),
+            Node(geo_node=DbrefGeoNode(50.0, 0.0)),
+            Node(geo_node=_arc(190.0, 0, 15)[-1]),
+        ),
+    )
+    for other in (head, straight, branch):
+        connect(topology, turnout, other, intermediate_geo_nodes=[])
+    intermediate = _arc(190.0, 0, 15)[1]
+    branch_edge = topology.get_edge_by_nodes(turnout, branch)
+    branch_edge.intermediate_geo_nodes = [intermediate]
+    head_edge = topology.get_edge_by_nodes(turnout, head)
+    path = {branch_edge}
+    assert topology.lookahead.ahead(head_edge, 50.0, SignalDirection.GEGEN, path=path)[0][1] == END
+
+    apply_speed_limits(topology, cant=0.0, cant_deficiency=100.0)
+    assert turnout.maximum_speed_on_right is None
+    assert 35 <= turnout.maximum_speed_on_left <= 40
+    assert topology.lookahead.ahead(head_edge, 50.0, SignalDirection.GEGEN, path=path)[0] == (
+        50.0,
+        SPEED,
+        branch_edge,
+        turnout.maximum_speed_on_left,
+    )
+
+
+def test_speed_limits_update_the_lookahead():
+    topology, (a, b, c), (curve, straight) = _create_curve()
+    assert topology.lookahead.ahead(straight, 0.0, SignalDirection.IN)[0][1] == END
+
+    apply_speed_limits(topology)
+    assert topology.lookahead.ahead(straight, 0.0, SignalDirection.IN)[0] == (
+        pytest.approx(100.0),
+        SPEED,
+        curve,
+        90,
+    )
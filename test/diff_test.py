@@ -0,0 +1,57 @@
+from benchmarks.generator import generate_topology
+from yaramo.model import DbrefGeoNode, Node, Topology
+
+from .helpers import add_nodes, add_signal, connect
+
+
+def test_diff_by_uuid():
+    old = generate_topology(stations=3, geo_nodes_per_line=5)
+    new = generate_topology(stations=3, geo_nodes_per_line=5)
+    assert not old.diff(new)
+
+    signal = next(iter(new.signals.values()))
+    signal.distance_edge += 10
+    edge = next(iter(new.edges.values()))
+    edge.maximum_speed = 40
+    removed_route = next(iter(new.routes.values()))
+    del new.routes[removed_route.uuid]
+    node = Node(geo_node=DbrefGeoNode(0, 0))
+    new.add_node(node)
+
+    diff = old.diff(new)
+    assert [new_signal for _, new_signal in diff.signals.changed] == [signal]
+    assert [new_edge for _, new_edge in diff.edges.changed] == [edge]
+    assert [route.uuid for route in diff.routes.removed] == [removed_route.uuid]
+    assert diff.nodes.added == [node]
+    assert not diff.vacancy_sections
+
+
+def _create_line(x_offset=0.0):
+    topology = Topology()
+    nodes = add_nodes(
+        topology, (Node(geo_node=DbrefGeoNode(x + x_offset, 0.0)) for x in (0.0, 100.0, 200.0))
+    )
+    edges = [
+        connect(topology, node_a, node_b, length=100.0) for node_a, node_b in zip(nodes, nodes[1:])
+    ]
+    add_signal(topology, edges[0], 50.0)
+    return topology
+
+
+def test_diff_matches_recreated_elements_by_geometry():
+    old, new = _create_line(), _create_line()
+    diff = old.diff(new)
+    assert len(diff.nodes.added) == 3 and len(diff.nodes.removed) == 3
+
+    diff = old.diff(new, match_geometry=True)
+    assert not diff
+    assert len(diff.matched_by_geometry) == 3 + 2 + 1
+
+    diff = old.diff(_create_line(x_offset=0.001), match_geometry=True)
+    assert len(diff.nodes.changed) == 3 and not diff.nodes.added and not diff.edges
+
+    signal = next(iter(new.signals.values()))
+    signal.kind = "Vorsignal"
+    diff = old.diff(new, match_geometry=True)
+    assert [new_signal for _, new_signal in diff.signals.changed] == [signal]
+    assert not diff.nodes and not diff.edges
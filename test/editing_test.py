@@ -0,0 +1,78 @@
+import pytest
+
+from yaramo.model import DbrefGeoNode, Node, SignalDirection, Topology, Trip
+
+from .helpers import add_nodes, add_route, add_signal, connect
+
+
+def _create_line():
+    """A - B - C along the x axis, the Edge B - C points backwards."""
+
+    topology = Topology()
+    a, b, c = add_nodes(
+        topology, (Node(geo_node=DbrefGeoNode(x, 0.0)) for x in (0.0, 100.0, 200.0))
+    )
+    first = connect(
+        topology,
+        a,
+        b,
+        length=100.0,
+        intermediate_geo_nodes=[DbrefGeoNode(x, 1.0) for x in (25, 75)],
+    )
+    second = connect(topology, c, b, length=100.0)
+    signals = [
+        add_signal(topology, first, 10.0),
+        add_signal(topology, first, 60.0, SignalDirection.GEGEN),
+        add_signal(topology, second, 30.0, SignalDirection.GEGEN),
+    ]
+    route = add_route(topology, signals[0], signals[2], [second])
+    trip = Trip([second, first])
+    topology.add_trip(trip)
+    return topology, (a, b, c), (first, second), signals, route, trip
+
+
+def test_split_edge():
+    topology, (a, b, c), (first, second), signals, route, trip = _create_line()
+
+    node, left, right = topology.split_edge(first, 50.0)
+    assert first.uuid not in topology.edges and node.uuid in topology.nodes
+    assert (left.node_a, left.node_b, right.node_a, right.node_b) == (a, node, node, b)
+    assert (node.geo_node.geo_point.x, node.geo_node.geo_point.y) == (50.0, 1.0)
+    assert [geo.geo_point.x for geo in left.intermediate_geo_nodes] == [25]
+    assert [geo.geo_point.x for geo in right.intermediate_geo_nodes] == [75]
+    assert (left.length, right.length) == (50.0, 50.0)
+    assert a.connected_nodes == [node] and b.connected_nodes == [node, c]
+    assert node.connected_nodes == [a, b]
+
+    assert signals[0].edge is left and signals[0].distance_edge == 10.0
+    assert signals[1].edge is right and signals[1].distance_edge == 10.0
+    assert route.edges == {left, right, second}
+    assert route.get_edges_in_order() == [left, right, second]
+    assert trip.edges == [second, right, left]
+    assert topology.edge_references.routes(left.uuid) == {route.uuid}
+
+    with pytest.raises(ValueError):
+        topology.split_edge(left, 50.0)
+
+
+def test_merge_edges():
+    topology, (a, b, c), (first, second), signals, route, trip = _create_line()
+
+    merged = topology.merge_edges(first, second)
+    assert b.uuid not in topology.nodes and list(topology.edges.values()) == [merged]
+    assert (merged.node_a, merged.node_b, merged.length) == (a, c, 200.0)
+    assert [geo.geo_point.x for geo in merged.intermediate_geo_nodes] == [25, 75, 100.0]
+    assert a.connected_nodes == [c] and c.connected_nodes == [a]
+    assert [(s.distance_edge, s.direction) for s in signals] == [
+        (10.0, SignalDirection.IN),
+        (60.0, SignalDirection.GEGEN),
+        (170.0, SignalDirection.IN),
+    ]
+    assert route.edges == {merged} and trip.edges == [merged]
+
+    node, left, right = topology.split_edge(merged, 100.0)
+    with pytest.raises(ValueError):
+        topology.merge_edges(left, left)
+    left.maximum_speed = 60
+    with pytest.raises(ValueError):
+        topology.merge_edges(left, right)
@@ -0,0 +1,93 @@
+import io
+
+import pytest
+import simplejson as json
+
+from yaramo.export import iter_records, write_arrow
+from yaramo.model import (
+    DbrefGeoNode,
+    Node,
+    Route,
+    SignalFunction,
+    SignalState,
+    Topology,
+    Wgs84GeoNode,
+)
+
+from .helpers import add_nodes, add_signal, connect
+
+
+def _create_topology():
+    topology = Topology()
+    a, b, c = add_nodes(
+        topology,
+        (
+            Node(geo_node=Wgs84GeoNode(52.39, 13.06)),
+            Node(geo_node=Wgs84GeoNode(52.40, 13.07)),
+            Node(),
+        ),
+    )
+    first = connect(
+        topology, a, b, length=1300.0, intermediate_geo_nodes=[Wgs84GeoNode(52.395, 13.064)]
+    )
+    second = connect(topology, b, c, length=200.0)
+    signal = add_signal(
+        topology,
+        first,
+        100.0,
+        function=SignalFunction.Einfahr_Signal,
+        supported_states={SignalState.HP0, SignalState.KS1},
+    )
+    route = Route(signal)
+    topology.add_route(route)
+    return topology, (a, b, c), (first, second), signal, route
+
+
+def test_iter_records():
+    topology, (a, b, c), (first, second), signal, route = _create_topology()
+
+    records = list(iter_records(topology))
+    assert [kind for kind, _ in records] == ["nodes"] * 3 + ["edges"] * 2 + ["signals", "routes"]
+    edges = {record["uuid"]: record for kind, record in records if kind == "edges"}
+    assert edges[first.uuid]["coordinates"] == [[52.39, 13.06], [52.395, 13.064], [52.40, 13.07]]
+    assert edges[first.uuid]["coordinate_system"] == "wgs84"
+    assert edges[second.uuid]["coordinates"] == [[52.40, 13.07]]
+    signals = [record for kind, record in records if kind == "signals"]
+    assert signals[0]["supported_states"] == ["SignalState.HP0", "SignalState.KS1"]
+    assert signals[0]["direction"] == "in"
+
+
+def test_write_geojson():
+    topology, (a, b, c), (first, second), signal, route = _create_topology()
+    topology.add_node(Node(geo_node=DbrefGeoNode(4500000.0, 5800000.0)))
+
+    file = io.StringIO()
+    topology.to_geojson(file)
+    features = [json.loads(line) for line in file.getvalue().splitlines()]
+
+    assert len(features) == 8
+    by_id = {feature["id"]: feature for feature in features}
+    assert by_id[a.uuid]["geometry"] == {"type": "Point", "coordinates": [13.06, 52.39]}
+    assert by_id[c.uuid]["geometry"] is None
+    assert by_id[first.uuid]["geometry"]["type"] == "LineString"
+    assert by_id[first.uuid]["properties"]["node_a"] == a.uuid
+    assert by_id[second.uuid]["geometry"] is None
+    assert by_id[route.uuid]["properties"]["edges"] == [first.uuid]
+    assert features[3]["geometry"]["coordinates"] == [4500000.0, 5800000.0]
+
+
+def test_write_arrow(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    topology, (a, b, c), (first, second), signal, route = _create_topology()
+
+    paths = write_arrow(topology, tmp_path, batch_size=2)
+    nodes = pq.read_table(paths["nodes"])
+    edges = pq.read_table(paths["edges"])
+
+    assert nodes.num_rows == 3
+    assert nodes.column("uuid").to_pylist() == [a.uuid, b.uuid, c.uuid]
+    assert edges.column("coordinates").to_pylist()[0] == [
+        [52.39, 13.06],
+        [52.395, 13.064],
+        [52.40, 13.07],
+    ]
@@ -0,0 +1,64 @@
+from benchmarks.generator import generate_topology
+from yaramo.cache import DerivedDataCache, update_edge_lengths, update_turnout_orientation
+from yaramo.fingerprint import TopologyFingerprint
+from yaramo.lookahead import LookaheadTable
+from yaramo.model import SignalDirection, SignalState, Topology
+
+
+def test_fingerprint_is_stable_and_incremental():
+    topology = generate_topology(stations=3, geo_nodes_per_line=5, seed=1)
+    fingerprint = topology.fingerprint()
+    assert fingerprint == generate_topology(stations=3, geo_nodes_per_line=5, seed=1).fingerprint()
+    assert fingerprint != generate_topology(stations=3, geo_nodes_per_line=5, seed=2).fingerprint()
+
+    # The order of the elements does not matter
+    reloaded = Topology.from_json(topology.to_json())
+    reordered = Topology.from_json(topology.to_json())
+    reordered.edges = dict(reversed(reordered.edges.items()))
+    assert reloaded.fingerprint() == reordered.fingerprint()
+    assert TopologyFingerprint(reloaded).digests["edges"] == fingerprint.digests["edges"]
+
+    signal = next(iter(topology.signals.values()))
+    signal.supported_states.add(SignalState.ZS1)
+    signal.distance_edge += 1
+    assert topology.fingerprint() != fingerprint
+    fingerprint.update(signal)
+    assert topology.fingerprint() == fingerprint
+
+    topology.signals.pop(signal.uuid)
+    fingerprint.remove(signal)
+    assert topology.fingerprint() == fingerprint
+
+
+def test_derived_data_cache(tmp_path):
+    cache = DerivedDataCache(tmp_path, max_size=10_000)
+    topology = generate_topology(stations=2, geo_nodes_per_line=5, compute_lengths=False)
+    update_edge_lengths(topology, cache)
+    update_turnout_orientation(topology, cache)
+
+    reloaded = generate_topology(stations=2, geo_nodes_per_line=5, compute_lengths=False)
+    key = reloaded.fingerprint()
+    assert (key, "edge_lengths") in cache
+    for edge in reloaded.edges.values():
+        edge.length = 1.0
+    lookahead = reloaded.lookahead
+    lookahead.refresh()
+    update_edge_lengths(reloaded, cache)
+    update_turnout_orientation(reloaded, cache)
+    fresh = LookaheadTable(reloaded)
+    for edge in reloaded.edges.values():
+        assert lookahead.ahead(edge, 0.0, SignalDirection.IN) == fresh.ahead(
+            edge, 0.0, SignalDirection.IN
+        )
+    for uuid, edge in topology.edges.items():
+        assert reloaded.edges[uuid].length == edge.length
+    for uuid, node in topology.nodes.items():
+        assert str(reloaded.nodes[uuid].connected_on_left) == str(node.connected_on_left)
+
+    assert cache.get_or_compute("key", "value", lambda: [1, 2, 3]) == [1, 2, 3]
+    assert cache.get_or_compute("key", "value", lambda: None) == [1, 2, 3]
+    cache.set("key", "large", b"x" * 20_000)
+    assert cache.size() <= 10_000
+    assert ("key", "large") not in cache
+    cache.clear()
+    assert cache.size() == 0
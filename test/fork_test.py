@@ -0,0 +1,97 @@
+import pytest
+
+from yaramo.model import Node, Topology
+
+from .helpers import add_nodes, add_signal, connect
+
+
+def _create_turnout():
+    """a - t with the branches t - l and t - r and a Signal on every Edge."""
+
+    topology = Topology()
+    a, t, l, r = add_nodes(topology, (Node(name=name) for name in "atlr"))
+    for node_a, node_b in ((a, t), (t, l), (t, r)):
+        add_signal(topology, connect(topology, node_a, node_b, length=100.0), 50.0)
+    return topology, (a, t, l, r)
+
+
+def test_fork_shares_elements():
+    topology, nodes = _create_turnout()
+    fork = topology.fork()
+
+    assert len(fork.nodes) == 4 and len(fork.edges) == 3 and len(fork.signals) == 3
+    assert all(fork.nodes[node.uuid] is node for node in nodes)
+    assert not fork.nodes.local and not fork.edges.local
+    assert all(fork.is_shared(node) for node in nodes)
+
+
+def test_edit_copies_on_write():
+    topology, (a, t, l, r) = _create_turnout()
+    edge = topology.get_edge_by_nodes(a, t)
+    old_signal = edge.signals[0]
+    fork = topology.fork()
+
+    # One extra Signal
+    copy = fork.edit(edge)
+    signal = add_signal(fork, copy, 20.0)
+    copy.length = 120.0
+
+    assert copy is not edge and fork.edit(edge) is copy and not fork.is_shared(edge)
+    assert len(edge.signals) == 1 and edge.length == 100.0
+    assert len(topology.signals) == 3 and len(fork.signals) == 4
+    assert fork.resolve(old_signal.edge) is copy
+
+    # Copies refer to each other, whichever is copied first
+    node = fork.edit(a)
+    assert copy.node_a is node and edge.node_a is a
+    signal_copy = fork.edit(old_signal)
+    assert signal_copy.edge is copy and old_signal.edge is edge
+    assert fork.edit(signal) is signal
+
+    # Elements modified after edit or add_ are rewired when the referenced element is copied
+    branch = topology.get_edge_by_nodes(t, l)
+    shared_signal = branch.signals[0]
+    fork.edit(edge).signals.append(shared_signal)
+    signal_copy = fork.edit(shared_signal)
+    assert copy.signals[-1] is signal_copy and branch.signals == [shared_signal]
+
+
+def test_remove_turnout_in_fork():
+    topology, (a, t, l, r) = _create_turnout()
+    fork = topology.fork()
+
+    for neighbour in t.connected_nodes:
+        fork.edit(neighbour).connected_nodes.remove(t)
+        edge = fork.get_edge_by_nodes(neighbour, t)
+        for signal in edge.signals:
+            fork.remove_signal(signal)
+        fork.remove_edge(edge)
+    fork.remove_node(t)
+
+    assert set(fork.nodes) == {a.uuid, l.uuid, r.uuid} and len(fork.nodes) == 3
+    assert not fork.edges and not fork.signals
+    assert fork.resolve(t) is None and fork.resolve(a).connected_nodes == []
+    assert len(topology.nodes) == 4 and len(topology.edges) == 3
+    assert a.connected_nodes == [t]
+    assert fork.connectivity.connected(a, l) is False
+
+    # Forks of forks see the changes of their parent
+    variant = fork.fork()
+    assert len(variant.nodes) == 3 and variant.resolve(a) is fork.resolve(a)
+    with pytest.raises(ValueError):
+        variant.edit(t)
+
+
+def test_reference_following_analyses_raise_on_forks():
+    topology, (a, t, l, r) = _create_turnout()
+    fork = topology.fork()
+    with pytest.raises(NotImplementedError, match="signal_distances"):
+        fork.signal_distances
+    with pytest.raises(NotImplementedError, match="lookahead"):
+        fork.lookahead
+    with pytest.raises(NotImplementedError, match="route_protection"):
+        fork.route_protection()
+    with pytest.raises(NotImplementedError, match="freeze"):
+        fork.freeze(shared=False)
+    with pytest.raises(NotImplementedError):
+        fork.split_edge(topology.get_edge_by_nodes(a, t), 50.0)
@@ -0,0 +1,99 @@
+import multiprocessing
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.generator import generate_topology
+from yaramo.frozen_topology import FrozenTopology
+from yaramo.model import Node, Topology
+
+from .helpers import add_nodes, connect
+
+
+def test_frozen_topology_matches_topology():
+    topology = generate_topology(stations=3, geo_nodes_per_line=5)
+    frozen = topology.freeze(shared=False)
+
+    assert list(frozen.nodes) == list(topology.nodes)
+    assert len(frozen.edges) == len(topology.edges)
+    for node in topology.nodes.values():
+        frozen_node = frozen.nodes[node.uuid]
+        assert frozen_node.coordinates == (node.geo_node.geo_point.x, node.geo_node.geo_point.y)
+        assert [other.uuid for other in frozen_node.connected_nodes] == [
+            other.uuid for other in node.connected_nodes
+        ]
+        if len(node.connected_nodes) == 3:
+            assert frozen_node.connected_on_head.uuid == node.connected_on_head.uuid
+            assert frozen_node.maximum_speed_on_left == node.maximum_speed_on_left
+
+    for edge in topology.edges.values():
+        frozen_edge = frozen.edges[edge.uuid]
+        assert frozen_edge.node_a.uuid == edge.node_a.uuid
+        assert frozen_edge.length == edge.length
+        assert len(frozen_edge.intermediate_coordinates) == len(edge.intermediate_geo_nodes)
+        assert frozen_edge.vacancy_section_uuid == edge.vacancy_section.uuid
+
+    for signal in topology.signals.values():
+        frozen_signal = frozen.signals[signal.uuid]
+        assert frozen_signal.edge.uuid == signal.edge.uuid
+        assert frozen_signal.direction == signal.direction
+        assert frozen_signal.function == signal.function
+        assert frozen_signal.supported_states == signal.supported_states
+        assert frozen_signal.next_node().uuid == signal.next_node().uuid
+
+    for route in topology.routes.values():
+        frozen_route = frozen.routes[route.uuid]
+        assert frozen_route.end_signal.uuid == route.end_signal.uuid
+        assert {edge.uuid for edge in frozen_route.edges} == {edge.uuid for edge in route.edges}
+
+
+def test_frozen_followers_match_node_followers():
+    topology = Topology()
+    a, b, c = add_nodes(topology, (Node(), Node(), Node()))
+    connect(topology, a, b, length=100.0)
+    connect(topology, b, c, length=100.0)
+    frozen = topology.freeze(shared=False)
+    assert [
+        node.uuid for node in frozen.nodes[b.uuid].get_possible_followers(frozen.nodes[a.uuid])
+    ] == [c.uuid]
+
+    topology = generate_topology(stations=3, geo_nodes_per_line=5)
+    frozen = topology.freeze(shared=False)
+    for node in topology.nodes.values():
+        for source in node.connected_nodes:
+            followers = frozen.nodes[node.uuid].get_possible_followers(frozen.nodes[source.uuid])
+            assert [follower.uuid for follower in followers] == [
+                follower.uuid for follower in node.get_possible_followers(source)
+            ]
+
+
+def test_shared_frozen_topology_can_be_attached():
+    topology = generate_topology(stations=2, geo_nodes_per_line=5)
+    with topology.freeze() as frozen:
+        attached = pickle.loads(pickle.dumps(frozen))
+        assert attached.name == frozen.name
+        assert list(attached.signals) == list(topology.signals)
+
+        other = FrozenTopology.attach(frozen.name)
+        node = next(iter(topology.nodes.values()))
+        assert other.nodes[node.uuid].get_possible_followers(None)[0].uuid == (
+            node.connected_nodes[0].uuid
+        )
+
+        attached.close()
+        other.close()
+        frozen.unlink()
+
+
+def _count_nodes(frozen):
+    return len(frozen.nodes)
+
+
+def test_attached_frozen_topology_is_closed_in_spawned_workers(capfd):
+    topology = generate_topology(stations=2, geo_nodes_per_line=5)
+    with topology.freeze() as frozen:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(2, mp_context=context) as executor:
+            counts = list(executor.map(_count_nodes, [frozen] * 4))
+        frozen.unlink()
+    assert counts == [len(topology.nodes)] * 4
+    assert "BufferError" not in capfd.readouterr().err
@@ -0,0 +1,35 @@
+from benchmarks.generator import generate_topology
+from yaramo.model import Topology
+
+
+def test_generator_is_reproducible():
+    topology_a = generate_topology(stations=3, geo_nodes_per_line=5, seed=42)
+    topology_b = generate_topology(stations=3, geo_nodes_per_line=5, seed=42)
+    topology_c = generate_topology(stations=3, geo_nodes_per_line=5, seed=43)
+
+    def summary(topology: Topology):
+        return (
+            [(node.uuid, node.geo_node.geo_point.x) for node in topology.nodes.values()],
+            [(edge.uuid, edge.length) for edge in topology.edges.values()],
+            [(signal.uuid, signal.distance_edge) for signal in topology.signals.values()],
+            [sorted(edge.uuid for edge in route.edges) for route in topology.routes.values()],
+        )
+
+    assert summary(topology_a) == summary(topology_b)
+    assert summary(topology_a) != summary(topology_c)
+
+
+def test_generated_topology_is_consistent():
+    topology = generate_topology(stations=3, geo_nodes_per_line=5, block_signals_per_line=2)
+
+    assert len(topology.nodes) == 3 * 3 + 2
+    assert len(topology.edges) == 3 * 3 + 4
+    assert len(topology.signals) == 3 * 6 + 4 * 2 * 2
+    for route in topology.routes.values():
+        edges = route.get_edges_in_order()
+        assert edges[0] is route.start_signal.edge
+        assert edges[-1] is route.end_signal.edge
+
+    topology_copy = Topology.from_json(topology.to_json())
+    assert len(topology_copy.signals) == len(topology.signals)
+    assert len(topology_copy.vacancy_sections) == len(topology.vacancy_sections)
@@ -0,0 +1,89 @@
+"""Builders of the small Topologies the tests run on."""
+
+from yaramo.edge import Edge
+from yaramo.geo_node import DbrefGeoNode
+from yaramo.node import Node
+from yaramo.route import Route
+from yaramo.signal import Signal, SignalDirection, SignalFunction, SignalKind
+from yaramo.topology import Topology
+
+
+def add_nodes(topology: Topology, nodes):
+    """Adds the Nodes to the Topology and returns them as a list."""
+
+    nodes = list(nodes)
+    for node in nodes:
+        topology.add_node(node)
+    return nodes
+
+
+def connect(topology: Topology, node_a: Node, node_b: Node, **kwargs) -> Edge:
+    """Connects the Nodes with an Edge (created with kwargs) and adds it to the Topology."""
+
+    node_a.connected_nodes.append(node_b)
+    node_b.connected_nodes.append(node_a)
+    edge = Edge(node_a, node_b, **kwargs)
+    topology.add_edge(edge)
+    return edge
+
+
+def add_signal(
+    topology: Topology,
+    edge: Edge,
+    distance_edge: float,
+    direction: SignalDirection = SignalDirection.IN,
+    **kwargs,
+) -> Signal:
+    """Adds a Hauptsignal with the Block_Signal function (unless given in kwargs) to the Edge
+    and the Topology."""
+
+    kwargs.setdefault("function", SignalFunction.Block_Signal)
+    kwargs.setdefault("kind", SignalKind.Hauptsignal)
+    signal = Signal(edge, distance_edge, direction, **kwargs)
+    edge.signals.append(signal)
+    topology.add_signal(signal)
+    return signal
+
+
+def add_route(
+    topology: Topology, start_signal: Signal, end_signal: Signal, edges=(), **kwargs
+) -> Route:
+    """Adds a Route (created with kwargs) from start_signal over the Edges to end_signal."""
+
+    route = Route(start_signal, **kwargs)
+    route.edges.update(edges)
+    route.end_signal = end_signal
+    topology.add_route(route)
+    return route
+
+
+def create_turnout(**kwargs):
+    """H - T - L and T - R with the turnout T (head H), all Edges 100 long and created with
+    kwargs. Signals at 10 and 80 on H - T, 50 on T - L, 30 on T - R (all IN) and 60 on T - R
+    (GEGEN).
+
+    Returns the Topology, the Nodes (h, t, l, r), the Edges and the Signals."""
+
+    topology = Topology()
+    h, t, l, r = add_nodes(
+        topology,
+        (
+            Node(geo_node=DbrefGeoNode(*coordinates))
+            for coordinates in ((0, 0), (100, 0), (200, 10), (200, -10))
+        ),
+    )
+    kwargs.setdefault("length", 100.0)
+    edges = [
+        connect(topology, node_a, node_b, **kwargs) for node_a, node_b in ((h, t), (t, l), (t, r))
+    ]
+    signals = [
+        add_signal(topology, edge, distance, direction)
+        for edge, distance, direction in (
+            (edges[0], 10.0, SignalDirection.IN),
+            (edges[0], 80.0, SignalDirection.IN),
+            (edges[1], 50.0, SignalDirection.IN),
+            (edges[2], 30.0, SignalDirection.IN),
+            (edges[2], 60.0, SignalDirection.GEGEN),
+        )
+    ]
+    return topology, (h, t, l, r), edges, signals
@@ -0,0 +1,45 @@
+import yaramo
+from yaramo import instrumentation
+from yaramo.model import Node, Topology
+
+from .helpers import add_nodes, connect
+
+
+def _create_topology():
+    topology = Topology()
+    node_a, node_b = add_nodes(topology, (Node(), Node()))
+    connect(topology, node_a, node_b)
+    return topology
+
+
+def test_disabled_instrumentation_does_not_wrap_methods():
+    assert not instrumentation.is_enabled()
+    assert Topology.get_edge_by_nodes.__name__ == "get_edge_by_nodes"
+    assert "__wrapped__" not in Topology.__dict__["get_edge_by_nodes"].__dict__
+
+    topology = _create_topology()
+    before = yaramo.stats()
+    topology.to_json()
+    assert yaramo.stats() == before
+
+
+def test_profiling_counts_calls_and_emits_trace_events():
+    events = []
+    topology = _create_topology()
+    node_a, node_b = topology.nodes.values()
+
+    with yaramo.profiling(trace_hook=events.append) as report:
+        json_str = topology.to_json()
+        Topology.from_json(json_str)
+        topology.get_edge_by_nodes(node_a, node_b)
+        topology.get_edge_by_nodes(node_b, node_a)
+
+    assert not instrumentation.is_enabled()
+    assert report["Topology.to_serializable"]["calls"] == 1
+    assert report["Topology.from_json"]["calls"] == 1
+    assert report["Topology.get_edge_by_nodes"]["calls"] == 2
+    assert report["Topology.from_json"]["total_time"] >= 0
+
+    assert [event["name"] for event in events].count("Topology.get_edge_by_nodes") == 2
+    assert all({"name", "timestamp", "duration", "thread"} <= set(event) for event in events)
+    assert yaramo.stats()["Topology.get_edge_by_nodes"]["calls"] >= 2
@@ -0,0 +1,56 @@
+import pytest
+
+from yaramo.model import DbrefGeoNode, Node, Topology, Wgs84GeoNode
+
+from .helpers import add_nodes, connect
+
+
+def _create_station():
+    """A - E = X - B, where the turnouts E and X are connected by a main track (E left, X right)
+    and a siding over S (E right, X left)."""
+
+    topology = Topology()
+    a, e, s, x, b = add_nodes(topology, (Node() for _ in range(5)))
+    lengths = {(a, e): 200.0, (e, x): 100.0, (e, s): 60.0, (s, x): 60.0, (x, b): None}
+    edges = {
+        (node_a, node_b): connect(topology, node_a, node_b, length=length)
+        for (node_a, node_b), length in lengths.items()
+    }
+    e.connected_on_head, e.connected_on_left, e.connected_on_right = a, x, s
+    x.connected_on_head, x.connected_on_left, x.connected_on_right = b, s, e
+    return topology, (a, e, s, x, b), edges
+
+
+def test_layout_respects_turnouts_and_lengths():
+    topology, (a, e, s, x, b), edges = _create_station()
+    layout = topology.schematic_layout(default_length=150.0, tolerance=1e-4)
+    assert layout.error <= 1e-4
+    assert layout.apply(topology) == 5
+
+    for turnout in (e, x):
+        assert turnout.determine_anschluss_of_all_nodes() == (
+            turnout.connected_on_head,
+            turnout.connected_on_left,
+            turnout.connected_on_right,
+        )
+    for (node_a, node_b), edge in edges.items():
+        distance = node_a.geo_node.get_distance_to_other_geo_node(node_b.geo_node)
+        assert distance == pytest.approx(edge.length, rel=1e-3)
+    assert edges[x, b].length == pytest.approx(150.0, rel=1e-3)
+
+
+def test_layout_keeps_anchors():
+    topology, (a, e, s, x, b), edges = _create_station()
+    a.geo_node = DbrefGeoNode(1000.0, 5000.0)
+    b.geo_node = DbrefGeoNode(1000.0, 5400.0)
+    edges[x, b].length = 100.0
+    layout = topology.schematic_layout()
+    layout.apply(topology)
+
+    assert (a.geo_node.geo_point.x, b.geo_node.geo_point.y) == (1000.0, 5400.0)
+    assert e.geo_node.geo_point.y == pytest.approx(5200.0, abs=1.0)
+    assert x.determine_anschluss_of_all_nodes()[0] is b
+
+    a.geo_node = Wgs84GeoNode(52.0, 13.0)
+    with pytest.raises(ValueError):
+        topology.schematic_layout()
@@ -0,0 +1,104 @@
+from yaramo.lookahead import (
+    BUFFER_STOP,
+    END,
+    SIGNAL,
+    SPEED,
+    TURNOUT,
+    UNKNOWN_LENGTH,
+    VACANCY_SECTION,
+)
+from yaramo.model import Node, SignalDirection, Topology
+from yaramo.vacancy_section import VacancySection
+
+from .helpers import add_nodes, connect, create_turnout
+
+
+def _create_turnout():
+    """The turnout of create_turnout with all Edges passed with 80, the right branch with 40."""
+
+    topology, (h, t, l, r), edges, signals = create_turnout(maximum_speed=80)
+    t.connected_on_head, t.connected_on_left, t.connected_on_right = h, l, r
+    t.maximum_speed_on_right = 40
+    return topology, edges, signals
+
+
+def test_lookahead_events():
+    topology, (e1, e2, e3), (s1, s2, s3, s4, s5) = _create_turnout()
+    lookahead = topology.lookahead
+
+    assert lookahead.ahead(e1, 20.0, SignalDirection.IN) == [
+        (60.0, SIGNAL, s2, None),
+        (80.0, END, e1.node_b, TURNOUT),
+    ]
+    assert lookahead.ahead(e1, 20.0, SignalDirection.IN, path={e1, e3}) == [
+        (60.0, SIGNAL, s2, None),
+        (80.0, SPEED, e3, 40),
+        (110.0, SIGNAL, s4, None),
+        (180.0, END, e3.node_b, BUFFER_STOP),
+    ]
+    assert lookahead.ahead(e3, 70.0, SignalDirection.GEGEN, horizon=150.0) == [
+        (10.0, SIGNAL, s5, None),
+        (70.0, SPEED, e1, 40),
+    ]
+    assert lookahead.ahead(e1, 0.0, SignalDirection.IN, max_signals=1, path={e2}) == [
+        (10.0, SIGNAL, s1, None)
+    ]
+    assert lookahead.ahead_many(
+        [(e2, 0.0, SignalDirection.IN), (e1, 90.0, SignalDirection.IN, {e2})], horizon=60.0
+    ) == [[(50.0, SIGNAL, s3, None)], [(60.0, SIGNAL, s3, None)]]
+
+
+def test_lookahead_follows_changes():
+    topology, (e1, e2, e3), (s1, s2, s3, s4, s5) = _create_turnout()
+    lookahead = topology.lookahead
+    assert lookahead.ahead(e2, 60.0, SignalDirection.GEGEN) == [
+        (160.0, END, e1.node_a, BUFFER_STOP)
+    ]
+
+    section = VacancySection()
+    e1.vacancy_section = section
+    e1.maximum_speed = 60
+    topology.update_edge(e1)
+    e3.signals.remove(s5)
+    e2.signals.append(s5)
+    s5.edge = e2
+    topology.update_signal(s5)
+
+    assert lookahead.ahead(e2, 70.0, SignalDirection.GEGEN) == [
+        (10.0, SIGNAL, s5, None),
+        (70.0, SPEED, e1, 60),
+        (70.0, VACANCY_SECTION, section, None),
+        (170.0, END, e1.node_a, BUFFER_STOP),
+    ]
+    assert lookahead.ahead(e3, 90.0, SignalDirection.GEGEN) == [
+        (90.0, SPEED, e1, 40),
+        (90.0, VACANCY_SECTION, section, None),
+        (190.0, END, e1.node_a, BUFFER_STOP),
+    ]
+
+    topology.remove_signal(s5)
+    e2.signals.remove(s5)
+    topology.remove_edge(e3)
+    t = e1.node_b
+    t.connected_nodes.remove(e3.node_b)
+    t.connected_on_head = t.connected_on_left = t.connected_on_right = None
+    topology.update_node(t)
+    assert lookahead.ahead(e1, 20.0, SignalDirection.IN) == [
+        (60.0, SIGNAL, s2, None),
+        (80.0, SPEED, e2, 80),
+        (130.0, SIGNAL, s3, None),
+        (180.0, END, e2.node_b, BUFFER_STOP),
+    ]
+
+
+def test_lookahead_ends_at_unknown_length():
+    topology = Topology()
+    a, b, c = add_nodes(topology, (Node(), Node(), Node()))
+    ab, bc = connect(topology, a, b, length=100.0), connect(topology, b, c)
+
+    assert topology.lookahead.ahead(ab, 0.0, SignalDirection.IN) == [
+        (100.0, END, b, UNKNOWN_LENGTH)
+    ]
+    assert topology.lookahead.ahead(bc, 0.0, SignalDirection.GEGEN) == [
+        (0.0, END, c, UNKNOWN_LENGTH)
+    ]
@@ -0,0 +1,27 @@
+import subprocess
+import sys
+
+import pytest
+
+import yaramo.model
+
+
+def test_lazy_model_attributes():
+    from yaramo.node import Node
+
+    assert yaramo.model.Node is Node
+    assert "Topology" in dir(yaramo.model)
+    with pytest.raises(AttributeError):
+        yaramo.model.NotAModelClass
+
+
+def test_import_does_not_load_pyproj():
+    code = (
+        "import sys\n"
+        "from yaramo.model import Topology, Wgs84GeoNode\n"
+        "Topology.from_json(Topology().to_json())\n"
+        "assert 'pyproj' not in sys.modules\n"
+        "Wgs84GeoNode(52.39, 13.12).to_dbref()\n"
+        "assert 'pyproj' in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
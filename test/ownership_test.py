@@ -0,0 +1,91 @@
+import gc
+import pickle
+import weakref
+
+import pytest
+
+from benchmarks.generator import generate_topology
+from yaramo import ownership
+from yaramo.model import Topology, Trip
+
+
+@pytest.fixture
+def weak_layout():
+    ownership.enable()
+    yield
+    ownership.disable()
+
+
+@pytest.fixture
+def no_gc():
+    gc.collect()
+    gc.disable()
+    yield
+    gc.enable()
+
+
+def _references(topology):
+    return [
+        weakref.ref(element) for element in [*topology.nodes.values(), *topology.signals.values()]
+    ]
+
+
+def test_weak_layout_has_no_cycles(weak_layout, no_gc):
+    topology = generate_topology(stations=3, geo_nodes_per_line=5)
+
+    signal = next(iter(topology.signals.values()))
+    assert signal.edge is topology.edges[signal.edge.uuid]
+    assert signal in signal.edge.signals
+    node = next(node for node in topology.nodes.values() if len(node.connected_nodes) == 3)
+    assert isinstance(node.connected_nodes, ownership.WeakList)
+    assert node.connected_on_head in node.connected_nodes
+    route = next(iter(topology.routes.values()))
+    assert route.get_edges_in_order()[0] is route.start_signal.edge
+
+    reloaded = Topology.from_json(topology.to_json())
+    assert reloaded.fingerprint().digests["edges"] == topology.fingerprint().digests["edges"]
+    references = _references(topology)
+    del topology, reloaded, signal, node, route
+    assert all(reference() is None for reference in references)
+
+
+def test_convert_existing_topology(no_gc):
+    topology = generate_topology(stations=3, geo_nodes_per_line=5)
+    fingerprint = topology.fingerprint()
+    ownership.convert(topology)
+    assert topology.fingerprint() == fingerprint
+    assert not ownership.is_enabled()
+
+    node = next(iter(topology.nodes.values()))
+    node.connected_nodes.append(node)
+    node.connected_nodes.remove(node)
+    assert topology.fingerprint() == fingerprint
+    references = _references(topology)
+    del topology, node
+    assert all(reference() is None for reference in references)
+
+
+def test_builder_respects_weak_layout(weak_layout):
+    from yaramo.builder import TopologyBuilder
+
+    builder = TopologyBuilder()
+    builder.add_nodes([(52.0, 13.0), (52.0, 13.1)])
+    builder.add_edges([(0, 1)])
+    topology = builder.build()
+    node = next(iter(topology.nodes.values()))
+    assert isinstance(node.connected_nodes, ownership.WeakList)
+
+
+def test_weak_layout_pickles(weak_layout):
+    topology = generate_topology(stations=3, geo_nodes_per_line=5)
+    signal = next(iter(topology.signals.values()))
+    signal.trip = Trip([signal.edge])
+
+    reloaded = pickle.loads(pickle.dumps(topology))
+    assert reloaded.fingerprint() == topology.fingerprint()
+    reloaded_signal = reloaded.signals[signal.uuid]
+    assert reloaded_signal.edge is reloaded.edges[signal.edge.uuid]
+    assert reloaded_signal.trip.edges == [reloaded_signal.edge]
+    node = next(node for node in reloaded.nodes.values() if len(node.connected_nodes) == 3)
+    assert isinstance(node.connected_nodes, ownership.WeakList)
+    assert all(other is reloaded.nodes[other.uuid] for other in node.connected_nodes)
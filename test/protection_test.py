@@ -0,0 +1,89 @@
+from yaramo.model import Node, NodeConnectionDirection, SignalDirection, Topology
+from yaramo.protection import ProtectionCalculator
+
+from .helpers import add_nodes, add_route, add_signal, connect
+
+
+def _turnout(node, head, left, right):
+    node.connected_on_head, node.connected_on_left, node.connected_on_right = head, left, right
+
+
+def _create_station():
+    """n0 - n1 - t with left l - l2 (buffer stop) and right r - r2, where r2 is a turnout
+    entered on its left. All Edges are 100 long and lead away from n0."""
+
+    topology = Topology()
+    names = ["n0", "n1", "t", "l", "l2", "r", "r2", "x", "y"]
+    nodes = dict(zip(names, add_nodes(topology, (Node(name=name) for name in names))))
+    edges = {}
+    for name_a, name_b in [
+        ("n0", "n1"),
+        ("n1", "t"),
+        ("t", "l"),
+        ("t", "r"),
+        ("l", "l2"),
+        ("r", "r2"),
+        ("x", "r2"),
+        ("r2", "y"),
+    ]:
+        edges[name_a + name_b] = connect(topology, nodes[name_a], nodes[name_b], length=100.0)
+    _turnout(nodes["t"], nodes["n1"], nodes["l"], nodes["r"])
+    _turnout(nodes["r2"], nodes["x"], nodes["r"], nodes["y"])
+    return topology, nodes, edges
+
+
+def test_overlap_and_flank_protection():
+    topology, nodes, edges = _create_station()
+    start = add_signal(topology, edges["n0n1"], 50.0)
+    end = add_signal(topology, edges["tl"], 50.0)
+    route = add_route(topology, start, end, [edges["n1t"], edges["tl"]])
+
+    protection = topology.route_protection(overlap_length=120.0)[route.uuid]
+
+    assert [(s.edge, s.start, s.end) for s in protection.overlap.paths[0]] == [
+        (edges["tl"], 50.0, 100.0),
+        (edges["ll2"], 0.0, 70.0),
+    ]
+    [flank] = protection.flank_protection
+    assert flank.turnout is nodes["t"] and flank.branch is nodes["r"]
+    assert flank.turnouts == [(nodes["r2"], NodeConnectionDirection.Rechts)]
+    assert flank.signals == [] and flank.complete
+
+    # A main Signal facing the turnout protects before r2
+    signal = add_signal(topology, edges["tr"], 30.0, SignalDirection.GEGEN)
+    flank = ProtectionCalculator(topology).route_protection(route).flank_protection[0]
+    assert flank.signals == [signal] and flank.turnouts == []
+
+
+def test_overlap_branches_and_is_shared():
+    topology, nodes, edges = _create_station()
+    first = add_signal(topology, edges["n0n1"], 10.0)
+    second = add_signal(topology, edges["n0n1"], 20.0)
+    end = add_signal(topology, edges["n1t"], 50.0)
+    routes = [add_route(topology, start, end, [edges["n1t"]]) for start in (first, second)]
+
+    calculator = ProtectionCalculator(topology, overlap_length=200.0)
+    overlaps = [calculator.route_protection(route).overlap for route in routes]
+
+    assert overlaps[0] is overlaps[1]
+    assert len(overlaps[0].paths) == 2
+    assert overlaps[0].turnouts == [nodes["t"]]
+    assert {section.edge for path in overlaps[0].paths for section in path} == {
+        edges["n1t"],
+        edges["tl"],
+        edges["tr"],
+        edges["ll2"],
+        edges["rr2"],
+    }
+    assert all(sum(section.length for section in path) == 200.0 for path in overlaps[0].paths)
+
+
+def test_flank_search_length():
+    topology, nodes, edges = _create_station()
+    start = add_signal(topology, edges["n0n1"], 50.0)
+    end = add_signal(topology, edges["tl"], 50.0)
+    route = add_route(topology, start, end, [edges["n1t"], edges["tl"]])
+
+    calculator = ProtectionCalculator(topology, flank_search_length=150.0)
+    flank = calculator.route_protection(route).flank_protection[0]
+    assert not flank.complete and flank.turnouts == []
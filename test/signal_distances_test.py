@@ -0,0 +1,71 @@
+import pytest
+
+from yaramo.model import DbrefGeoNode, Node, Topology
+from yaramo.signal_distances import SignalDistanceTable
+
+from .helpers import add_nodes, add_signal, connect, create_turnout
+
+
+def test_distances_and_next_signals():
+    topology, _, _, (s1, s2, s3, s4, s5) = create_turnout()
+    distances = topology.signal_distances
+
+    assert distances.distance(s1, s2) == 70.0
+    assert distances.distance(s1, s3) == 140.0
+    assert distances.distance(s1, s4) == 120.0
+    assert distances.distance(s1, s5) is None
+    assert distances.distances_from(s5) == {}
+    assert distances.next_signals(s1) == {s2.uuid: 70.0}
+    assert distances.next_signals(s2) == {s3.uuid: 70.0, s4.uuid: 50.0}
+
+    short = SignalDistanceTable(topology, horizon=100.0)
+    assert short.distances_from(s1) == {s2.uuid: 70.0}
+
+
+def test_invalidation():
+    topology, _, (first, left, right), (s1, s2, s3, s4, s5) = create_turnout()
+    distances = topology.signal_distances
+    assert distances.distance(s1, s3) == 140.0
+
+    s3.distance_edge = 60.0
+    topology.update_signal(s3)
+    assert distances.distance(s1, s3) == 150.0
+
+    first.length = 120.0
+    topology.update_edge(first)
+    assert distances.distance(s1, s4) == pytest.approx(140.0)
+
+    topology.remove_edge(right)
+    assert distances.next_signals(s2) == {s3.uuid: 100.0}
+
+    topology.remove_signal(s2)
+    first.signals.remove(s2)
+    assert distances.next_signals(s1) == {s3.uuid: 170.0}
+
+
+def test_next_signals_over_rejoining_branches():
+    """h - t1 with the branches over a (100 long, with a Signal) and b (160 long, without)
+    rejoining at t2 - e."""
+
+    topology = Topology()
+    h, t1, a, b, t2, e = add_nodes(
+        topology,
+        (
+            Node(geo_node=DbrefGeoNode(*coordinates))
+            for coordinates in ((0, 0), (100, 0), (150, 10), (180, -20), (250, 0), (350, 0))
+        ),
+    )
+    first = connect(topology, h, t1, length=100.0)
+    t1_a = connect(topology, t1, a, length=50.0)
+    for node_a, node_b, length in ((a, t2, 50.0), (t1, b, 80.0), (b, t2, 80.0)):
+        connect(topology, node_a, node_b, length=length)
+    last = connect(topology, t2, e, length=100.0)
+    t1.connected_on_head, t1.connected_on_left, t1.connected_on_right = h, a, b
+    t2.connected_on_head, t2.connected_on_left, t2.connected_on_right = e, a, b
+    s0 = add_signal(topology, first, 10.0)
+    s1 = add_signal(topology, t1_a, 20.0)
+    s2 = add_signal(topology, last, 10.0)
+
+    distances = topology.signal_distances
+    assert distances.distance(s0, s2) == 200.0
+    assert distances.next_signals(s0) == {s1.uuid: 110.0, s2.uuid: 260.0}
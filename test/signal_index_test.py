@@ -0,0 +1,64 @@
+from benchmarks.generator import generate_topology
+from yaramo.additional_signal import AdditionalSignalZs3
+from yaramo.model import SignalDirection, SignalFunction, SignalKind, SignalState, SignalSystem
+
+
+def _scan(topology, predicate):
+    return {signal.uuid for signal in topology.signals.values() if predicate(signal)}
+
+
+def test_query_signals_matches_scan():
+    topology = generate_topology(stations=4, geo_nodes_per_line=2)
+
+    query = topology.query_signals().function(SignalFunction.Block_Signal)
+    assert query.uuids() == _scan(topology, lambda s: s.function == SignalFunction.Block_Signal)
+
+    query = (
+        topology.query_signals()
+        .kind(SignalKind.Hauptsignal)
+        .system(SignalSystem.Ks)
+        .direction(SignalDirection.GEGEN)
+    )
+    assert len(query) > 0
+    assert query.uuids() == _scan(
+        topology,
+        lambda s: s.kind == SignalKind.Hauptsignal and s.direction == SignalDirection.GEGEN,
+    )
+
+    query = topology.query_signals().function(
+        SignalFunction.Einfahr_Signal, SignalFunction.Ausfahr_Signal
+    )
+    assert query.uuids() == _scan(topology, lambda s: s.kind == SignalKind.Hauptsignal)
+
+    assert len(topology.query_signals().supporting(SignalState.HP0, SignalState.KS1)) == len(
+        topology.signals
+    )
+    assert len(topology.query_signals().supporting(SignalState.HP0, SignalState.ZS1)) == 0
+
+    block_in = (
+        topology.query_signals().function(SignalFunction.Block_Signal).direction(SignalDirection.IN)
+    )
+    first = block_in.first()
+    assert block_in.where(lambda s: s is first).all() == [first]
+
+
+def test_signal_index_is_kept_in_sync():
+    topology = generate_topology(stations=2, geo_nodes_per_line=2)
+    query = topology.query_signals().with_additional_signal(AdditionalSignalZs3)
+    assert len(query) == 0
+
+    signal = topology.query_signals().function(SignalFunction.Einfahr_Signal).first()
+    signal.additional_signals.append(
+        AdditionalSignalZs3([AdditionalSignalZs3.AdditionalSignalSymbolZs3.SIX])
+    )
+    topology.update_signal(signal)
+    assert query.all() == [signal]
+
+    topology.remove_signal(signal)
+    assert len(query) == 0
+    assert (
+        signal.uuid not in topology.query_signals().function(SignalFunction.Einfahr_Signal).uuids()
+    )
+
+    topology.add_signal(signal)
+    assert query.all() == [signal]
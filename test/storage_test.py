@@ -0,0 +1,112 @@
+from yaramo.additional_signal import AdditionalSignalZs3
+from yaramo.model import Node, SignalDirection, SignalState, Topology, Wgs84GeoNode
+from yaramo.storage import StoredNode, TopologyStore
+from yaramo.vacancy_section import VacancySection
+
+from .helpers import add_nodes, add_route, add_signal, connect
+
+
+def _create_line(count=10):
+    """count Nodes 0.01 degrees apart with a Signal on every Edge and one Route."""
+
+    topology = Topology()
+    nodes = add_nodes(
+        topology, (Node(geo_node=Wgs84GeoNode(52.0 + 0.01 * index, 13.0)) for index in range(count))
+    )
+    vacancy_section = VacancySection(name="section")
+    topology.add_vacancy_section(vacancy_section)
+    signals = []
+    for node_a, node_b in zip(nodes, nodes[1:]):
+        edge = connect(
+            topology,
+            node_a,
+            node_b,
+            length=1112.0,
+            vacancy_section=vacancy_section,
+            intermediate_geo_nodes=[Wgs84GeoNode(node_a.geo_node.geo_point.x + 0.005, 13.001)],
+        )
+        signal = add_signal(
+            topology,
+            edge,
+            100.0,
+            SignalDirection.GEGEN,
+            supported_states={SignalState.HP0, SignalState.HP1},
+        )
+        signal.additional_signals.append(
+            AdditionalSignalZs3([AdditionalSignalZs3.AdditionalSignalSymbolZs3.OFF])
+        )
+        signals.append(signal)
+    add_route(topology, signals[0], signals[1], [signals[1].edge], maximum_speed=80)
+    return topology, nodes
+
+
+def test_save_and_load_all(tmp_path):
+    topology, nodes = _create_line()
+    topology.to_sqlite(tmp_path / "topology.sqlite")
+
+    with TopologyStore(tmp_path / "topology.sqlite") as store:
+        stored = store.open()
+        stored.load_all()
+
+        assert stored.fingerprint() == topology.fingerprint()
+        signal = next(iter(stored.signals.values()))
+        assert signal.side_distance < 0
+        assert type(signal.additional_signals[0]) is AdditionalSignalZs3
+
+
+def test_partial_loading(tmp_path):
+    topology, nodes = _create_line()
+    topology.to_sqlite(tmp_path / "topology.sqlite")
+
+    with TopologyStore(tmp_path / "topology.sqlite") as store:
+        stored = store.open()
+        loaded = stored.load_bbox(52.015, 12.9, 52.035, 13.1)
+
+        assert {node.uuid for node in loaded} == {nodes[2].uuid, nodes[3].uuid}
+        assert len(stored.edges) == 3 and len(stored.signals) == 3
+        neighbour = stored.nodes[nodes[3].uuid].connected_nodes[1]
+        assert isinstance(neighbour, StoredNode) and not neighbour.is_loaded()
+
+        # Traversing the neighbour faults it in
+        assert neighbour.connected_nodes[1].uuid == nodes[5].uuid
+        assert neighbour.is_loaded() and neighbour.uuid in stored.nodes
+        assert stored.get_edge_by_nodes(neighbour, neighbour.connected_nodes[1]) is not None
+
+        neighbourhood = stored.load_neighbourhood(stored.load(nodes[0].uuid), depth=2)
+        assert len(neighbourhood) == 3
+        assert isinstance(stored.load(nodes[9].uuid), Node)
+        assert stored.load("unknown") is None
+
+
+def test_commit_writes_modified_elements(tmp_path):
+    topology, nodes = _create_line()
+    topology.to_sqlite(tmp_path / "topology.sqlite")
+
+    with TopologyStore(tmp_path / "topology.sqlite") as store:
+        stored = store.open()
+        stored.load_bbox(52.0, 12.9, 52.05, 13.1)
+        assert set(stored.commit().values()) == {0}
+
+        signal = next(iter(stored.signals.values()))
+        signal.distance_edge = 250.0
+        node = stored.nodes[nodes[1].uuid]
+        node.name = "station"
+        new_node = Node(geo_node=Wgs84GeoNode(51.99, 13.0))
+        stored.add_node(new_node)
+        changes = stored.commit()
+
+        assert changes == {
+            "nodes": 2,
+            "edges": 0,
+            "signals": 1,
+            "routes": 0,
+            "vacancy_sections": 0,
+        }
+
+    with TopologyStore(tmp_path / "topology.sqlite") as store:
+        stored = store.open()
+        assert stored.load(signal.uuid).distance_edge == 250.0
+        assert stored.load(node.uuid).name == "station"
+        assert stored.load_bbox(51.985, 12.9, 51.995, 13.1)[0].uuid == new_node.uuid
+        route = stored.load(next(iter(topology.routes)))
+        assert route.maximum_speed == 80 and route.start_signal.edge.uuid in stored.edges
@@ -0,0 +1,88 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from yaramo.model import Node, Topology, Trip
+from yaramo.timetable import (
+    EDGE,
+    ROUTE,
+    SECTION,
+    Claim,
+    IntervalTree,
+    detect_conflicts,
+    trip_claims,
+)
+from yaramo.vacancy_section import VacancySection
+
+from .helpers import add_nodes, add_route, add_signal, connect
+
+
+def _create_line():
+    """A - B - C - D, where the Edges B-C and C-D form one VacancySection and a Route."""
+
+    topology = Topology()
+    nodes = add_nodes(topology, (Node() for _ in range(4)))
+    section = VacancySection()
+    edges = [
+        connect(topology, node_a, node_b, length=100.0, vacancy_section=section if index else None)
+        for index, (node_a, node_b) in enumerate(zip(nodes, nodes[1:]))
+    ]
+    route = add_route(topology, add_signal(topology, edges[1], 10.0), None, edges[1:])
+    return topology, edges, section, route
+
+
+def test_trip_claims_merge_consecutive_edges():
+    topology, edges, section, route = _create_line()
+    claims = trip_claims(Trip(edges), [(0.0, 10.0), (10.0, 20.0), (20.0, 30.0)], topology)
+    windows = {claim.key: (claim.entry, claim.exit) for claim in claims}
+    assert windows[(SECTION, section.uuid)] == (10.0, 30.0)
+    assert windows[(ROUTE, route.uuid)] == (10.0, 30.0)
+    assert len(claims) == 3
+
+
+def test_interval_tree():
+    tree = IntervalTree()
+    claims = [Claim(str(index), (EDGE, "edge"), float(index), index + 1.5) for index in range(50)]
+    for claim in claims:
+        tree.add(claim)
+    assert len(tree) == 50
+    assert [claim.entry for claim in tree] == [float(index) for index in range(50)]
+    assert {claim.entry for claim in tree.overlapping(10.0, 12.0)} == {9.0, 10.0, 11.0}
+    tree.remove(claims[10])
+    assert {claim.entry for claim in tree.overlapping(10.0, 12.0)} == {9.0, 11.0}
+    assert tree.overlapping(51.0, 60.0) == []
+
+
+def test_conflict_detector():
+    topology, edges, section, route = _create_line()
+    detector = topology.conflict_detector()
+    first, second, third = Trip(edges), Trip(edges[:2]), Trip(edges[2:])
+
+    assert detector.add_trip(first, [(0.0, 10.0), (10.0, 20.0), (20.0, 30.0)]) == []
+    # Enters the first Edge after the first Trip left it, but the section while it is occupied
+    conflicts = detector.add_trip(second, [(10.0, 25.0), (25.0, 35.0)])
+    assert {conflict.key[0] for conflict in conflicts} == {SECTION, ROUTE}
+    assert all(conflict.trips == (first.uuid, second.uuid) for conflict in conflicts)
+    assert conflicts[0].start == 25.0 and conflicts[0].end == 30.0
+
+    assert detector.add_trip(third, [(30.0, 40.0)]) != []
+    detector.add_trip(second, [(25.0, 35.0), (35.0, 45.0)])
+    assert [conflict.trips for conflict in detector.trip_conflicts(second)] == [
+        (third.uuid, second.uuid)
+    ] * 2
+    detector.remove_trip(third)
+    assert detector.conflicts() == []
+
+    schedule = [
+        (first, [(0.0, 10.0), (10.0, 20.0), (20.0, 30.0)]),
+        (second, [(10.0, 25.0), (25.0, 35.0)]),
+        (third, [(30.0, 40.0)]),
+    ]
+    with ThreadPoolExecutor(2) as executor:
+        conflicts = detect_conflicts(schedule, topology, executor=executor, shards=3)
+    assert sorted((conflict.key[0], conflict.trips) for conflict in conflicts) == sorted(
+        [
+            (ROUTE, (first.uuid, second.uuid)),
+            (ROUTE, (second.uuid, third.uuid)),
+            (SECTION, (first.uuid, second.uuid)),
+            (SECTION, (second.uuid, third.uuid)),
+        ]
+    )
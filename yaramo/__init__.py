@@ -1 +1 @@
-
+from yaramo.instrumentation import profiling, stats  # pylint: noqa
@@ -1,15 +1,20 @@
 from enum import Enum
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 from yaramo.base_element import BaseElement
+from yaramo.bitset import EnumListAttribute, member_from_string, member_from_value
 
 
 class AdditionalSignal(BaseElement):
     """The baseclass for AddditionalSignals. Subclasses of AddditionalSignal can be referenced by Signals.
 
-    There are AdditionalSignalSymbols associated with each subclass of AdditionalSignal.
+    There are AdditionalSignalSymbols associated with each subclass of AdditionalSignal (its
+    symbol_enum). The symbols of an AdditionalSignal are stored compactly as an EnumList of the
+    symbol_enum, which behaves like a list. Assigned lists of symbols are converted.
     """
 
+    symbols = EnumListAttribute()
+
     def __init__(self, **kwargs) -> None:
         super().__init__(**kwargs)
 
@@ -21,7 +26,13 @@ class AdditionalSignal(BaseElement):
         """
 
         base, _ = super().to_serializable()
-        return {**base, "symbols": [str(symbol) for symbol in self.symbols]}, {}
+        return {**base, "symbols": self.symbols.strings()}, {}
+
+    @classmethod
+    def symbol_from_string(cls, string: str) -> Optional[Enum]:
+        """Returns the symbol of this kind with that name or string (e.g.
+        "AdditionalSignalSymbolZs3.ONE"), or None."""
+        return member_from_string(cls.symbol_enum, string)
 
 
 class AdditionalSignalZs1(AdditionalSignal):
@@ -35,6 +46,8 @@ class AdditionalSignalZs1(AdditionalSignal):
     class AdditionalSignalSymbolZs1(Enum):
         Zs1 = 0
 
+    symbol_enum = AdditionalSignalSymbolZs1
+
 
 class AdditionalSignalZs2(AdditionalSignal):
     def __init__(self, symbols: List["AdditionalSignalSymbolZs2"], **kwargs) -> None:
@@ -70,9 +83,12 @@ class AdditionalSignalZs2(AdditionalSignal):
         Z = 22
         off = 23
 
+    symbol_enum = AdditionalSignalSymbolZs2
+
 
 class AdditionalSignalZs2v(AdditionalSignal):
     AdditionalSignalSymbolZs2v = AdditionalSignalZs2.AdditionalSignalSymbolZs2
+    symbol_enum = AdditionalSignalSymbolZs2v
 
     def __init__(self, symbols: List["AdditionalSignalSymbolZs2v"], **kwargs) -> None:
         super().__init__(**kwargs)
@@ -110,12 +126,16 @@ class AdditionalSignalZs3(AdditionalSignal):
         SIXTEEN = 16
 
         @staticmethod
-        def from_number(number: int) -> "AdditionalSignalZs3":
-            return next(filter(lambda enum: enum.value == number, "AdditionalSignalSymbolZs3"))
+        def from_number(number: int) -> Optional["AdditionalSignalZs3.AdditionalSignalSymbolZs3"]:
+            """Returns the symbol showing number (a speed in 10 km/h), or None."""
+            return member_from_value(AdditionalSignalZs3.AdditionalSignalSymbolZs3, number)
+
+    symbol_enum = AdditionalSignalSymbolZs3
 
 
 class AdditionalSignalZs3v(AdditionalSignal):
     AdditionalSignalSymbolZs3v = AdditionalSignalZs3.AdditionalSignalSymbolZs3
+    symbol_enum = AdditionalSignalSymbolZs3v
 
     def __init__(self, symbols: List["AdditionalSignalSymbolZs3v"], **kwargs) -> None:
         super().__init__(**kwargs)
@@ -0,0 +1,214 @@
+"""Asyncio entry points for loading and saving topologies.
+
+File I/O, parsing and serialization run in an executor (the event loop's default thread pool
+unless another one is given), so that loading or saving a large model does not block the
+event loop. When streaming, the serialized model is handed over in chunks and the writer is
+drained after every chunk, so one large model does not monopolize a connection either.
+Neither direction streams the model itself, though: saving builds the whole serializable
+dictionary before the first chunk is encoded, and loading buffers all chunks before parsing.
+"""
+
+import asyncio
+import inspect
+import os
+import stat
+import tempfile
+from concurrent.futures import Executor
+from typing import AsyncIterable, Optional
+
+import simplejson as json
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def _iter_json_parts(value, encoder: json.JSONEncoder):
+    """Yields the JSON serialization of value in parts (one per list item or dictionary value),
+    as the encoder's iterencode returns a single part when using its speedups."""
+
+    if isinstance(value, dict):
+        yield "{"
+        for index, (key, item) in enumerate(value.items()):
+            yield ("" if index == 0 else ", ") + encoder.encode(str(key)) + ": "
+            if isinstance(item, (dict, list)):
+                yield from _iter_json_parts(item, encoder)
+            else:
+                yield encoder.encode(item)
+        yield "}"
+    elif isinstance(value, list):
+        yield "["
+        for index, item in enumerate(value):
+            yield ("" if index == 0 else ", ") + encoder.encode(item)
+        yield "]"
+    else:
+        yield encoder.encode(value)
+
+
+def _iter_json_chunks(element, chunk_size: int):
+    """Yields the JSON serialization of an element as encoded chunks of about chunk_size bytes.
+
+    Only the encoding is chunked: the element's whole to_serializable() dictionary is built
+    before the first chunk is yielded.
+    """
+
+    buffer, size = [], 0
+    encoder = json.JSONEncoder(iterable_as_array=True)
+    for part in _iter_json_parts(element.to_serializable()[0], encoder):
+        buffer.append(part)
+        size += len(part)
+        if size >= chunk_size:
+            yield "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def _file_mode(path: str | os.PathLike) -> int:
+    """The permission bits of the file at path, or the ones a newly created file would get."""
+
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def _write_file(element, path: str | os.PathLike, chunk_size: int):
+    """Writes the JSON serialization to a temporary file that atomically replaces path.
+
+    The temporary file gets the mode of the file it replaces (or the default mode of new files),
+    as mkstemp creates it readable by the owner only.
+    """
+
+    directory = os.path.dirname(os.path.abspath(path))
+    descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            for chunk in _iter_json_chunks(element, chunk_size):
+                file.write(chunk)
+        os.chmod(temporary_path, _file_mode(path))
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+
+def _read_file(path: str | os.PathLike) -> bytes:
+    with open(path, "rb") as file:
+        return file.read()
+
+
+async def load(
+    path: str | os.PathLike, executor: Optional[Executor] = None, topology_class=None
+) -> "Topology":
+    """Reads and parses the Topology stored as JSON at path."""
+
+    if topology_class is None:
+        from yaramo.topology import Topology as topology_class
+
+    loop = asyncio.get_running_loop()
+    data = await loop.run_in_executor(executor, _read_file, path)
+    return await loop.run_in_executor(executor, topology_class.from_json, data)
+
+
+async def save(
+    topology: "Topology",
+    path: str | os.PathLike,
+    executor: Optional[Executor] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+):
+    """Serializes the Topology and atomically writes it as JSON to path.
+
+    The Topology must not be modified until the returned coroutine is done.
+    """
+
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(executor, _write_file, topology, path, chunk_size)
+
+
+async def _iter_stream(stream, chunk_size: int) -> AsyncIterable[bytes]:
+    if hasattr(stream, "read"):
+        while chunk := await stream.read(chunk_size):
+            yield chunk
+    else:
+        async for chunk in stream:
+            yield chunk
+
+
+async def load_stream(
+    stream,
+    executor: Optional[Executor] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    topology_class=None,
+) -> "Topology":
+    """Reads a JSON serialized Topology chunk by chunk from an async byte stream and parses it.
+
+    The chunks are buffered until the end of the stream, as the Topology is parsed as a whole.
+
+    Parameters
+    ----------
+    stream:
+        An object with an async read(n) method (like asyncio.StreamReader)
+        or an async iterable of bytes
+    """
+
+    if topology_class is None:
+        from yaramo.topology import Topology as topology_class
+
+    chunks = [chunk async for chunk in _iter_stream(stream, chunk_size)]
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, topology_class.from_json, b"".join(chunks))
+
+
+async def save_stream(
+    topology: "Topology",
+    stream,
+    executor: Optional[Executor] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_pending_chunks: int = 4,
+):
+    """Serializes the Topology in the executor and writes it chunk by chunk to an async stream.
+
+    At most max_pending_chunks serialized chunks are buffered, so the serialization waits
+    for slow streams instead of building the whole document in memory.
+    The Topology must not be modified until the returned coroutine is done.
+
+    Parameters
+    ----------
+    stream:
+        An object with a write(bytes) method, which may return an awaitable, and an optional
+        async drain() method (like asyncio.StreamWriter)
+    """
+
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending_chunks)
+    cancelled = False
+    done = object()
+
+    def produce():
+        try:
+            for chunk in _iter_json_chunks(topology, chunk_size):
+                if cancelled:
+                    return
+                asyncio.run_coroutine_threadsafe(queue.put(chunk), loop).result()
+        finally:
+            asyncio.run_coroutine_threadsafe(queue.put(done), loop).result()
+
+    producer = loop.run_in_executor(executor, produce)
+    try:
+        while (chunk := await queue.get()) is not done:
+            result = stream.write(chunk)
+            if inspect.isawaitable(result):
+                await result
+            if hasattr(stream, "drain"):
+                await stream.drain()
+    except BaseException:
+        cancelled = True
+        while not producer.done():
+            # unblock the producer, so that it can notice the cancellation
+            if queue.empty():
+                await asyncio.sleep(0)
+            else:
+                queue.get_nowait()
+        raise
+    await producer
@@ -0,0 +1,229 @@
+"""Transactional batches of edits with deferred index maintenance.
+
+Within `with topology.batch() as batch:` the add_, remove_ and update_ methods of the Topology
+change its dictionaries immediately, but only record the operation instead of announcing it to
+the derived indexes (signal_index, connectivity, signal_distances, lookahead, edge_references).
+At the end of the block, the batch commits:
+
+1. The lengths of added and updated Edges and of the Edges at added and updated Nodes are
+   recomputed from their geometry (if all their GeoNodes are known).
+2. The net change of every element (an element added and removed again is no change) is
+   announced to the indexes that existed before the batch, once per element. Indexes built
+   within the batch are dropped and rebuilt on their next use.
+3. The maximum speeds of the Routes over changed Nodes and Edges and of added and updated
+   Routes are recomputed.
+
+If the block raises an exception, the batch rolls back instead: the dictionaries are restored
+and the elements announced with batch.modify get their previous attributes back. Modifications
+of elements that were not announced cannot be undone, so the attributes of an element have to
+be changed after batch.modify(element):
+
+    with topology.batch() as batch:
+        batch.modify(node).geo_node = DbrefGeoNode(10.0, 20.0)
+        topology.add_signal(signal)
+
+Within the batch, the derived indexes still reflect the state before the batch.
+"""
+
+from typing import Optional, TypeVar
+
+from yaramo.base_element import BaseElement
+from yaramo.fork import copy_attributes, dictionary_name
+
+T = TypeVar("T", bound=BaseElement)
+
+# The order in which the removals are announced, additions and updates are announced in reverse
+_REMOVAL_ORDER = ("trips", "routes", "signals", "edges", "nodes")
+_SINGULAR = {
+    "nodes": "node",
+    "edges": "edge",
+    "signals": "signal",
+    "routes": "route",
+    "trips": "trip",
+}
+_INDEXES = (
+    "_signal_index",
+    "_edge_references",
+    "_connectivity",
+    "_signal_distances",
+    "_lookahead",
+)
+
+
+class _Record(object):
+    """The state of an element before the batch and the operations on it."""
+
+    def __init__(self, previous: Optional[BaseElement]):
+        self.previous = previous
+        self.removed = False
+        self.updated = False
+
+
+class Batch(object):
+    """A transaction of edits of a Topology (see Topology.batch).
+
+    Parameters
+    ----------
+    update_lengths: bool
+        Whether the lengths of changed Edges are recomputed at commit (default is True)
+    update_speeds: bool
+        Whether the maximum speeds of affected Routes are recomputed at commit (default is True)
+    """
+
+    def __init__(
+        self, topology: "Topology", update_lengths: bool = True, update_speeds: bool = True
+    ):
+        self.topology = topology
+        self.update_lengths = update_lengths
+        self.update_speeds = update_speeds
+        self._records: dict[tuple[str, str], _Record] = {}
+        self._snapshots: dict[int, tuple[BaseElement, dict]] = {}
+        self._indexes: dict[str, object] = {}
+        self._depth = 0
+
+    def __enter__(self) -> "Batch":
+        outer = self.topology._batch
+        if outer is not None and outer is not self:
+            # Nested batches join the outer one
+            outer._depth += 1
+            return outer
+        if self._depth == 0:
+            self._indexes = {name: getattr(self.topology, name) for name in _INDEXES}
+            self.topology._batch = self
+        self._depth += 1
+        return self
+
+    def __exit__(self, error_type, error, traceback):
+        batch = self.topology._batch if self.topology._batch is not None else self
+        batch._depth -= 1
+        if batch._depth > 0:
+            return False
+        if error_type is None:
+            batch.commit()
+        else:
+            batch.rollback()
+        return False
+
+    def record(self, dictionary: str, element: BaseElement, operation: str):
+        """Records an add, remove or update operation before it changes the dictionary."""
+
+        key = dictionary, element.uuid
+        record = self._records.get(key)
+        if record is None:
+            record = self._records[key] = _Record(
+                getattr(self.topology, dictionary).get(element.uuid)
+            )
+        if operation == "remove":
+            record.removed = True
+        elif operation == "update":
+            record.updated = True
+
+    def modify(self, element: T) -> T:
+        """Remembers the attributes of an element of the Topology for a rollback and marks it
+        as updated. Returns the element."""
+
+        if id(element) not in self._snapshots:
+            self._snapshots[id(element)] = element, copy_attributes(element)
+        dictionary = dictionary_name(element)
+        if dictionary is not None and element.uuid in getattr(self.topology, dictionary):
+            self.record(dictionary, element, "update")
+        return element
+
+    def _finish(self):
+        """Ends the batch and drops the indexes built within it (they are rebuilt on their
+        next use)."""
+
+        topology = self.topology
+        topology._batch = None
+        for name, index in self._indexes.items():
+            if getattr(topology, name) is not index:
+                setattr(topology, name, index)
+        self._records.clear()
+        self._snapshots.clear()
+
+    def rollback(self):
+        """Restores the dictionaries and the elements announced with modify."""
+
+        topology = self.topology
+        for (dictionary, uuid), record in self._records.items():
+            elements = getattr(topology, dictionary)
+            if record.previous is not None:
+                elements[uuid] = record.previous
+            else:
+                elements.pop(uuid, None)
+        for element, attributes in self._snapshots.values():
+            element.__dict__.clear()
+            element.__dict__.update(attributes)
+        self._finish()
+
+    def commit(self):
+        """Recomputes the lengths, announces the net changes to the indexes and recomputes the
+        speeds of the Routes."""
+
+        topology = self.topology
+        removed: dict[str, list] = {dictionary: [] for dictionary in _REMOVAL_ORDER}
+        added: dict[str, list] = {dictionary: [] for dictionary in _REMOVAL_ORDER}
+        updated: dict[str, dict] = {dictionary: {} for dictionary in _REMOVAL_ORDER}
+        for (dictionary, uuid), record in self._records.items():
+            if dictionary not in removed:
+                continue
+            current = getattr(topology, dictionary).get(uuid)
+            replaced = current is not record.previous or record.removed
+            if record.previous is not None and replaced:
+                removed[dictionary].append(record.previous)
+            if current is not None and replaced:
+                added[dictionary].append(current)
+            elif current is not None and record.updated:
+                updated[dictionary][uuid] = current
+
+        changed_nodes = {node.uuid for node in [*added["nodes"], *updated["nodes"].values()]}
+        changed_edges = {edge.uuid: edge for edge in [*added["edges"], *updated["edges"].values()]}
+        if changed_nodes:
+            for edge in topology.edges.values():
+                if edge.node_a.uuid in changed_nodes or edge.node_b.uuid in changed_nodes:
+                    changed_edges.setdefault(edge.uuid, edge)
+
+        if self.update_lengths:
+            added_edges = {edge.uuid for edge in added["edges"]}
+            for uuid, edge in changed_edges.items():
+                geo_nodes = [
+                    edge.node_a.geo_node,
+                    *edge.intermediate_geo_nodes,
+                    edge.node_b.geo_node,
+                ]
+                if any(geo_node is None for geo_node in geo_nodes):
+                    continue
+                length = edge.length
+                edge.update_length()
+                if edge.length != length and uuid not in added_edges:
+                    updated["edges"][uuid] = edge
+
+        self._finish()
+        if topology._connectivity is not None:
+            # Turnout orientations may have changed without being announced
+            topology._connectivity.invalidate_directions()
+        for dictionary in _REMOVAL_ORDER:
+            remove = getattr(topology, f"remove_{_SINGULAR[dictionary]}")
+            for element in removed[dictionary]:
+                remove(element)
+        for dictionary in reversed(_REMOVAL_ORDER):
+            add = getattr(topology, f"add_{_SINGULAR[dictionary]}")
+            for element in added[dictionary]:
+                add(element)
+        for dictionary in reversed(_REMOVAL_ORDER):
+            update = getattr(topology, f"update_{_SINGULAR[dictionary]}")
+            for element in updated[dictionary].values():
+                update(element)
+
+        if self.update_speeds:
+            routes = {
+                route.uuid: route for route in [*added["routes"], *updated["routes"].values()]
+            }
+            if changed_edges:
+                references = topology.edge_references
+                for uuid in changed_edges:
+                    for route_uuid in references.routes(uuid):
+                        routes.setdefault(route_uuid, topology.routes[route_uuid])
+            for route in routes.values():
+                if route.end_signal is not None:
+                    route.update_maximum_speed()
@@ -0,0 +1,412 @@
+"""Compact sets of Enum members stored as integer bitmasks.
+
+Signal.supported_states is an EnumSet: a mutable set of the members of one Enum, stored as an
+int with one bit per member (in the order of their definition). It behaves like a set of the
+members, but takes a fraction of the memory of a set and is combined (|, &, -, ^, <=) with
+single integer operations. The symbols of the AdditionalSignals keep their order and are
+EnumLists, which behave like lists of the members, but store one byte per member.
+
+The positions, strings and values of the members of an Enum are computed once per Enum and
+kept in lookup tables (see lookup_table), so that members are found by their name, string or
+value in constant time:
+
+    state = member_from_string(SignalState, "SignalState.HP0")
+    symbol = AdditionalSignalZs3.AdditionalSignalSymbolZs3.from_number(8)
+
+BitColumns store one bit per row (e.g. per Signal in the SignalIndex) and answer which rows
+have a bit set in all (or any) of several columns with whole-column integer operations.
+"""
+
+import logging
+import threading
+from array import array
+from collections.abc import Iterable, Iterator, MutableSequence, MutableSet, Sequence
+from enum import Enum
+from itertools import compress
+from typing import Optional
+
+_tables: dict[type, "LookupTable"] = {}
+_tables_lock = threading.Lock()
+
+_BINARY_DIGITS = bytes.maketrans(b"01", b"\x00\x01")
+
+
+def _lowest_bits(mask: int) -> Iterator[int]:
+    while mask:
+        lowest = mask & -mask
+        yield lowest
+        mask ^= lowest
+
+
+class LookupTable(object):
+    """The bit positions, strings and values of the members of an Enum."""
+
+    def __init__(self, enum_class: type):
+        self.enum_class = enum_class
+        self.members: list[Enum] = list(enum_class)
+        self.bits: dict[Enum, int] = {member: 1 << bit for bit, member in enumerate(self.members)}
+        self.strings: list[str] = [str(member) for member in self.members]
+        self.by_string: dict[str, Enum] = {}
+        for member in self.members:
+            self.by_string[member.name] = member
+            self.by_string[f"{enum_class.__name__}.{member.name}"] = member
+        self.by_string.update(zip(self.strings, self.members))
+        self.by_value: dict[object, Enum] = {member.value: member for member in self.members}
+        self.positions: dict[Enum, int] = {member: bit for bit, member in enumerate(self.members)}
+
+    def mask(self, members: Iterable) -> int:
+        """The bitmask of members, which may also be given by their strings."""
+
+        bits = self.bits
+        mask = 0
+        for member in members:
+            bit = bits.get(member)
+            if bit is None:
+                bit = bits[self.member(member)]
+            mask |= bit
+        return mask
+
+    def member(self, value) -> Enum:
+        """The member itself or the member with the string value (raises a ValueError)."""
+
+        if isinstance(value, self.enum_class):
+            return value
+        if isinstance(value, str) and value in self.by_string:
+            return self.by_string[value]
+        raise ValueError(f"{value!r} is not a {self.enum_class.__name__}")
+
+    def known(self, values: Iterable) -> Iterator:
+        """The values that are members or strings of members; unknown strings are skipped with a
+        warning (like SignalState.get_state_by_string), other values raise a ValueError."""
+
+        for value in values:
+            if isinstance(value, str) and value not in self.by_string:
+                logging.warning(
+                    f"The {self.enum_class.__name__} with the string {value} does not exist. "
+                    "It is skipped"
+                )
+                continue
+            yield value
+
+    def decode(self, mask: int) -> Iterator[Enum]:
+        members = self.members
+        for lowest in _lowest_bits(mask):
+            yield members[lowest.bit_length() - 1]
+
+
+def lookup_table(enum_class: type) -> LookupTable:
+    table = _tables.get(enum_class)
+    if table is None:
+        with _tables_lock:
+            table = _tables.setdefault(enum_class, LookupTable(enum_class))
+    return table
+
+
+def member_from_string(enum_class: type, string: str) -> Optional[Enum]:
+    """Returns the member of enum_class with that name or string (e.g. "HP0" or
+    "SignalState.HP0"), or None."""
+    return lookup_table(enum_class).by_string.get(string)
+
+
+def member_from_value(enum_class: type, value) -> Optional[Enum]:
+    """Returns the member of enum_class with that value, or None."""
+    return lookup_table(enum_class).by_value.get(value)
+
+
+class EnumSet(MutableSet):
+    """A mutable set of the members of one Enum, stored as a bitmask.
+
+    Parameters
+    ----------
+    enum_class: type
+        The Enum of the members
+    members: Iterable
+        The initial members, which may also be given by their strings (e.g. "SignalState.HP0")
+    """
+
+    __slots__ = ("enum_class", "mask")
+
+    def __init__(self, enum_class: type, members: Iterable = ()):
+        self.enum_class = enum_class
+        self.mask = lookup_table(enum_class).mask(members)
+
+    @classmethod
+    def from_mask(cls, enum_class: type, mask: int) -> "EnumSet":
+        enum_set = cls.__new__(cls)
+        enum_set.enum_class = enum_class
+        enum_set.mask = mask
+        return enum_set
+
+    def _from_iterable(self, iterable: Iterable) -> "EnumSet":
+        return EnumSet(self.enum_class, iterable)
+
+    def _other_mask(self, other) -> Optional[int]:
+        if isinstance(other, EnumSet) and other.enum_class is self.enum_class:
+            return other.mask
+        return None
+
+    def __contains__(self, member) -> bool:
+        bit = lookup_table(self.enum_class).bits.get(member)
+        return bit is not None and self.mask & bit != 0
+
+    def __iter__(self) -> Iterator[Enum]:
+        return lookup_table(self.enum_class).decode(self.mask)
+
+    def __len__(self) -> int:
+        return self.mask.bit_count()
+
+    def add(self, member):
+        self.mask |= lookup_table(self.enum_class).mask((member,))
+
+    def discard(self, member):
+        bit = lookup_table(self.enum_class).bits.get(member)
+        if bit is not None:
+            self.mask &= ~bit
+
+    def clear(self):
+        self.mask = 0
+
+    def copy(self) -> "EnumSet":
+        return EnumSet.from_mask(self.enum_class, self.mask)
+
+    def update(self, *iterables: Iterable):
+        table = lookup_table(self.enum_class)
+        for iterable in iterables:
+            mask = self._other_mask(iterable)
+            self.mask |= table.mask(iterable) if mask is None else mask
+
+    def strings(self) -> list[str]:
+        """The strings of the members (str(member)) in the order of their definition."""
+        table = lookup_table(self.enum_class)
+        return [table.strings[lowest.bit_length() - 1] for lowest in _lowest_bits(self.mask)]
+
+    def __eq__(self, other) -> bool:
+        mask = self._other_mask(other)
+        if mask is not None:
+            return self.mask == mask
+        return super().__eq__(other)
+
+    __hash__ = None
+
+    def __le__(self, other) -> bool:
+        mask = self._other_mask(other)
+        if mask is not None:
+            return self.mask & ~mask == 0
+        return super().__le__(other)
+
+    def __ge__(self, other) -> bool:
+        mask = self._other_mask(other)
+        if mask is not None:
+            return mask & ~self.mask == 0
+        return super().__ge__(other)
+
+    def _combine(self, other, operation) -> "EnumSet":
+        mask = self._other_mask(other)
+        if mask is None:
+            if not isinstance(other, Iterable):
+                return NotImplemented
+            mask = lookup_table(self.enum_class).mask(other)
+        return EnumSet.from_mask(self.enum_class, operation(self.mask, mask))
+
+    def __or__(self, other) -> "EnumSet":
+        return self._combine(other, int.__or__)
+
+    def __and__(self, other) -> "EnumSet":
+        return self._combine(other, int.__and__)
+
+    def __sub__(self, other) -> "EnumSet":
+        return self._combine(other, lambda mask, other_mask: mask & ~other_mask)
+
+    def __xor__(self, other) -> "EnumSet":
+        return self._combine(other, int.__xor__)
+
+    __ror__ = __or__
+    __rand__ = __and__
+    __rxor__ = __xor__
+
+    def __repr__(self):
+        if not self.mask:
+            return "set()"
+        return "{" + ", ".join(repr(member) for member in self) + "}"
+
+    def __reduce__(self):
+        return EnumSet.from_mask, (self.enum_class, self.mask)
+
+
+class EnumList(MutableSequence):
+    """A mutable list of the members of one Enum, stored as an array of their positions.
+
+    Parameters
+    ----------
+    enum_class: type
+        The Enum of the members
+    members: Iterable
+        The initial members, which may also be given by their strings (e.g.
+        "AdditionalSignalSymbolZs3.ONE")
+    """
+
+    __slots__ = ("enum_class", "_positions")
+
+    def __init__(self, enum_class: type, members: Iterable = ()):
+        self.enum_class = enum_class
+        table = lookup_table(enum_class)
+        self._positions = array(
+            "B" if len(table.members) <= 256 else "H", map(self._position, members)
+        )
+
+    def _position(self, member) -> int:
+        table = lookup_table(self.enum_class)
+        position = table.positions.get(member)
+        return position if position is not None else table.positions[table.member(member)]
+
+    def __getitem__(self, index):
+        members = lookup_table(self.enum_class).members
+        if isinstance(index, slice):
+            return [members[position] for position in self._positions[index]]
+        return members[self._positions[index]]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            self._positions[index] = array(self._positions.typecode, map(self._position, value))
+        else:
+            self._positions[index] = self._position(value)
+
+    def __delitem__(self, index):
+        del self._positions[index]
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __iter__(self) -> Iterator[Enum]:
+        members = lookup_table(self.enum_class).members
+        return (members[position] for position in self._positions)
+
+    def __contains__(self, member) -> bool:
+        position = lookup_table(self.enum_class).positions.get(member)
+        return position is not None and position in self._positions
+
+    def insert(self, index: int, value):
+        self._positions.insert(index, self._position(value))
+
+    def copy(self) -> "EnumList":
+        copy = EnumList.__new__(EnumList)
+        copy.enum_class = self.enum_class
+        copy._positions = array(self._positions.typecode, self._positions)
+        return copy
+
+    @property
+    def mask(self) -> int:
+        mask = 0
+        for position in self._positions:
+            mask |= 1 << position
+        return mask
+
+    def strings(self) -> list[str]:
+        """The strings of the members (str(member)) in their order."""
+        strings = lookup_table(self.enum_class).strings
+        return [strings[position] for position in self._positions]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, EnumList):
+            return self.enum_class is other.enum_class and self._positions == other._positions
+        if isinstance(other, (list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __reduce__(self):
+        return EnumList, (self.enum_class, list(self))
+
+
+class EnumSetAttribute(object):
+    """A descriptor storing the assigned members as an EnumSet in the instance dictionary.
+    Unknown strings among the assigned members are skipped with a warning.
+
+    Parameters
+    ----------
+    enum_class: type
+        The Enum of the members, or None for the Enum in the symbol_enum attribute of the class
+        of the instance
+    """
+
+    container = EnumSet
+
+    def __init__(self, enum_class: Optional[type] = None):
+        self.enum_class = enum_class
+
+    def __set_name__(self, owner: type, name: str):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        try:
+            return instance.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name) from None
+
+    def __set__(self, instance, value: Optional[Iterable]):
+        enum_class = self.enum_class or type(instance).symbol_enum
+        if not (isinstance(value, self.container) and value.enum_class is enum_class):
+            value = self.container(enum_class, lookup_table(enum_class).known(value or ()))
+        instance.__dict__[self.name] = value
+
+
+class EnumListAttribute(EnumSetAttribute):
+    """A descriptor storing the assigned members as an EnumList in the instance dictionary,
+    see EnumSetAttribute."""
+
+    container = EnumList
+
+
+class BitColumns(object):
+    """One column of bits per key over rows numbered from 0 (e.g. the SignalStates supported
+    by the Signals in a SignalIndex)."""
+
+    def __init__(self):
+        self._columns: dict[object, bytearray] = {}
+
+    def set(self, key, row: int):
+        column = self._columns.setdefault(key, bytearray())
+        byte = row >> 3
+        if byte >= len(column):
+            column.extend(bytes(byte + 1 - len(column)))
+        column[byte] |= 1 << (row & 7)
+
+    def clear(self, key, row: int):
+        column = self._columns.get(key)
+        if column is not None and row >> 3 < len(column):
+            column[row >> 3] &= ~(1 << (row & 7)) & 0xFF
+
+    def mask(self, key) -> int:
+        column = self._columns.get(key)
+        return int.from_bytes(column, "little") if column else 0
+
+    def all(self, keys: Iterable) -> int:
+        """The bitmask of the rows with a bit in every column of keys."""
+        result = None
+        for key in keys:
+            mask = self.mask(key)
+            result = mask if result is None else result & mask
+            if not result:
+                return 0
+        return result or 0
+
+    def any(self, keys: Iterable) -> int:
+        """The bitmask of the rows with a bit in at least one column of keys."""
+        result = 0
+        for key in keys:
+            result |= self.mask(key)
+        return result
+
+
+def select(values: Sequence, mask: int) -> Iterator:
+    """The values in the rows of a bitmask, in ascending order."""
+
+    # One byte per row (0 or 1), the least significant bit first
+    flags = bin(mask)[:1:-1].encode().translate(_BINARY_DIGITS)
+    return compress(values, flags)
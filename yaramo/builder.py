@@ -0,0 +1,261 @@
+"""Bulk construction of Topologies.
+
+Converters usually create elements one by one, which spends most of the time in the
+constructors (parsing enum strings, generating a uuid4 per element and per GeoPoint).
+The TopologyBuilder takes whole batches of coordinates, edge endpoints and signal positions,
+passes the already parsed enum members to the constructors and derives all uuids from one seed.
+Optionally, the cyclic garbage collector is paused while a batch is created, as it would
+otherwise run many full collections over the growing object graph.
+"""
+
+import gc
+import random
+import uuid
+from contextlib import contextmanager
+from functools import wraps
+from typing import Iterable, Optional, Sequence
+
+from yaramo.bitset import EnumSet
+from yaramo.edge import Edge
+from yaramo.geo_node import GeoNode, Wgs84GeoNode
+from yaramo.node import Node
+from yaramo.signal import Signal, SignalFunction, SignalKind, SignalState, SignalSystem
+from yaramo.topology import Topology
+
+
+@contextmanager
+def paused_gc():
+    """Disables the cyclic garbage collector within the context (if it was enabled). This
+    affects the whole process, including other threads."""
+
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _pausing_gc(method):
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self.pause_gc:
+            return method(self, *args, **kwargs)
+        with paused_gc():
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class BatchIds(object):
+    """Generates uuid strings: a random uuid4 prefix followed by a counter.
+
+    The prefix is drawn from the system random source once per instance, or derived from the
+    seed if one is given, in which case the same seed always yields the same sequence.
+    Generating an id is a string format instead of reading the system random source.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        if seed is None:
+            prefix = uuid.uuid4()
+        else:
+            prefix = uuid.UUID(int=random.Random(seed).getrandbits(128), version=4)
+        self._prefix = str(prefix)[:24]
+        self._counter = 0
+
+    def take(self, count: int) -> list[str]:
+        prefix, start = self._prefix, self._counter
+        self._counter += count
+        return [f"{prefix}{index:012x}" for index in range(start, start + count)]
+
+    def next(self) -> str:
+        return self.take(1)[0]
+
+
+class TopologyBuilder(object):
+    """Builds a Topology from bulk inputs.
+
+    Nodes, Edges and Signals are referred to by the index they were added with (the ranges
+    returned by the add methods). Inputs may be any iterables, e.g. lists of tuples or the rows
+    of a two dimensional array.
+
+    Example
+    -------
+    builder = TopologyBuilder(seed=42)
+    nodes = builder.add_nodes([(52.0, 13.0), (52.0, 13.1), (52.0, 13.2)])
+    edges = builder.add_edges([(0, 1), (1, 2)])
+    builder.add_signals([(edges[0], 50.0, SignalDirection.IN)], SignalFunction.Block_Signal)
+    topology = builder.build()
+    """
+
+    def __init__(
+        self,
+        seed: Optional[int] = None,
+        geo_node_class: type[GeoNode] = Wgs84GeoNode,
+        topology: Optional[Topology] = None,
+        pause_gc: bool = False,
+    ):
+        """
+        Parameters
+        ----------
+        seed: int
+            The seed of the generated uuids, builders with the same seed generate the same
+            uuids (default is None, a random prefix per builder)
+        geo_node_class: type[GeoNode]
+            Wgs84GeoNode (x is the latitude, y the longitude) or DbrefGeoNode
+        topology: Topology
+            An existing Topology the elements are added to (default is a new Topology)
+        pause_gc: bool
+            Whether the cyclic garbage collector is paused while a batch is added, which
+            affects the whole process, see paused_gc (default is False)
+        """
+
+        self.ids = BatchIds(seed)
+        self.geo_node_class = geo_node_class
+        self.pause_gc = pause_gc
+        self.topology = topology if topology is not None else Topology(uuid=self.ids.next())
+        self.nodes: list[Node] = []
+        self.edges: list[Edge] = []
+        self.signals: list[Signal] = []
+
+    def _geo_nodes(self, coordinates: Iterable[Sequence[float]]) -> list[GeoNode]:
+        coordinates = list(coordinates)
+        ids = self.ids.take(2 * len(coordinates))
+        geo_node_class = self.geo_node_class
+        return [
+            geo_node_class(x, y, uuid=ids[2 * index + 1], geo_point_uuid=ids[2 * index])
+            for index, (x, y) in enumerate(coordinates)
+        ]
+
+    @_pausing_gc
+    def add_nodes(self, coordinates: Iterable[Optional[Sequence[float]]]) -> range:
+        """Adds a Node for every (x, y) coordinate pair (or None for a Node without GeoNode)
+        and returns the range of their indices."""
+
+        coordinates = list(coordinates)
+        located = [pair for pair in coordinates if pair is not None]
+        geo_nodes = iter(self._geo_nodes(located))
+        ids = self.ids.take(len(coordinates))
+        add_node = self.topology.add_node
+        start = len(self.nodes)
+        for node_uuid, pair in zip(ids, coordinates):
+            node = Node(uuid=node_uuid, geo_node=next(geo_nodes) if pair is not None else None)
+            self.nodes.append(node)
+            add_node(node)
+        return range(start, len(self.nodes))
+
+    @_pausing_gc
+    def add_edges(
+        self,
+        endpoints: Iterable[Sequence[int]],
+        intermediate_coordinates: Optional[Iterable[Iterable[Sequence[float]]]] = None,
+        lengths: Optional[Iterable[Optional[float]]] = None,
+        maximum_speeds: Optional[Iterable[Optional[int]]] = None,
+    ) -> range:
+        """Adds an Edge for every pair of Node indices (node_a, node_b), connects the Nodes
+        and returns the range of the Edges' indices.
+
+        Parameters
+        ----------
+        intermediate_coordinates: Iterable[Iterable[Sequence[float]]]
+            The coordinates of the intermediate GeoNodes of every Edge (default is None)
+        lengths, maximum_speeds: Iterable[Optional[float]]
+            The length and maximum_speed of every Edge (default is None)
+        """
+
+        endpoints = list(endpoints)
+        count = len(endpoints)
+        intermediate_coordinates = (
+            list(intermediate_coordinates) if intermediate_coordinates is not None else None
+        )
+        lengths = list(lengths) if lengths is not None else [None] * count
+        maximum_speeds = list(maximum_speeds) if maximum_speeds is not None else [None] * count
+        if len(lengths) != count or len(maximum_speeds) != count:
+            raise ValueError("lengths and maximum_speeds must have one value per Edge")
+        if intermediate_coordinates is not None and len(intermediate_coordinates) != count:
+            raise ValueError("intermediate_coordinates must have one entry per Edge")
+
+        ids = self.ids.take(count)
+        nodes, add_edge = self.nodes, self.topology.add_edge
+        start = len(self.edges)
+        for index, (a, b) in enumerate(endpoints):
+            node_a, node_b = nodes[a], nodes[b]
+            edge = Edge(
+                node_a,
+                node_b,
+                length=lengths[index],
+                intermediate_geo_nodes=(
+                    self._geo_nodes(intermediate_coordinates[index])
+                    if intermediate_coordinates is not None
+                    else None
+                ),
+                maximum_speed=maximum_speeds[index],
+                uuid=ids[index],
+            )
+            node_a.connected_nodes.append(node_b)
+            node_b.connected_nodes.append(node_a)
+            self.edges.append(edge)
+            add_edge(edge)
+        return range(start, len(self.edges))
+
+    @_pausing_gc
+    def add_signals(
+        self,
+        positions: Iterable[Sequence],
+        function: SignalFunction = SignalFunction.Block_Signal,
+        kind: SignalKind = SignalKind.Hauptsignal,
+        system: SignalSystem = SignalSystem.andere,
+        supported_states: Iterable[SignalState] = (),
+        side_distance: float = 3.950,
+        classification_number: str = "60",
+    ) -> range:
+        """Adds a Signal for every (edge index, distance_edge, SignalDirection) and returns the
+        range of their indices. All Signals of one call share the other attributes.
+
+        Parameters
+        ----------
+        side_distance: float
+            The side distance of Signals in direction IN, the Signal constructor negates it for
+            direction GEGEN
+        """
+
+        positions = list(positions)
+        ids = self.ids.take(2 * len(positions))
+        supported_states = EnumSet(SignalState, supported_states)
+        edges, add_signal = self.edges, self.topology.add_signal
+        start = len(self.signals)
+        for index, (edge_index, distance_edge, direction) in enumerate(positions):
+            edge = edges[edge_index]
+            signal = Signal(
+                edge,
+                distance_edge,
+                direction,
+                function,
+                kind,
+                system,
+                side_distance=side_distance,
+                supported_states=supported_states.copy(),
+                classification_number=classification_number,
+                uuid=ids[2 * index],
+                control_member_uuid=ids[2 * index + 1],
+            )
+            edge.signals.append(signal)
+            self.signals.append(signal)
+            add_signal(signal)
+        return range(start, len(self.signals))
+
+    def build(self, compute_lengths: bool = False) -> Topology:
+        """Returns the Topology with all added elements.
+
+        Parameters
+        ----------
+        compute_lengths: bool
+            Whether update_length is called on the Edges without a length (default is False)
+        """
+
+        if compute_lengths:
+            for edge in self.edges:
+                if edge.length is None:
+                    edge.update_length()
+        return self.topology
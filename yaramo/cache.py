@@ -0,0 +1,178 @@
+"""An on-disk cache for data derived from a Topology.
+
+Results are stored per Topology fingerprint, so a pipeline step that reloads an unchanged
+model finds the results computed by a previous step, run or process. The cache directory is
+bounded in size; the least recently used entries are evicted first.
+"""
+
+import os
+import pickle
+import tempfile
+from hashlib import blake2b
+from typing import Callable, Optional
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+_SUFFIX = ".cache"
+
+
+class DerivedDataCache(object):
+    """A size-bounded directory of pickled values, keyed by a Topology fingerprint and a name.
+
+    Writes are atomic, so several processes can share the directory. Reading an entry marks it
+    as recently used.
+    """
+
+    def __init__(self, directory: str | os.PathLike, max_size: int = DEFAULT_MAX_SIZE):
+        """
+        Parameters
+        ----------
+        directory: str | os.PathLike
+            The cache directory, it is created if necessary
+        max_size: int
+            The maximum total size of all entries in bytes (default is 256 MiB)
+        """
+
+        self.directory = os.fspath(directory)
+        self.max_size = max_size
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str, name: str) -> str:
+        digest = blake2b(f"{key}\0{name}".encode("utf-8"), digest_size=16).hexdigest()
+        return os.path.join(self.directory, digest + _SUFFIX)
+
+    @staticmethod
+    def _key(key) -> str:
+        # A TopologyFingerprint or its hexdigest
+        return key if isinstance(key, str) else key.hexdigest()
+
+    def get(self, key, name: str, default=None):
+        path = self._path(self._key(key), name)
+        try:
+            with open(path, "rb") as file:
+                value = pickle.load(file)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return default
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return value
+
+    def __contains__(self, key_and_name: tuple) -> bool:
+        key, name = key_and_name
+        return os.path.exists(self._path(self._key(key), name))
+
+    def set(self, key, name: str, value):
+        descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, self._path(self._key(key), name))
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+        self.evict()
+
+    def get_or_compute(self, key, name: str, compute: Callable[[], object]):
+        """Returns the cached value or computes, stores and returns it."""
+
+        missing = object()
+        value = self.get(key, name, missing)
+        if value is missing:
+            value = compute()
+            self.set(key, name, value)
+        return value
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _entries(self) -> list[tuple[str, int, float]]:
+        entries = []
+        with os.scandir(self.directory) as iterator:
+            for entry in iterator:
+                if not entry.name.endswith(_SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def evict(self, max_size: Optional[int] = None):
+        """Removes the least recently used entries until the cache fits into max_size
+        (default is the max_size of the cache)."""
+
+        max_size = self.max_size if max_size is None else max_size
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        entries.sort(key=lambda entry: entry[2])
+        for path, size, _ in entries:
+            if total <= max_size:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        self.evict(0)
+
+
+def update_edge_lengths(topology: "Topology", cache: DerivedDataCache):
+    """Calls update_length on all Edges of the Topology or applies the cached lengths."""
+
+    def compute():
+        for edge in topology.edges.values():
+            length = edge.length
+            edge.update_length()
+            if edge.length != length:
+                topology.update_edge(edge)
+        return {edge.uuid: edge.length for edge in topology.edges.values()}
+
+    key = topology.fingerprint()
+    lengths = cache.get(key, "edge_lengths")
+    if lengths is None:
+        cache.set(key, "edge_lengths", compute())
+        return
+    for uuid, length in lengths.items():
+        edge = topology.edges[uuid]
+        if edge.length != length:
+            edge.length = length
+            topology.update_edge(edge)
+
+
+def _connections(node: "Node") -> tuple:
+    return node.connected_on_head, node.connected_on_left, node.connected_on_right
+
+
+def update_turnout_orientation(topology: "Topology", cache: DerivedDataCache):
+    """Calls calc_anschluss_of_all_nodes on all Nodes with three neighbours or applies the
+    cached connections on head, left and right."""
+
+    def compute():
+        orientation = {}
+        for node in topology.nodes.values():
+            if len(node.connected_nodes) == 3:
+                connections = _connections(node)
+                node.calc_anschluss_of_all_nodes()
+                if _connections(node) != connections:
+                    topology.update_node(node)
+                orientation[node.uuid] = tuple(
+                    other.uuid if other is not None else None for other in _connections(node)
+                )
+        return orientation
+
+    key = topology.fingerprint()
+    orientation = cache.get(key, "turnout_orientation")
+    if orientation is None:
+        cache.set(key, "turnout_orientation", compute())
+        return
+    nodes = topology.nodes
+    for uuid, connections in orientation.items():
+        node = nodes[uuid]
+        connections = tuple(nodes[other] if other is not None else None for other in connections)
+        if _connections(node) != connections:
+            node.connected_on_head, node.connected_on_left, node.connected_on_right = connections
+            topology.update_node(node)
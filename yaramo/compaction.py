@@ -0,0 +1,173 @@
+"""Compaction of geometry-heavy topologies.
+
+Compaction has two parts: the intermediate GeoNodes of every Edge are simplified with the
+Douglas-Peucker algorithm as long as the length of the Edge stays within a relative error,
+and chains of Nodes connected to exactly two other Nodes are contracted into single Edges.
+"""
+
+from typing import Optional
+
+from yaramo.edge import Edge
+from yaramo.editing import merge_edges, merge_obstacle
+from yaramo.geometry import (
+    LocalProjection,
+    have_same_coordinate_system,
+    point_segment_distance,
+    polyline_length,
+)
+from yaramo.instrumentation import instrumented
+from yaramo.node import Node
+
+
+class CompactionReport(object):
+    """The number of elements of a Topology before and after compaction."""
+
+    def __init__(self, before: dict[str, int], after: dict[str, int]):
+        self.before = before
+        self.after = after
+
+    def __str__(self):
+        return "\n".join(
+            f"{name}: {self.before[name]} -> {self.after[name]}" for name in self.before
+        )
+
+
+def count_elements(topology: "Topology") -> dict[str, int]:
+    return {
+        "nodes": len(topology.nodes),
+        "edges": len(topology.edges),
+        "intermediate_geo_nodes": sum(
+            len(edge.intermediate_geo_nodes) for edge in topology.edges.values()
+        ),
+        "signals": len(topology.signals),
+        "vacancy_sections": len(topology.vacancy_sections),
+    }
+
+
+def simplify_polyline(points: list[tuple[float, float]], tolerance: float) -> list[int]:
+    """Returns the indices of the points kept by the Douglas-Peucker algorithm.
+
+    Every removed point is at most tolerance away from the simplified polyline.
+    The first and the last point are always kept.
+    """
+
+    if len(points) <= 2:
+        return list(range(len(points)))
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        max_distance, max_index = -1.0, None
+        for index in range(start + 1, end):
+            distance = point_segment_distance(points[index], points[start], points[end])
+            if distance > max_distance:
+                max_distance, max_index = distance, index
+        if max_index is not None and max_distance > tolerance:
+            keep[max_index] = True
+            stack.append((start, max_index))
+            stack.append((max_index, end))
+    return [index for index, kept in enumerate(keep) if kept]
+
+
+def simplify_edge_geometry(edge: Edge, tolerance: float, max_length_error: float) -> int:
+    """Removes intermediate GeoNodes of an Edge and returns how many were removed.
+
+    Parameters
+    ----------
+    tolerance: float
+        The maximum distance (in meters) of a removed GeoNode to the simplified geometry
+    max_length_error: float
+        The maximum relative deviation of the geometric length of the simplified Edge.
+        The tolerance is reduced until the simplification keeps the length within that error.
+    """
+
+    if not edge.intermediate_geo_nodes:
+        return 0
+    geo_nodes = [edge.node_a.geo_node, *edge.intermediate_geo_nodes, edge.node_b.geo_node]
+    geo_points = [geo_node.geo_point if geo_node else None for geo_node in geo_nodes]
+    if not have_same_coordinate_system(geo_points):
+        return 0
+
+    projection = LocalProjection(geo_points[0])
+    points = [projection.to_planar(geo_point) for geo_point in geo_points]
+    length = polyline_length(geo_nodes)
+    while tolerance > 1e-6:
+        kept = [geo_nodes[index] for index in simplify_polyline(points, tolerance)]
+        if length == 0 or abs(polyline_length(kept) - length) / length <= max_length_error:
+            removed = len(geo_nodes) - len(kept)
+            edge.intermediate_geo_nodes = kept[1:-1]
+            return removed
+        tolerance /= 2
+    return 0
+
+
+def merge_edges_at_node(
+    topology: "Topology", node: Node, edges_by_node: dict[str, list[Edge]]
+) -> Optional[Edge]:
+    """Merges the two Edges at a Node connected to exactly two other Nodes (see
+    yaramo.editing.merge_edges). Returns None without changing anything if the Edges cannot be
+    merged, e.g. because they belong to different VacancySections or have different maximum
+    speeds."""
+
+    edges = edges_by_node.get(node.uuid, [])
+    if len(node.connected_nodes) != 2 or len(edges) != 2:
+        return None
+    first, second = edges
+    if merge_obstacle(first, second) is not None:
+        return None
+    previous_node, next_node = first.get_other_node(node), second.get_other_node(node)
+    merged = merge_edges(topology, first, second)
+
+    del edges_by_node[node.uuid]
+    edges_by_node[previous_node.uuid] = [
+        merged if edge is first else edge for edge in edges_by_node[previous_node.uuid]
+    ]
+    edges_by_node[next_node.uuid] = [
+        merged if edge is second else edge for edge in edges_by_node[next_node.uuid]
+    ]
+    return merged
+
+
+def contract_chains(topology: "Topology") -> int:
+    """Merges the Edges at all Nodes connected to exactly two other Nodes where possible
+    (see merge_edges_at_node) and returns the number of removed Nodes."""
+
+    edges_by_node: dict[str, list[Edge]] = {}
+    for edge in topology.edges.values():
+        edges_by_node.setdefault(edge.node_a.uuid, []).append(edge)
+        edges_by_node.setdefault(edge.node_b.uuid, []).append(edge)
+
+    removed = 0
+    for node in list(topology.nodes.values()):
+        if merge_edges_at_node(topology, node, edges_by_node) is not None:
+            removed += 1
+    return removed
+
+
+@instrumented(operation="compact")
+def compact(
+    topology: "Topology",
+    tolerance: float = 0.5,
+    max_length_error: float = 0.001,
+    contract: bool = True,
+) -> CompactionReport:
+    """Compacts a Topology in place, see the module description.
+
+    Parameters
+    ----------
+    tolerance: float
+        The maximum distance (in meters) of a removed GeoNode to the simplified geometry
+    max_length_error: float
+        The maximum relative deviation of the geometric length of a simplified Edge
+    contract: bool
+        Whether chains of Nodes with two neighbours are contracted (default is True)
+    """
+
+    before = count_elements(topology)
+    if contract:
+        contract_chains(topology)
+    for edge in topology.edges.values():
+        simplify_edge_geometry(edge, tolerance, max_length_error)
+    return CompactionReport(before, count_elements(topology))
@@ -0,0 +1,122 @@
+"""Concurrent reads of a Topology from many threads.
+
+The read paths of the model do not modify it: Node.get_possible_followers and
+Node.get_anschluss_of_other determine missing turnout connections without setting them, and the
+lazily built derived structures (signal_index, connectivity, signal_distances, lookahead,
+edge_references) are built and refreshed under a lock, so that concurrent readers see them
+either not yet or completely built.
+
+Mutations follow a reader/writer discipline with topology.lock: readers hold the read lock, any
+number of them at a time, and writers hold the write lock, which waits for the readers to
+finish and keeps new readers out meanwhile:
+
+    with topology.lock.read():
+        followers = node.get_possible_followers(source)
+
+    with topology.lock.write():
+        topology.add_signal(signal)
+
+topology.prepare_concurrent_reads() sets the turnout connections that can be determined from the
+geo locations and builds all derived structures in advance, so that readers only look up
+prepared data. `python -m benchmarks.concurrent_reads` measures the read throughput per number
+of threads (on free-threaded CPython, it scales with the cores).
+"""
+
+import threading
+from contextlib import contextmanager
+
+# Serializes the first build of the lazily built structures of all Topologies
+build_lock = threading.RLock()
+
+
+class ReadWriteLock(object):
+    """A lock for many readers or one writer, which prefers waiting writers.
+
+    Both locks are reentrant per thread, and the writer may also acquire the read lock. If the
+    writer releases the write lock while it still holds the read lock, it keeps reading as a
+    regular reader. A reader must not try to acquire the write lock.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._waiting_writers = 0
+        self._writer = None
+        self._writer_depth = 0
+        self._local = threading.local()
+
+    def __reduce__(self):
+        # Copies and unpickled Topologies get a new, unlocked lock
+        return ReadWriteLock, ()
+
+    def acquire_read(self):
+        depth = getattr(self._local, "depth", 0)
+        if depth:
+            self._local.depth = depth + 1
+            return
+        if self._writer == threading.get_ident():
+            # The writer reads without being counted as a reader
+            self._local.depth = 1
+            self._local.uncounted = True
+            return
+        with self._condition:
+            while self._writer is not None or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        self._local.depth = 1
+        self._local.uncounted = False
+
+    def release_read(self):
+        self._local.depth -= 1
+        if self._local.depth:
+            return
+        if self._local.uncounted:
+            self._local.uncounted = False
+            return
+        with self._condition:
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    def acquire_write(self):
+        thread = threading.get_ident()
+        if self._writer == thread:
+            self._writer_depth += 1
+            return
+        if getattr(self._local, "depth", 0):
+            raise RuntimeError("Cannot acquire the write lock while holding the read lock")
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writer is not None or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = thread
+            self._writer_depth = 1
+
+    def release_write(self):
+        self._writer_depth -= 1
+        if self._writer_depth:
+            return
+        with self._condition:
+            self._writer = None
+            if getattr(self._local, "depth", 0) and self._local.uncounted:
+                # The writer still reads, from now on as a counted reader
+                self._local.uncounted = False
+                self._readers += 1
+            self._condition.notify_all()
+
+    @contextmanager
+    def read(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
@@ -0,0 +1,439 @@
+"""Connected components, articulation points and directional reachability of the track network.
+
+The undirected components are kept up to date incrementally: adding an Edge merges two
+components, removing one searches only the component it belonged to. Articulation points are
+cached per component and recomputed for changed components only.
+
+Directional reachability respects the turnouts: a train passing a Node coming from its head
+continues to the left or the right, coming from the left or the right it continues to the
+head. The directed graph of all Edge traversals (two per Edge) is condensed into its strongly
+connected components. Unbranched paths of the condensation are compressed into chains, and the
+set of chains reachable from a chain is memoized as a bitset, so that a lookup is a position
+comparison or a single bit test once the memo is filled. Unlike the components, the directed
+index is not maintained incrementally: any change of the Edges or of the turnout orientation
+drops it, and it is rebuilt as a whole on the next directional lookup (Nodes added or removed
+without Edges keep it, as they are not part of any traversal).
+"""
+
+from typing import Iterable, Optional
+
+from yaramo.concurrency import build_lock
+from yaramo.edge import Edge
+from yaramo.node import Node
+from yaramo.signal import Signal, SignalDirection
+
+
+class _Reachability(object):
+    """The strongly connected components of the directed Edge traversals and the memoized
+    reachability between them.
+
+    State 2 * i traverses the i-th Edge from node_a to node_b, state 2 * i + 1 backwards.
+    """
+
+    def __init__(self, edges: list[Edge], adjacency: dict[str, list[Edge]]):
+        self.edge_uuids = [edge.uuid for edge in edges]
+        self.state_of_edge = {uuid: index for index, uuid in enumerate(self.edge_uuids)}
+        successors: list[list[int]] = [[] for _ in range(2 * len(edges))]
+        for index, edge in enumerate(edges):
+            for state, (source, node) in (
+                (2 * index, (edge.node_a, edge.node_b)),
+                (2 * index + 1, (edge.node_b, edge.node_a)),
+            ):
+                for follower in node.get_possible_followers(source):
+                    for next_edge in adjacency.get(node.uuid, ()):
+                        if next_edge is edge or next_edge.get_other_node(node) is not follower:
+                            continue
+                        next_index = self.state_of_edge[next_edge.uuid]
+                        successors[state].append(
+                            2 * next_index if next_edge.node_a is node else 2 * next_index + 1
+                        )
+
+        self.component, self.cyclic = self._strongly_connected_components(successors)
+        dag: list[set[int]] = [set() for _ in self.cyclic]
+        for state, targets in enumerate(successors):
+            for target in targets:
+                if self.component[state] != self.component[target]:
+                    dag[self.component[state]].add(self.component[target])
+        self.chain, self.position, self.chain_successors = self._chains(dag)
+        self._reachable: list[Optional[int]] = [None] * len(self.chain_successors)
+
+    @staticmethod
+    def _strongly_connected_components(successors: list[list[int]]):
+        """Iterative Tarjan, returns the component of every state and whether each component
+        contains a cycle."""
+
+        count = len(successors)
+        index_of = [-1] * count
+        lowlink = [0] * count
+        on_stack = [False] * count
+        component = [-1] * count
+        cyclic: list[bool] = []
+        stack: list[int] = []
+        counter = 0
+        for root in range(count):
+            if index_of[root] != -1:
+                continue
+            work = [(root, 0)]
+            while work:
+                state, position = work.pop()
+                if position == 0:
+                    index_of[state] = lowlink[state] = counter
+                    counter += 1
+                    stack.append(state)
+                    on_stack[state] = True
+                recurse = False
+                targets = successors[state]
+                while position < len(targets):
+                    target = targets[position]
+                    position += 1
+                    if index_of[target] == -1:
+                        work.append((state, position))
+                        work.append((target, 0))
+                        recurse = True
+                        break
+                    if on_stack[target]:
+                        lowlink[state] = min(lowlink[state], index_of[target])
+                if recurse:
+                    continue
+                if lowlink[state] == index_of[state]:
+                    members = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component[member] = len(cyclic)
+                        members.append(member)
+                        if member == state:
+                            break
+                    cyclic.append(len(members) > 1 or state in successors[state])
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[state])
+        return component, cyclic
+
+    @staticmethod
+    def _chains(dag: list[set[int]]):
+        """Compresses the paths of the condensation whose components have a single successor
+        with a single predecessor into chains (a plain line has two chains, one per direction).
+
+        Returns the chain and the position within it of every component and the successors of
+        every chain.
+        """
+
+        in_degree = [0] * len(dag)
+        for targets in dag:
+            for target in targets:
+                in_degree[target] += 1
+        continued = [False] * len(dag)
+        for targets in dag:
+            if len(targets) == 1 and in_degree[next(iter(targets))] == 1:
+                continued[next(iter(targets))] = True
+
+        chain = [-1] * len(dag)
+        position = [0] * len(dag)
+        tails = []
+        for start in range(len(dag)):
+            if continued[start]:
+                continue
+            current, index = start, 0
+            while True:
+                chain[current], position[current] = len(tails), index
+                targets = dag[current]
+                if len(targets) != 1 or not continued[next(iter(targets))]:
+                    break
+                current, index = next(iter(targets)), index + 1
+            tails.append(current)
+        return chain, position, [{chain[target] for target in dag[tail]} for tail in tails]
+
+    def reachable_chains(self, chain: int) -> int:
+        """Returns the bitset of chains reachable from chain (including itself)."""
+
+        memo = self._reachable
+        if memo[chain] is not None:
+            return memo[chain]
+        work = [(chain, False)]
+        while work:
+            current, expanded = work.pop()
+            if memo[current] is not None:
+                continue
+            if not expanded:
+                work.append((current, True))
+                work.extend(
+                    (target, False)
+                    for target in self.chain_successors[current]
+                    if memo[target] is None
+                )
+            else:
+                bits = 1 << current
+                for target in self.chain_successors[current]:
+                    bits |= memo[target]
+                memo[current] = bits
+        return memo[chain]
+
+    def state_reachable(self, source: int, target: int) -> bool:
+        """Whether target can be entered after leaving source (at least one step)."""
+
+        source_component, target_component = self.component[source], self.component[target]
+        if source_component == target_component:
+            # Without a cycle the component is the single state, which cannot be re-entered
+            return self.cyclic[source_component]
+        source_chain, target_chain = self.chain[source_component], self.chain[target_component]
+        if source_chain == target_chain:
+            return self.position[source_component] < self.position[target_component]
+        return bool((self.reachable_chains(source_chain) >> target_chain) & 1)
+
+    def reachable_states(self, source: int) -> list[int]:
+        """Returns all states that can be entered after leaving source."""
+
+        source_component = self.component[source]
+        source_chain, source_position = (
+            self.chain[source_component],
+            self.position[source_component],
+        )
+        bits = self.reachable_chains(source_chain)
+        result = []
+        for state, component in enumerate(self.component):
+            chain = self.chain[component]
+            if not (bits >> chain) & 1:
+                continue
+            if chain == source_chain:
+                if self.position[component] < source_position:
+                    continue
+                if component == source_component and not self.cyclic[component]:
+                    continue
+            result.append(state)
+        return result
+
+
+class ConnectivityIndex(object):
+    """Connected components, articulation points and directional reachability of a Topology.
+
+    The index is kept up to date by Topology.add_edge, remove_edge, add_node, remove_node and
+    update_node, which announces changes of the turnout orientation
+    (connected_on_head/left/right).
+    """
+
+    def __init__(self, nodes: Iterable[Node] = (), edges: Iterable[Edge] = ()):
+        self._adjacency: dict[str, list[Edge]] = {}
+        self._component: dict[str, int] = {}
+        self._members: dict[int, set[str]] = {}
+        self._next_component = 0
+        self._articulation_points: dict[int, set[str]] = {}
+        self._reachability: Optional[_Reachability] = None
+        self._edges: dict[str, Edge] = {}
+        for node in nodes:
+            self.add_node(node)
+        for edge in edges:
+            self.add_edge(edge)
+
+    def _new_component(self, members: set[str]) -> int:
+        component = self._next_component
+        self._next_component += 1
+        self._members[component] = members
+        for uuid in members:
+            self._component[uuid] = component
+        return component
+
+    def add_node(self, node: Node):
+        if node.uuid not in self._component:
+            self._adjacency.setdefault(node.uuid, [])
+            self._new_component({node.uuid})
+
+    def remove_node(self, node: Node):
+        """Removes a Node and the Edges of the index connecting it."""
+
+        for edge in list(self._adjacency.get(node.uuid, ())):
+            self.remove_edge(edge)
+        component = self._component.pop(node.uuid, None)
+        if component is None:
+            return
+        self._adjacency.pop(node.uuid, None)
+        members = self._members[component]
+        members.discard(node.uuid)
+        if not members:
+            del self._members[component]
+        self._articulation_points.pop(component, None)
+
+    def add_edge(self, edge: Edge):
+        if edge.uuid in self._edges:
+            self.remove_edge(self._edges[edge.uuid])
+        self.add_node(edge.node_a)
+        self.add_node(edge.node_b)
+        self._edges[edge.uuid] = edge
+        self._adjacency[edge.node_a.uuid].append(edge)
+        if edge.node_b is not edge.node_a:
+            self._adjacency[edge.node_b.uuid].append(edge)
+        self._reachability = None
+
+        first, second = self._component[edge.node_a.uuid], self._component[edge.node_b.uuid]
+        self._articulation_points.pop(first, None)
+        if first == second:
+            return
+        self._articulation_points.pop(second, None)
+        if len(self._members[first]) < len(self._members[second]):
+            first, second = second, first
+        moved = self._members.pop(second)
+        self._members[first] |= moved
+        for uuid in moved:
+            self._component[uuid] = first
+
+    def remove_edge(self, edge: Edge):
+        if self._edges.pop(edge.uuid, None) is None:
+            return
+        for node in (edge.node_a, edge.node_b):
+            edges = self._adjacency.get(node.uuid, [])
+            if edge in edges:
+                edges.remove(edge)
+        self._reachability = None
+
+        component = self._component[edge.node_a.uuid]
+        self._articulation_points.pop(component, None)
+        reached = self._search(edge.node_a.uuid, edge.node_b.uuid)
+        if edge.node_b.uuid in reached:
+            return
+        # The component fell apart, the part reached from node_a gets a new id
+        self._members[component] -= reached
+        self._new_component(reached)
+
+    def _search(self, start: str, goal: Optional[str] = None) -> set[str]:
+        """Returns the uuids of the Nodes connected to start (stops early at goal)."""
+
+        reached = {start}
+        frontier = [start]
+        while frontier:
+            uuid = frontier.pop()
+            for edge in self._adjacency.get(uuid, ()):
+                for other in (edge.node_a.uuid, edge.node_b.uuid):
+                    if other not in reached:
+                        if other == goal:
+                            reached.add(other)
+                            return reached
+                        reached.add(other)
+                        frontier.append(other)
+        return reached
+
+    def components(self) -> list[set[str]]:
+        """Returns the uuids of the Nodes of every connected component, largest first
+        (all but the first are islands disconnected from the main network)."""
+        return sorted((set(members) for members in self._members.values()), key=len, reverse=True)
+
+    def component_of(self, node: Node) -> int:
+        """Returns an id of the component of the Node, ids change when components change."""
+        return self._component[node.uuid]
+
+    def connected(self, node_a: Node, node_b: Node) -> bool:
+        """Whether the Nodes are connected, ignoring the directions."""
+        return self._component[node_a.uuid] == self._component[node_b.uuid]
+
+    def articulation_points(self) -> set[str]:
+        """Returns the uuids of all Nodes whose removal would disconnect their component."""
+
+        result = set()
+        for component, members in self._members.items():
+            points = self._articulation_points.get(component)
+            if points is None:
+                # Concurrent readers may compute the same points, the result is the same
+                points = self._component_articulation_points(next(iter(members)))
+                self._articulation_points[component] = points
+            result |= points
+        return result
+
+    def _component_articulation_points(self, root: str) -> set[str]:
+        """Iterative Hopcroft-Tarjan on the component of root (parallel Edges are respected)."""
+
+        depth = {root: 0}
+        low = {root: 0}
+        points = set()
+        root_children = 0
+        # (node, Edge used to enter it, iterator over its Edges)
+        work = [(root, None, iter(self._adjacency.get(root, ())))]
+        while work:
+            uuid, entered_by, edges = work[-1]
+            advanced = False
+            for edge in edges:
+                if edge is entered_by:
+                    continue
+                other = edge.node_b.uuid if edge.node_a.uuid == uuid else edge.node_a.uuid
+                if other in depth:
+                    low[uuid] = min(low[uuid], depth[other])
+                else:
+                    depth[other] = low[other] = depth[uuid] + 1
+                    work.append((other, edge, iter(self._adjacency.get(other, ()))))
+                    advanced = True
+                    break
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[uuid])
+                if parent == root:
+                    root_children += 1
+                elif low[uuid] >= depth[parent]:
+                    points.add(parent)
+        if root_children > 1:
+            points.add(root)
+        return points
+
+    def update_node(self, node: Node):
+        """Drops the directional reachability after the connections on head, left and right of
+        a Node have changed."""
+        self.invalidate_directions()
+
+    def invalidate_directions(self):
+        """Drops the directional reachability, e.g. after turnout orientations have changed."""
+        self._reachability = None
+
+    def _directed(self) -> _Reachability:
+        if self._reachability is None:
+            with build_lock:
+                if self._reachability is None:
+                    self._reachability = _Reachability(list(self._edges.values()), self._adjacency)
+        return self._reachability
+
+    def prepare(self):
+        """Computes the articulation points and the directional reachability in advance."""
+        self.articulation_points()
+        self._directed()
+
+    def _state(self, edge: Edge, direction: SignalDirection) -> int:
+        index = self._directed().state_of_edge[edge.uuid]
+        return 2 * index if direction == SignalDirection.IN else 2 * index + 1
+
+    def edge_reachable(
+        self,
+        source: Edge,
+        source_direction: SignalDirection,
+        target: Edge,
+        target_direction: SignalDirection,
+    ) -> bool:
+        """Whether a train leaving source in source_direction (IN: towards node_b) can enter
+        target in target_direction."""
+
+        return self._directed().state_reachable(
+            self._state(source, source_direction), self._state(target, target_direction)
+        )
+
+    def signal_reachable(self, source: Signal, target: Signal) -> bool:
+        """Whether a train passing the source Signal in its direction can reach the target
+        Signal in the target's direction."""
+
+        source_state = self._state(source.edge, source.direction)
+        target_state = self._state(target.edge, target.direction)
+        if source_state == target_state:
+            if source.direction == SignalDirection.IN:
+                ahead = target.distance_edge >= source.distance_edge
+            else:
+                ahead = target.distance_edge <= source.distance_edge
+            if ahead:
+                return True
+        return self._directed().state_reachable(source_state, target_state)
+
+    def reachable_edges(self, source: Edge, source_direction: SignalDirection) -> set[str]:
+        """Returns the uuids of all Edges that can be entered (in any direction) after leaving
+        source in source_direction."""
+
+        directed = self._directed()
+        return {
+            directed.edge_uuids[state // 2]
+            for state in directed.reachable_states(self._state(source, source_direction))
+        }
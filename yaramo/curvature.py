@@ -0,0 +1,273 @@
+"""Curvature and radius analysis of the track geometry.
+
+The geometry of all Edges (node_a, intermediate_geo_nodes, node_b) is projected once into flat
+arrays of planar coordinates, each Edge around its first point (see LocalProjection), and the
+signed curvature of every vertex is computed from the circle through the vertex and its two
+neighbours in one pass over these arrays. Positive curvatures turn left, negative ones right.
+
+From the radii, geometric speed limits follow with the usual relation between radius R (m),
+cant u (mm), permitted cant deficiency u_f (mm) and speed v (km/h):
+
+    v = sqrt(R * (u + u_f) / 11.8)
+"""
+
+import math
+from array import array
+from typing import Iterable, Optional
+
+from yaramo.edge import Edge
+from yaramo.geo_node import GeoNode
+from yaramo.geometry import LocalProjection, have_same_coordinate_system
+from yaramo.node import Node
+
+DEFAULT_CANT = 100.0
+DEFAULT_CANT_DEFICIENCY = 100.0
+# Speed limits are rounded down to a multiple of this step (km/h)
+SPEED_STEP = 5
+
+
+def speed_limit(
+    radius: float, cant: float = DEFAULT_CANT, cant_deficiency: float = DEFAULT_CANT_DEFICIENCY
+) -> float:
+    """Returns the maximum speed in km/h for a curve of the radius in meters."""
+    return math.sqrt(radius * (cant + cant_deficiency) / 11.8)
+
+
+def _curvatures(east: array, north: array, start: int, stop: int, result: array):
+    """Writes the signed curvature of the vertices start + 1 to stop - 2 into result."""
+
+    for index in range(start + 1, stop - 1):
+        x0, y0 = east[index - 1], north[index - 1]
+        x1, y1 = east[index], north[index]
+        x2, y2 = east[index + 1], north[index + 1]
+        cross = (x1 - x0) * (y2 - y1) - (y1 - y0) * (x2 - x1)
+        lengths = math.hypot(x1 - x0, y1 - y0) * math.hypot(x2 - x1, y2 - y1)
+        lengths *= math.hypot(x2 - x0, y2 - y0)
+        result[index] = 2.0 * cross / lengths if lengths > 0 else 0.0
+
+
+def _project(geo_nodes: list[GeoNode], east: array, north: array) -> bool:
+    """Appends the planar coordinates of the GeoNodes, returns False if they have no common
+    coordinate system."""
+
+    if not have_same_coordinate_system(
+        geo_node.geo_point if geo_node else None for geo_node in geo_nodes
+    ):
+        return False
+    projection = LocalProjection(geo_nodes[0].geo_point)
+    for geo_node in geo_nodes:
+        point_east, point_north = projection.to_planar(geo_node.geo_point)
+        east.append(point_east)
+        north.append(point_north)
+    return True
+
+
+def _radius(curvature: float) -> float:
+    return 1.0 / abs(curvature) if curvature else math.inf
+
+
+class CurvatureAnalysis(object):
+    """The planar geometry and the curvature of every vertex of a set of Edges.
+
+    The vertices of the i-th Edge are offsets[i] to offsets[i + 1] - 1 of the flat arrays east,
+    north and curvature. Edges without a (consistent) geometry have no vertices; the end points
+    of an Edge have no curvature of their own.
+    """
+
+    def __init__(self, edges: Iterable[Edge]):
+        self.edges: list[Edge] = []
+        self.index: dict[str, int] = {}
+        self.offsets = array("q", [0])
+        self.east = array("d")
+        self.north = array("d")
+        for edge in edges:
+            self.index[edge.uuid] = len(self.edges)
+            self.edges.append(edge)
+            _project(
+                [edge.node_a.geo_node, *edge.intermediate_geo_nodes, edge.node_b.geo_node],
+                self.east,
+                self.north,
+            )
+            self.offsets.append(len(self.east))
+
+        self.curvature = array("d", bytes(8 * len(self.east)))
+        for position in range(len(self.edges)):
+            _curvatures(
+                self.east,
+                self.north,
+                self.offsets[position],
+                self.offsets[position + 1],
+                self.curvature,
+            )
+
+    def _range(self, edge: Edge | str) -> range:
+        position = self.index[edge if isinstance(edge, str) else edge.uuid]
+        return range(self.offsets[position], self.offsets[position + 1])
+
+    def curvatures(self, edge: Edge | str) -> list[float]:
+        """Returns the signed curvature (1/m) of all vertices of the Edge from node_a on."""
+        vertices = self._range(edge)
+        return self.curvature[vertices.start : vertices.stop].tolist()
+
+    def minimum_radius(self, edge: Edge | str) -> float:
+        """Returns the smallest radius (m) within the Edge, infinity if it is straight."""
+
+        vertices = self._range(edge)
+        if len(vertices) < 3:
+            return math.inf
+        curvature = self.curvature
+        return _radius(max(abs(curvature[index]) for index in vertices[1:-1]))
+
+    def radius_next_to(self, edge: Edge | str, node: Node) -> float:
+        """Returns the radius at the first vertex of the Edge after node (one of its Nodes)."""
+
+        vertices = self._range(edge)
+        if len(vertices) < 3:
+            return math.inf
+        edge = self.edges[self.index[edge if isinstance(edge, str) else edge.uuid]]
+        return _radius(self.curvature[vertices[1] if edge.node_a is node else vertices[-2]])
+
+    def minimum_radii(self) -> dict[str, float]:
+        """Returns the smallest radius of every Edge by its uuid."""
+        return {edge.uuid: self.minimum_radius(edge) for edge in self.edges}
+
+    def speed_limits(
+        self, cant: float = DEFAULT_CANT, cant_deficiency: float = DEFAULT_CANT_DEFICIENCY
+    ) -> dict[str, Optional[int]]:
+        """Returns the geometric speed limit (km/h, rounded down to SPEED_STEP) of every Edge by
+        its uuid, None for straight Edges."""
+
+        limits = {}
+        for uuid, radius in self.minimum_radii().items():
+            if math.isinf(radius):
+                limits[uuid] = None
+            else:
+                speed = speed_limit(radius, cant=cant, cant_deficiency=cant_deficiency)
+                limits[uuid] = int(speed // SPEED_STEP * SPEED_STEP)
+        return limits
+
+
+def joint_radius(previous: GeoNode, node: Node, following: GeoNode) -> float:
+    """Returns the radius of the circle through previous, the GeoNode of node and following."""
+
+    geo_nodes = [previous, node.geo_node, following]
+    east, north = array("d"), array("d")
+    if not _project(geo_nodes, east, north):
+        return math.inf
+    curvature = array("d", bytes(24))
+    _curvatures(east, north, 0, 3, curvature)
+    return _radius(curvature[1])
+
+
+def _neighbouring_geo_node(edge: Edge, node: Node) -> Optional[GeoNode]:
+    """Returns the GeoNode next to node on the Edge (the other Node's if there is none)."""
+
+    if edge.intermediate_geo_nodes:
+        return edge.intermediate_geo_nodes[0 if edge.node_a is node else -1]
+    return edge.get_other_node(node).geo_node
+
+
+def route_radius_profile(route: "Route") -> list[tuple[float, float]]:
+    """Returns (distance, radius) for every vertex of the geometry of the Route, with the
+    distance along the Route from the start of the start Signal's Edge in travel direction and
+    infinity as radius of straight vertices. The Nodes between two Edges are vertices as well.
+    """
+
+    edges = route.get_edges_in_order()
+    if not edges:
+        return []
+    node = route.start_signal.next_node()
+    node = edges[0].get_other_node(node)
+    geo_nodes = []
+    for edge in edges:
+        edge_geo_nodes = [edge.node_a.geo_node, *edge.intermediate_geo_nodes, edge.node_b.geo_node]
+        if edge.node_a is not node:
+            edge_geo_nodes.reverse()
+        geo_nodes.extend(edge_geo_nodes if not geo_nodes else edge_geo_nodes[1:])
+        node = edge.get_other_node(node)
+
+    east, north = array("d"), array("d")
+    if not _project(geo_nodes, east, north):
+        return []
+    curvature = array("d", bytes(8 * len(east)))
+    _curvatures(east, north, 0, len(east), curvature)
+    profile = []
+    distance = 0.0
+    for index in range(len(east)):
+        if index > 0:
+            distance += math.hypot(east[index] - east[index - 1], north[index] - north[index - 1])
+        profile.append((distance, _radius(curvature[index])))
+    return profile
+
+
+def apply_speed_limits(
+    topology: "Topology",
+    cant: float = DEFAULT_CANT,
+    cant_deficiency: float = DEFAULT_CANT_DEFICIENCY,
+    analysis: Optional[CurvatureAnalysis] = None,
+) -> CurvatureAnalysis:
+    """Lowers Edge.maximum_speed and Node.maximum_speed_on_left/right of turnouts to the
+    geometric speed limits (speeds that are already lower are kept) and announces the lowered
+    Edges and Nodes via update_edge and update_node. Returns the analysis.
+
+    The radius of a turnout branch is the smaller one of the circle through the last GeoNode
+    before the turnout on the head side, the turnout and the first GeoNode of the branch and the
+    radius at that first GeoNode of the branch.
+    """
+
+    if analysis is None:
+        analysis = CurvatureAnalysis(topology.edges.values())
+
+    def lowered(speed, limit):
+        return limit if speed is None or (limit is not None and limit < speed) else speed
+
+    for uuid, limit in analysis.speed_limits(cant=cant, cant_deficiency=cant_deficiency).items():
+        edge = analysis.edges[analysis.index[uuid]]
+        speed = lowered(edge.maximum_speed, limit)
+        if speed != edge.maximum_speed:
+            edge.maximum_speed = speed
+            if uuid in topology.edges:
+                topology.update_edge(edge)
+
+    edges_by_nodes = {}
+    for edge in topology.edges.values():
+        edges_by_nodes[edge.node_a.uuid, edge.node_b.uuid] = edge
+        edges_by_nodes[edge.node_b.uuid, edge.node_a.uuid] = edge
+    for node in topology.nodes.values():
+        if len(node.connected_nodes) != 3 or node.geo_node is None:
+            continue
+        head, left, right = node.connected_on_head, node.connected_on_left, node.connected_on_right
+        if head is None or left is None or right is None:
+            if any(other.geo_node is None for other in node.connected_nodes):
+                continue
+            anschluss = node.determine_anschluss_of_all_nodes()
+            if anschluss is None:
+                continue
+            head, left, right = anschluss
+        head_edge = edges_by_nodes.get((node.uuid, head.uuid))
+        if head_edge is None:
+            continue
+        previous = _neighbouring_geo_node(head_edge, node)
+        for branch, attribute in (
+            (left, "maximum_speed_on_left"),
+            (right, "maximum_speed_on_right"),
+        ):
+            branch_edge = edges_by_nodes.get((node.uuid, branch.uuid))
+            if branch_edge is None or previous is None:
+                continue
+            following = _neighbouring_geo_node(branch_edge, node)
+            if following is None:
+                continue
+            radius = min(
+                joint_radius(previous, node, following),
+                analysis.radius_next_to(branch_edge, node),
+            )
+            if math.isinf(radius):
+                continue
+            speed = speed_limit(radius, cant=cant, cant_deficiency=cant_deficiency)
+            limit = int(speed // SPEED_STEP * SPEED_STEP)
+            speed = lowered(getattr(node, attribute), limit)
+            if speed != getattr(node, attribute):
+                setattr(node, attribute, speed)
+                topology.update_node(node)
+    return analysis
@@ -0,0 +1,228 @@
+"""Structural diff of two versions of a Topology.
+
+Elements are matched by uuid and compared by their fingerprint digests, so unchanged elements
+are skipped after one hash comparison and the diff is linear in the size of the Topologies.
+Optionally, elements that were recreated with a new uuid are matched by their geometry: Nodes by
+their coordinates, Edges by their matched Nodes, Signals by their matched Edge, direction,
+function and position and Routes by their matched start and end Signals.
+"""
+
+from typing import Optional
+
+from yaramo.base_element import BaseElement
+from yaramo.fingerprint import ELEMENT_KINDS, TopologyFingerprint, element_digest
+from yaramo.geometry import LocalProjection
+
+
+class ElementChanges(object):
+    """The added, removed and changed elements of one kind (e.g. the Nodes)."""
+
+    def __init__(self):
+        self.added: list[BaseElement] = []
+        self.removed: list[BaseElement] = []
+        self.changed: list[tuple[BaseElement, BaseElement]] = []
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def __str__(self):
+        return f"+{len(self.added)} -{len(self.removed)} ~{len(self.changed)}"
+
+
+class TopologyDiff(object):
+    """The differences between an old and a new version of a Topology.
+
+    For each kind of element (nodes, edges, signals, routes and vacancy_sections) there is an
+    ElementChanges attribute. Changed elements are given as pairs of the old and the new element.
+    matched_by_geometry maps the uuids of new elements to the uuids of the old elements they
+    were matched with by geometry.
+    """
+
+    def __init__(self):
+        self.nodes = ElementChanges()
+        self.edges = ElementChanges()
+        self.signals = ElementChanges()
+        self.routes = ElementChanges()
+        self.vacancy_sections = ElementChanges()
+        self.matched_by_geometry: dict[str, str] = {}
+
+    def __bool__(self):
+        return any(getattr(self, kind) for kind in ELEMENT_KINDS)
+
+    def __str__(self):
+        return "\n".join(f"{kind}: {getattr(self, kind)}" for kind in ELEMENT_KINDS)
+
+
+def _grid_cell(point: tuple[float, float], tolerance: float) -> tuple[int, int]:
+    return int(point[0] // tolerance), int(point[1] // tolerance)
+
+
+class _GeometryMatcher(object):
+    """Matches unmatched new elements with unmatched old elements by geometry, kind by kind."""
+
+    def __init__(self, removed: dict[str, dict], added: dict[str, dict], tolerance: float):
+        self.removed = removed
+        self.added = added
+        self.tolerance = tolerance
+        # uuid of the new element -> uuid of the old element
+        self.mapping: dict[str, str] = {}
+
+    def ref(self, element: Optional[BaseElement]) -> Optional[str]:
+        if element is None:
+            return None
+        return self.mapping.get(element.uuid, element.uuid)
+
+    def _match(self, kind: str, old_uuid: str, new_uuid: str):
+        self.mapping[new_uuid] = old_uuid
+        del self.removed[kind][old_uuid]
+        del self.added[kind][new_uuid]
+
+    def match_by_key(self, kind: str, key):
+        """Matches elements with equal keys, if the key is unique among the old elements."""
+
+        candidates: dict = {}
+        for old in self.removed[kind].values():
+            candidates.setdefault(key(old, False), []).append(old)
+        for new in list(self.added[kind].values()):
+            olds = candidates.get(key(new, True))
+            if olds is not None and len(olds) == 1 and olds[0].uuid in self.removed[kind]:
+                self._match(kind, olds[0].uuid, new.uuid)
+
+    def match_nodes(self):
+        geo_points = [
+            node.geo_node.geo_point
+            for node in self.removed["nodes"].values()
+            if node.geo_node is not None and node.geo_node.geo_point is not None
+        ]
+        if not geo_points:
+            return
+        projection = LocalProjection(geo_points[0])
+        point_type = type(geo_points[0])
+
+        def planar(node) -> Optional[tuple[float, float]]:
+            if node.geo_node is None or type(node.geo_node.geo_point) is not point_type:
+                return None
+            return projection.to_planar(node.geo_node.geo_point)
+
+        grid: dict[tuple[int, int], list] = {}
+        for old in self.removed["nodes"].values():
+            point = planar(old)
+            if point is not None:
+                grid.setdefault(_grid_cell(point, self.tolerance), []).append((point, old))
+
+        for new in list(self.added["nodes"].values()):
+            point = planar(new)
+            if point is None:
+                continue
+            cell_x, cell_y = _grid_cell(point, self.tolerance)
+            best, best_distance = None, self.tolerance
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    for old_point, old in grid.get((cell_x + dx, cell_y + dy), []):
+                        distance = (
+                            (old_point[0] - point[0]) ** 2 + (old_point[1] - point[1]) ** 2
+                        ) ** 0.5
+                        if distance <= best_distance and old.uuid in self.removed["nodes"]:
+                            best, best_distance = old, distance
+            if best is not None:
+                self._match("nodes", best.uuid, new.uuid)
+
+    def match_edges(self):
+        def key(edge, is_new):
+            ref = self.ref if is_new else (lambda element: element.uuid)
+            return frozenset((ref(edge.node_a), ref(edge.node_b)))
+
+        self.match_by_key("edges", key)
+
+    def match_signals(self):
+        def key(signal, is_new):
+            ref = self.ref if is_new else (lambda element: element.uuid)
+            return (
+                ref(signal.edge),
+                str(signal.direction),
+                str(signal.function),
+                round(float(signal.distance_edge) / self.tolerance),
+            )
+
+        self.match_by_key("signals", key)
+
+    def match_routes(self):
+        def key(route, is_new):
+            ref = self.ref if is_new else (lambda element: element and element.uuid)
+            return ref(route.start_signal), ref(route.end_signal)
+
+        self.match_by_key("routes", key)
+
+
+def diff_topologies(
+    old: "Topology",
+    new: "Topology",
+    match_geometry: bool = False,
+    tolerance: float = 0.01,
+    old_fingerprint: Optional[TopologyFingerprint] = None,
+    new_fingerprint: Optional[TopologyFingerprint] = None,
+) -> TopologyDiff:
+    """Returns the differences between an old and a new version of a Topology.
+
+    Parameters
+    ----------
+    match_geometry: bool
+        Whether elements with different uuids are matched by geometry (default is False)
+    tolerance: float
+        The maximum distance in meters of matched Nodes and Signals (default is 0.01)
+    old_fingerprint, new_fingerprint: TopologyFingerprint
+        Fingerprints that are kept up to date by the caller, so that the Topologies do not
+        have to be hashed again (default is None)
+    """
+
+    old_fingerprint = old_fingerprint or old.fingerprint()
+    new_fingerprint = new_fingerprint or new.fingerprint()
+    result = TopologyDiff()
+    if old_fingerprint == new_fingerprint:
+        return result
+
+    removed: dict[str, dict] = {}
+    added: dict[str, dict] = {}
+    candidates: dict[str, list[tuple[BaseElement, BaseElement]]] = {}
+    for kind in ELEMENT_KINDS:
+        old_elements, new_elements = getattr(old, kind), getattr(new, kind)
+        old_digests, new_digests = old_fingerprint.digests[kind], new_fingerprint.digests[kind]
+        removed[kind] = {
+            uuid: element for uuid, element in old_elements.items() if uuid not in new_elements
+        }
+        added[kind] = {
+            uuid: element for uuid, element in new_elements.items() if uuid not in old_elements
+        }
+        candidates[kind] = [
+            (element, new_elements[uuid])
+            for uuid, element in old_elements.items()
+            if uuid in new_elements and old_digests.get(uuid) != new_digests.get(uuid)
+        ]
+
+    matcher = _GeometryMatcher(removed, added, tolerance)
+    if match_geometry:
+        matcher.match_nodes()
+        matcher.match_edges()
+        matcher.match_signals()
+        matcher.match_routes()
+        result.matched_by_geometry = dict(matcher.mapping)
+        for kind in ELEMENT_KINDS:
+            new_elements = getattr(new, kind)
+            candidates[kind].extend(
+                (getattr(old, kind)[old_uuid], new_elements[new_uuid])
+                for new_uuid, old_uuid in matcher.mapping.items()
+                if new_uuid in new_elements
+            )
+
+    for kind in ELEMENT_KINDS:
+        changes: ElementChanges = getattr(result, kind)
+        changes.removed = list(removed[kind].values())
+        changes.added = list(added[kind].values())
+        old_digests = old_fingerprint.digests[kind]
+        for old_element, new_element in candidates[kind]:
+            # Elements whose references were matched by geometry have to be hashed again
+            if not matcher.mapping or old_digests.get(old_element.uuid) != element_digest(
+                new_element, matcher.ref
+            ):
+                changes.changed.append((old_element, new_element))
+    return result
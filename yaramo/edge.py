@@ -2,6 +2,7 @@ from typing import List, Optional
 
 from yaramo.base_element import BaseElement
 from yaramo.geo_node import GeoNode
+from yaramo.instrumentation import instrumented
 from yaramo.node import Node
 from yaramo.vacancy_section import VacancySection
 
@@ -56,6 +57,7 @@ class Edge(BaseElement):
             return self.node_b
         return self.node_a
 
+    @instrumented
     def update_length(self):
         self.length = self.__get_length()
 
@@ -145,10 +147,12 @@ class Edge(BaseElement):
             "node_b": self.node_b.uuid,
             "intermediate_geo_nodes": [geo_node.uuid for geo_node in self.intermediate_geo_nodes],
             "signals": [signal.uuid for signal in self.signals],
+            "vacancy_section": self.vacancy_section.uuid if self.vacancy_section else None,
         }
         objects = dict()
         for geo_node in self.intermediate_geo_nodes:
             geo_node_object, serialized_geo_node = geo_node.to_serializable()
-            objects = {**objects, geo_node.uuid: geo_node_object, **serialized_geo_node}
+            objects[geo_node.uuid] = geo_node_object
+            objects.update(serialized_geo_node)
 
         return {**attributes, **references}, objects
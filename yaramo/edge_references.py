@@ -0,0 +1,88 @@
+from typing import Iterable
+
+from yaramo.route import Route
+from yaramo.trip import Trip
+
+
+class EdgeReferences(object):
+    """Reverse indexes from the uuids of Edges to the uuids of the Routes and Trips
+    containing them.
+
+    A Route or Trip has to be updated in the index whenever its edges change.
+    """
+
+    def __init__(self, routes: Iterable[Route] = (), trips: Iterable[Trip] = ()):
+        self._routes_by_edge: dict[str, set[str]] = {}
+        self._trips_by_edge: dict[str, set[str]] = {}
+        # The indexed edges of every Route and Trip, needed for updates
+        self._route_edges: dict[str, set[str]] = {}
+        self._trip_edges: dict[str, set[str]] = {}
+        for route in routes:
+            self.add_route(route)
+        for trip in trips:
+            self.add_trip(trip)
+
+    @staticmethod
+    def _add(by_edge, element_edges, uuid: str, edges):
+        if uuid in element_edges:
+            EdgeReferences._remove(by_edge, element_edges, uuid)
+        edge_uuids = {edge.uuid for edge in edges if edge is not None}
+        element_edges[uuid] = edge_uuids
+        for edge_uuid in edge_uuids:
+            by_edge.setdefault(edge_uuid, set()).add(uuid)
+
+    @staticmethod
+    def _remove(by_edge, element_edges, uuid: str):
+        for edge_uuid in element_edges.pop(uuid, ()):
+            uuids = by_edge[edge_uuid]
+            uuids.discard(uuid)
+            if not uuids:
+                del by_edge[edge_uuid]
+
+    def add_route(self, route: Route):
+        self._add(self._routes_by_edge, self._route_edges, route.uuid, route.edges)
+
+    def remove_route(self, route: Route):
+        self._remove(self._routes_by_edge, self._route_edges, route.uuid)
+
+    def update_route(self, route: Route):
+        """Reindexes a Route after its edges have changed."""
+        self.add_route(route)
+
+    def add_trip(self, trip: Trip):
+        self._add(self._trips_by_edge, self._trip_edges, trip.uuid, trip.edges)
+
+    def remove_trip(self, trip: Trip):
+        self._remove(self._trips_by_edge, self._trip_edges, trip.uuid)
+
+    def update_trip(self, trip: Trip):
+        """Reindexes a Trip after its edges have changed."""
+        self.add_trip(trip)
+
+    def routes(self, edge_uuid: str) -> set[str]:
+        """Returns the uuids of the Routes containing the Edge (do not modify it)."""
+        return self._routes_by_edge.get(edge_uuid, set())
+
+    def trips(self, edge_uuid: str) -> set[str]:
+        """Returns the uuids of the Trips containing the Edge (do not modify it)."""
+        return self._trips_by_edge.get(edge_uuid, set())
+
+    def replace(self, old_edge_uuids: Iterable[str], new_edge_uuids: Iterable[str]):
+        """Moves all references to the old Edges to the new Edges, after the Edges have been
+        replaced in the Routes and Trips. Takes time proportional to the affected references."""
+
+        old_edge_uuids, new_edge_uuids = set(old_edge_uuids), list(new_edge_uuids)
+        for by_edge, element_edges in (
+            (self._routes_by_edge, self._route_edges),
+            (self._trips_by_edge, self._trip_edges),
+        ):
+            uuids = set()
+            for edge_uuid in old_edge_uuids:
+                uuids |= by_edge.pop(edge_uuid, set())
+            for uuid in uuids:
+                edges = element_edges[uuid]
+                edges -= old_edge_uuids
+                edges.update(new_edge_uuids)
+            if uuids:
+                for edge_uuid in new_edge_uuids:
+                    by_edge.setdefault(edge_uuid, set()).update(uuids)
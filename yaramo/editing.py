@@ -0,0 +1,262 @@
+"""Local edit operations on the track network of a Topology.
+
+Splitting and merging Edges redistributes the intermediate GeoNodes and Signals, patches the
+connections of the Nodes and replaces the Edges in all Routes and Trips. Affected Routes and
+Trips are found with the Topology's edge_references, so the operations take time proportional
+to the local change.
+"""
+
+from typing import Optional
+
+from yaramo.edge import Edge
+from yaramo.geo_node import GeoNode
+from yaramo.geometry import have_same_coordinate_system, polyline_length
+from yaramo.node import Node
+from yaramo.signal import SignalDirection
+
+
+def replace_connection(node: Node, old: Node, new: Node):
+    """Replaces the connection of node to old by a connection to new."""
+
+    for index, other in enumerate(node.connected_nodes):
+        if other is old:
+            node.connected_nodes[index] = new
+            break
+    for side in ("connected_on_head", "connected_on_left", "connected_on_right"):
+        if getattr(node, side) is old:
+            setattr(node, side, new)
+
+
+def geometric_length(edge: Edge) -> Optional[float]:
+    """Returns the length of the geometry of the Edge or None if it has no (consistent) one."""
+
+    geo_nodes = [edge.node_a.geo_node, *edge.intermediate_geo_nodes, edge.node_b.geo_node]
+    if not have_same_coordinate_system(
+        geo_node.geo_point if geo_node else None for geo_node in geo_nodes
+    ):
+        return None
+    return polyline_length(geo_nodes)
+
+
+def edge_length(edge: Edge) -> Optional[float]:
+    """Returns edge.length or, if it is not set, the length of the geometry of the Edge."""
+    return edge.length if edge.length is not None else geometric_length(edge)
+
+
+def _split_geometry(
+    edge: Edge, fraction: float
+) -> tuple[list[GeoNode], Optional[GeoNode], list[GeoNode]]:
+    """Returns the intermediate GeoNodes before the fraction of the geometric length of the
+    Edge, a new GeoNode at that position and the intermediate GeoNodes after it."""
+
+    geo_nodes = [edge.node_a.geo_node, *edge.intermediate_geo_nodes, edge.node_b.geo_node]
+    if not have_same_coordinate_system(
+        geo_node.geo_point if geo_node else None for geo_node in geo_nodes
+    ):
+        return [], None, list(edge.intermediate_geo_nodes)
+
+    target = fraction * polyline_length(geo_nodes)
+    travelled = 0.0
+    for index in range(len(geo_nodes) - 1):
+        start, end = geo_nodes[index], geo_nodes[index + 1]
+        segment = start.get_distance_to_other_geo_node(end)
+        if travelled + segment >= target or index == len(geo_nodes) - 2:
+            t = (target - travelled) / segment if segment > 0 else 0.0
+            t = min(1.0, max(0.0, t))
+            x = start.geo_point.x + t * (end.geo_point.x - start.geo_point.x)
+            y = start.geo_point.y + t * (end.geo_point.y - start.geo_point.y)
+            # geo_nodes[index] is the last GeoNode before the split, geo_nodes[0] is node_a
+            return geo_nodes[1 : index + 1], type(start)(x, y), geo_nodes[index + 1 : -1]
+        travelled += segment
+
+
+def _replace_in_trips(topology: "Topology", old_edges: list[Edge], new_edges: list[Edge]):
+    """Replaces the old Edges in all Trips by the new Edges, which form a chain from
+    new_edges[0].node_a to new_edges[-1].node_b and are reversed for Trips running the other
+    way."""
+
+    start_node, end_node = new_edges[0].node_a, new_edges[-1].node_b
+    references = topology.edge_references
+    trip_uuids = set().union(*(references.trips(edge.uuid) for edge in old_edges))
+    for trip_uuid in trip_uuids:
+        trip = topology.trips[trip_uuid]
+        positions = [index for index, edge in enumerate(trip.edges) if edge in old_edges]
+        first, last = positions[0], positions[-1]
+        forward = True
+        if first > 0:
+            forward = trip.edges[first - 1].is_node_connected(start_node)
+        elif last + 1 < len(trip.edges):
+            forward = trip.edges[last + 1].is_node_connected(end_node)
+        trip.edges[first : last + 1] = new_edges if forward else list(reversed(new_edges))
+
+
+def _replace_edges(topology: "Topology", old_edges: list[Edge], new_edges: list[Edge]):
+    references = topology.edge_references
+    route_uuids = set().union(*(references.routes(edge.uuid) for edge in old_edges))
+    for route_uuid in route_uuids:
+        route = topology.routes[route_uuid]
+        for edge in old_edges:
+            route.edges.discard(edge)
+        route.edges.update(new_edges)
+    _replace_in_trips(topology, old_edges, new_edges)
+    references.replace([edge.uuid for edge in old_edges], [edge.uuid for edge in new_edges])
+
+    for edge in old_edges:
+        topology.remove_edge(edge)
+    for edge in new_edges:
+        topology.add_edge(edge)
+
+
+def split_edge(topology: "Topology", edge: Edge, offset: float, node: Optional[Node] = None):
+    """Splits an Edge at an offset from its node_a into two Edges connected by a Node.
+
+    Signals before the offset stay on the first Edge, the others move to the second Edge with
+    their distance_edge reduced by offset. Returns the Node and both Edges.
+
+    Parameters
+    ----------
+    offset: float
+        The distance from node_a in the unit of edge.length (strictly between 0 and length)
+    node: Node
+        The Node to insert (default is a new Node at the interpolated position)
+    """
+
+    length = edge.length if edge.length is not None else geometric_length(edge)
+    if length is None:
+        raise ValueError(f"The length of Edge {edge.uuid} is unknown")
+    if not 0 < offset < length:
+        raise ValueError(f"Offset {offset} is not within Edge {edge.uuid} of length {length}")
+
+    before, geo_node, after = _split_geometry(edge, offset / length)
+    if node is None:
+        node = Node(geo_node=geo_node)
+    topology.add_node(node)
+
+    first = Edge(
+        edge.node_a,
+        node,
+        vacancy_section=edge.vacancy_section,
+        length=offset,
+        intermediate_geo_nodes=before,
+        maximum_speed=edge.maximum_speed,
+    )
+    second = Edge(
+        node,
+        edge.node_b,
+        vacancy_section=edge.vacancy_section,
+        length=length - offset,
+        intermediate_geo_nodes=after,
+        maximum_speed=edge.maximum_speed,
+    )
+    for signal in edge.signals:
+        if signal.distance_edge < offset:
+            signal.edge = first
+        else:
+            signal.edge = second
+            signal.distance_edge -= offset
+        signal.edge.signals.append(signal)
+
+    replace_connection(edge.node_a, edge.node_b, node)
+    replace_connection(edge.node_b, edge.node_a, node)
+    node.connected_nodes.extend([edge.node_a, edge.node_b])
+
+    _replace_edges(topology, [edge], [first, second])
+    return node, first, second
+
+
+def merge_obstacle(first: Edge, second: Edge) -> Optional[str]:
+    """Returns why two Edges cannot be merged or None if they can."""
+
+    if first is second:
+        return "the Edges are identical"
+    if first.node_a in (second.node_a, second.node_b):
+        node = first.node_a
+    elif first.node_b in (second.node_a, second.node_b):
+        node = first.node_b
+    else:
+        return "the Edges do not share a Node"
+    if len(node.connected_nodes) != 2:
+        return f"Node {node.uuid} is not connected to exactly two Nodes"
+    previous_node, next_node = first.get_other_node(node), second.get_other_node(node)
+    if previous_node is next_node or node in (previous_node, next_node):
+        return "the merged Edge would be a loop"
+    if next_node in previous_node.connected_nodes:
+        return "the merged Edge would duplicate an existing connection"
+    if first.vacancy_section is not second.vacancy_section:
+        return "the Edges belong to different VacancySections"
+    if first.maximum_speed != second.maximum_speed:
+        return "the Edges have different maximum speeds"
+    first_length = first.length if first.length is not None else geometric_length(first)
+    if first_length is None and (second.signals or (first.node_a is node and first.signals)):
+        return f"the length of Edge {first.uuid} is unknown"
+    second_length = second.length if second.length is not None else geometric_length(second)
+    if second_length is None and second.node_b is node and second.signals:
+        return f"the length of Edge {second.uuid} is unknown"
+    return None
+
+
+def merge_edges(topology: "Topology", first: Edge, second: Edge) -> Edge:
+    """Replaces two Edges sharing a Node connected to exactly two Nodes by a single Edge.
+
+    The shared Node is removed and becomes an intermediate GeoNode of the new Edge, which runs
+    from the other Node of first to the other Node of second. The Signals of both Edges are moved
+    to the new Edge with recomputed distance_edge (and direction, if the orientation of their
+    Edge is reversed). Raises a ValueError if the Edges cannot be merged (see merge_obstacle).
+    """
+
+    obstacle = merge_obstacle(first, second)
+    if obstacle is not None:
+        raise ValueError(f"Cannot merge Edges {first.uuid} and {second.uuid}: {obstacle}")
+
+    node = first.node_a if first.node_a in (second.node_a, second.node_b) else first.node_b
+    previous_node, next_node = first.get_other_node(node), second.get_other_node(node)
+    first_reversed = first.node_a is node
+    second_reversed = second.node_b is node
+    first_length = first.length if first.length is not None else geometric_length(first)
+    second_length = second.length if second.length is not None else geometric_length(second)
+
+    first_geo_nodes = list(first.intermediate_geo_nodes)
+    if first_reversed:
+        first_geo_nodes.reverse()
+    second_geo_nodes = list(second.intermediate_geo_nodes)
+    if second_reversed:
+        second_geo_nodes.reverse()
+    merged = Edge(
+        previous_node,
+        next_node,
+        vacancy_section=first.vacancy_section,
+        length=(
+            first_length + second_length
+            if first_length is not None and second_length is not None
+            else None
+        ),
+        intermediate_geo_nodes=first_geo_nodes
+        + ([node.geo_node] if node.geo_node else [])
+        + second_geo_nodes,
+        maximum_speed=first.maximum_speed,
+    )
+
+    for edge, reversed_, offset, length in (
+        (first, first_reversed, 0.0, first_length),
+        (second, second_reversed, first_length, second_length),
+    ):
+        for signal in edge.signals:
+            distance = signal.distance_edge
+            if reversed_:
+                distance = length - distance
+                signal.direction = (
+                    SignalDirection.GEGEN
+                    if signal.direction == SignalDirection.IN
+                    else SignalDirection.IN
+                )
+                signal.side_distance = -signal.side_distance
+                topology.update_signal(signal)
+            signal.distance_edge = offset + distance
+            signal.edge = merged
+            merged.signals.append(signal)
+
+    replace_connection(previous_node, node, next_node)
+    replace_connection(next_node, node, previous_node)
+    topology.remove_node(node)
+    _replace_edges(topology, [first, second], [merged])
+    return merged
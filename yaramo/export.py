@@ -0,0 +1,313 @@
+"""Streaming exports of a Topology for analytics.
+
+iter_records traverses the Topology once and yields flat records of the Nodes, Edges (with their
+geometry as a list of coordinates), Signals and Routes. write_arrow collects them column-wise
+into record batches of Arrow IPC or Parquet files (one per element kind), write_geojson writes
+them as line-delimited GeoJSON features. Neither builds the whole export in memory.
+
+The Arrow export requires pyarrow, which is an optional dependency (the arrow extra) and only
+imported by write_arrow.
+"""
+
+import os
+from typing import Iterable, Iterator, Optional, TextIO
+
+import simplejson as json
+
+from yaramo.edge import Edge
+from yaramo.geo_node import GeoNode
+from yaramo.geo_point import DbrefGeoPoint, Wgs84GeoPoint
+from yaramo.node import Node
+from yaramo.route import Route
+from yaramo.signal import Signal
+
+ELEMENT_KINDS = ("nodes", "edges", "signals", "routes")
+
+DEFAULT_BATCH_SIZE = 64 * 1024
+# An Edge with a long geometry counts as one row per coordinate towards the batch size
+DEFAULT_MAX_BATCH_COORDINATES = 1024 * 1024
+
+_COORDINATE_SYSTEMS = {Wgs84GeoPoint: "wgs84", DbrefGeoPoint: "dbref"}
+
+
+def _uuid(element) -> Optional[str]:
+    return element.uuid if element is not None else None
+
+
+def _coordinate_system(geo_nodes: Iterable[GeoNode]) -> Optional[str]:
+    """Returns the coordinate system of the GeoNodes, "mixed" if they differ."""
+
+    systems = {_COORDINATE_SYSTEMS.get(type(geo_node.geo_point)) for geo_node in geo_nodes}
+    if not systems:
+        return None
+    return systems.pop() if len(systems) == 1 else "mixed"
+
+
+def node_record(node: Node) -> dict:
+    geo_point = node.geo_node.geo_point if node.geo_node else None
+    return {
+        "uuid": node.uuid,
+        "name": node.name,
+        "coordinate_system": _coordinate_system([node.geo_node] if node.geo_node else []),
+        "x": geo_point.x if geo_point else None,
+        "y": geo_point.y if geo_point else None,
+        "turnout_side": node.turnout_side,
+        "connected_on_head": _uuid(node.connected_on_head),
+        "connected_on_left": _uuid(node.connected_on_left),
+        "connected_on_right": _uuid(node.connected_on_right),
+    }
+
+
+def edge_record(edge: Edge) -> dict:
+    geo_nodes = [
+        geo_node
+        for geo_node in (edge.node_a.geo_node, *edge.intermediate_geo_nodes, edge.node_b.geo_node)
+        if geo_node is not None
+    ]
+    return {
+        "uuid": edge.uuid,
+        "name": edge.name,
+        "node_a": edge.node_a.uuid,
+        "node_b": edge.node_b.uuid,
+        "length": edge.length,
+        "maximum_speed": edge.maximum_speed,
+        "vacancy_section": _uuid(edge.vacancy_section),
+        "coordinate_system": _coordinate_system(geo_nodes),
+        "coordinates": [[geo_node.geo_point.x, geo_node.geo_point.y] for geo_node in geo_nodes],
+    }
+
+
+def signal_record(signal: Signal) -> dict:
+    return {
+        "uuid": signal.uuid,
+        "name": signal.name,
+        "edge": _uuid(signal.edge),
+        "distance_edge": signal.distance_edge,
+        "direction": str(signal.direction),
+        "side_distance": signal.side_distance,
+        "function": str(signal.function),
+        "kind": str(signal.kind),
+        "system": str(signal.system),
+        "classification_number": signal.classification_number,
+        "supported_states": sorted(str(state) for state in signal.supported_states),
+    }
+
+
+def route_record(route: Route) -> dict:
+    return {
+        "uuid": route.uuid,
+        "name": route.name,
+        "start_signal": _uuid(route.start_signal),
+        "end_signal": _uuid(route.end_signal),
+        "maximum_speed": route.maximum_speed,
+        "edges": sorted(edge.uuid for edge in route.edges if edge is not None),
+        "vacancy_sections": sorted(
+            vacancy_section.uuid
+            for vacancy_section in route.vacancy_sections
+            if vacancy_section is not None
+        ),
+    }
+
+
+_RECORDS = {
+    "nodes": node_record,
+    "edges": edge_record,
+    "signals": signal_record,
+    "routes": route_record,
+}
+
+
+def iter_records(
+    topology: "Topology", kinds: Iterable[str] = ELEMENT_KINDS
+) -> Iterator[tuple[str, dict]]:
+    """Yields (kind, record) for all elements of the given kinds, kind by kind."""
+
+    for kind in kinds:
+        record = _RECORDS[kind]
+        for element in getattr(topology, kind).values():
+            yield kind, record(element)
+
+
+def _arrow_schemas(pa) -> dict:
+    coordinates = pa.list_(pa.list_(pa.float64(), 2))
+    strings = pa.list_(pa.string())
+    return {
+        "nodes": pa.schema(
+            [
+                ("uuid", pa.string()),
+                ("name", pa.string()),
+                ("coordinate_system", pa.string()),
+                ("x", pa.float64()),
+                ("y", pa.float64()),
+                ("turnout_side", pa.string()),
+                ("connected_on_head", pa.string()),
+                ("connected_on_left", pa.string()),
+                ("connected_on_right", pa.string()),
+            ]
+        ),
+        "edges": pa.schema(
+            [
+                ("uuid", pa.string()),
+                ("name", pa.string()),
+                ("node_a", pa.string()),
+                ("node_b", pa.string()),
+                ("length", pa.float64()),
+                ("maximum_speed", pa.float64()),
+                ("vacancy_section", pa.string()),
+                ("coordinate_system", pa.string()),
+                ("coordinates", coordinates),
+            ]
+        ),
+        "signals": pa.schema(
+            [
+                ("uuid", pa.string()),
+                ("name", pa.string()),
+                ("edge", pa.string()),
+                ("distance_edge", pa.float64()),
+                ("direction", pa.string()),
+                ("side_distance", pa.float64()),
+                ("function", pa.string()),
+                ("kind", pa.string()),
+                ("system", pa.string()),
+                ("classification_number", pa.string()),
+                ("supported_states", strings),
+            ]
+        ),
+        "routes": pa.schema(
+            [
+                ("uuid", pa.string()),
+                ("name", pa.string()),
+                ("start_signal", pa.string()),
+                ("end_signal", pa.string()),
+                ("maximum_speed", pa.float64()),
+                ("edges", strings),
+                ("vacancy_sections", strings),
+            ]
+        ),
+    }
+
+
+def write_arrow(
+    topology: "Topology",
+    directory: str | os.PathLike,
+    format: str = "parquet",
+    kinds: Iterable[str] = ELEMENT_KINDS,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_batch_coordinates: int = DEFAULT_MAX_BATCH_COORDINATES,
+) -> dict[str, str]:
+    """Writes one file per element kind (nodes.parquet, edges.parquet, ...) into directory and
+    returns their paths by kind (kinds without elements are skipped).
+
+    Parameters
+    ----------
+    format: str
+        "parquet" or "ipc" (Arrow IPC files with the extension .arrow)
+    batch_size: int
+        The maximum number of rows per record batch (and Parquet row group)
+    max_batch_coordinates: int
+        The maximum number of Edge coordinates per record batch
+    """
+
+    if format not in ("parquet", "ipc"):
+        raise ValueError(f"Unknown format {format!r}, expected 'parquet' or 'ipc'")
+    try:
+        import pyarrow as pa
+    except ImportError as error:
+        raise ImportError(
+            "Exporting to Arrow or Parquet requires pyarrow (install yaramo[arrow])"
+        ) from error
+    if format == "parquet":
+        import pyarrow.parquet as pq
+
+    schemas = _arrow_schemas(pa)
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    writer = None
+    columns: dict[str, list] = {}
+    rows = coordinates = 0
+
+    def flush():
+        nonlocal rows, coordinates
+        if rows:
+            writer.write_batch(pa.RecordBatch.from_pydict(columns, schema=schemas[current_kind]))
+        for values in columns.values():
+            values.clear()
+        rows = coordinates = 0
+
+    current_kind = None
+    try:
+        for kind, record in iter_records(topology, kinds):
+            if kind != current_kind:
+                if writer is not None:
+                    flush()
+                    writer.close()
+                current_kind = kind
+                schema = schemas[kind]
+                extension = "parquet" if format == "parquet" else "arrow"
+                paths[kind] = os.path.join(directory, f"{kind}.{extension}")
+                if format == "parquet":
+                    writer = pq.ParquetWriter(paths[kind], schema)
+                else:
+                    writer = pa.ipc.new_file(paths[kind], schema)
+                columns = {name: [] for name in schema.names}
+            for name, values in columns.items():
+                values.append(record[name])
+            rows += 1
+            coordinates += len(record.get("coordinates", ()))
+            if rows >= batch_size or coordinates >= max_batch_coordinates:
+                flush()
+        if writer is not None:
+            flush()
+    finally:
+        if writer is not None:
+            writer.close()
+    return paths
+
+
+def _geojson_geometry(kind: str, record: dict) -> Optional[dict]:
+    """Returns the geometry with (longitude, latitude) for WGS84 and (x, y) otherwise."""
+
+    def position(x, y):
+        return [y, x] if record["coordinate_system"] == "wgs84" else [x, y]
+
+    if kind == "nodes" and record["x"] is not None:
+        return {"type": "Point", "coordinates": position(record["x"], record["y"])}
+    if kind == "edges" and len(record["coordinates"]) >= 2:
+        return {
+            "type": "LineString",
+            "coordinates": [position(x, y) for x, y in record["coordinates"]],
+        }
+    return None
+
+
+def write_geojson(
+    topology: "Topology",
+    file: str | os.PathLike | TextIO,
+    kinds: Iterable[str] = ELEMENT_KINDS,
+):
+    """Writes every element as a GeoJSON Feature on its own line (Nodes as Points, Edges as
+    LineStrings, Signals and Routes without geometry) to a path or text file.
+
+    The remaining fields of the records become the properties, together with the kind.
+    Coordinates in other systems than WGS84 are written unchanged.
+    """
+
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "w", encoding="utf-8") as opened:
+            write_geojson(topology, opened, kinds=kinds)
+        return
+
+    for kind, record in iter_records(topology, kinds):
+        geometry = _geojson_geometry(kind, record)
+        properties = {"kind": kind, **record}
+        if geometry is not None:
+            for name in ("x", "y", "coordinates"):
+                properties.pop(name, None)
+        feature = {
+            "type": "Feature",
+            "id": record["uuid"],
+            "geometry": geometry,
+            "properties": properties,
+        }
+        file.write(json.dumps(feature))
+        file.write("\n")
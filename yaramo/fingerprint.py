@@ -0,0 +1,199 @@
+"""Stable content hashes of Topologies and their elements.
+
+The digest of an element covers its own attributes and the uuids of the elements it refers to,
+but not the contents of those elements, so that it can be recomputed for a single changed
+element. The digest of a Topology combines the digests of all its elements independently of
+their order, so that it can be updated element by element as well.
+"""
+
+from hashlib import blake2b
+from typing import Callable, Iterable, Optional
+
+from yaramo.base_element import BaseElement
+from yaramo.edge import Edge
+from yaramo.geo_node import GeoNode
+from yaramo.node import Node
+from yaramo.route import Route
+from yaramo.signal import Signal
+from yaramo.vacancy_section import VacancySection
+
+DIGEST_SIZE = 16
+_MODULUS = 1 << (8 * DIGEST_SIZE)
+
+ELEMENT_KINDS = ("nodes", "edges", "signals", "routes", "vacancy_sections")
+
+
+def _uuid(element: Optional[BaseElement]) -> Optional[str]:
+    return element.uuid if element is not None else None
+
+
+Reference = Callable[[Optional[BaseElement]], Optional[str]]
+
+
+def _number(value) -> Optional[str]:
+    # 50 and 50.0 describe the same length or speed
+    return repr(float(value)) if value is not None else None
+
+
+def _geo_node(geo_node: Optional[GeoNode]) -> Optional[tuple]:
+    if geo_node is None or geo_node.geo_point is None:
+        return None
+    geo_point = geo_node.geo_point
+    return type(geo_point).__name__, _number(geo_point.x), _number(geo_point.y)
+
+
+def _node_content(ref: Reference, node: Node) -> tuple:
+    return (
+        node.name,
+        node.turnout_side,
+        _geo_node(node.geo_node),
+        sorted(ref(other) for other in node.connected_nodes),
+        ref(node.connected_on_head),
+        ref(node.connected_on_left),
+        ref(node.connected_on_right),
+        _number(node.maximum_speed_on_left),
+        _number(node.maximum_speed_on_right),
+    )
+
+
+def _edge_content(ref: Reference, edge: Edge) -> tuple:
+    return (
+        edge.name,
+        ref(edge.node_a),
+        ref(edge.node_b),
+        [_geo_node(geo_node) for geo_node in edge.intermediate_geo_nodes],
+        sorted(ref(signal) for signal in edge.signals),
+        _number(edge.length),
+        _number(edge.maximum_speed),
+        ref(edge.vacancy_section),
+    )
+
+
+def _signal_content(ref: Reference, signal: Signal) -> tuple:
+    # control_member_uuid is generated anew whenever a Signal is created, so it is not content
+    return (
+        signal.name,
+        ref(signal.edge),
+        _number(signal.distance_edge),
+        _number(signal.side_distance),
+        str(signal.direction),
+        str(signal.function),
+        str(signal.kind),
+        str(signal.system),
+        signal.classification_number,
+        sorted(str(state) for state in signal.supported_states),
+        [
+            (
+                type(additional_signal).__name__,
+                [str(symbol) for symbol in additional_signal.symbols],
+            )
+            for additional_signal in signal.additional_signals
+        ],
+    )
+
+
+def _route_content(ref: Reference, route: Route) -> tuple:
+    return (
+        route.name,
+        ref(route.start_signal),
+        ref(route.end_signal),
+        sorted(ref(edge) for edge in route.edges),
+        sorted(
+            ref(vacancy_section)
+            for vacancy_section in route.vacancy_sections
+            if vacancy_section is not None
+        ),
+        _number(route.maximum_speed),
+    )
+
+
+def _vacancy_section_content(ref: Reference, vacancy_section: VacancySection) -> tuple:
+    return (vacancy_section.name,)
+
+
+_CONTENT = {
+    Node: _node_content,
+    Edge: _edge_content,
+    Signal: _signal_content,
+    Route: _route_content,
+    VacancySection: _vacancy_section_content,
+}
+
+
+def element_digest(element: BaseElement, ref: Reference = _uuid) -> bytes:
+    """Returns the digest of a Node, Edge, Signal, Route or VacancySection.
+
+    Parameters
+    ----------
+    ref: Callable[[Optional[BaseElement]], Optional[str]]
+        Returns the identifier used for the element and the elements it refers to
+        (default is their uuid)
+    """
+
+    for element_class, content in _CONTENT.items():
+        if isinstance(element, element_class):
+            data = repr((element_class.__name__, ref(element), content(ref, element)))
+            return blake2b(data.encode("utf-8"), digest_size=DIGEST_SIZE).digest()
+    raise TypeError(f"Cannot fingerprint {type(element).__name__}")
+
+
+class TopologyFingerprint(object):
+    """The per-element digests of a Topology and their order independent combination.
+
+    The fingerprint does not observe the Topology. After an element has been added, changed or
+    removed, update() or remove() has to be called for it to keep the fingerprint in sync, which
+    only rehashes that element.
+    """
+
+    def __init__(self, topology: Optional["Topology"] = None):
+        self.digests: dict[str, dict[str, bytes]] = {kind: {} for kind in ELEMENT_KINDS}
+        self._sum = 0
+        if topology is not None:
+            for kind in ELEMENT_KINDS:
+                self.update_all(getattr(topology, kind).values())
+
+    @staticmethod
+    def _kind(element: BaseElement) -> str:
+        for kind, element_class in zip(ELEMENT_KINDS, _CONTENT):
+            if isinstance(element, element_class):
+                return kind
+        raise TypeError(f"Cannot fingerprint {type(element).__name__}")
+
+    def update(self, element: BaseElement):
+        """Adds or rehashes an element."""
+
+        digests = self.digests[self._kind(element)]
+        previous = digests.get(element.uuid)
+        if previous is not None:
+            self._sum -= int.from_bytes(previous, "big")
+        digest = element_digest(element)
+        digests[element.uuid] = digest
+        self._sum = (self._sum + int.from_bytes(digest, "big")) % _MODULUS
+
+    def update_all(self, elements: Iterable[BaseElement]):
+        for element in elements:
+            self.update(element)
+
+    def remove(self, element: BaseElement):
+        previous = self.digests[self._kind(element)].pop(element.uuid, None)
+        if previous is not None:
+            self._sum = (self._sum - int.from_bytes(previous, "big")) % _MODULUS
+
+    def digest(self) -> bytes:
+        counts = ",".join(str(len(self.digests[kind])) for kind in ELEMENT_KINDS)
+        return blake2b(
+            self._sum.to_bytes(DIGEST_SIZE, "big") + counts.encode("ascii"),
+            digest_size=DIGEST_SIZE,
+        ).digest()
+
+    def hexdigest(self) -> str:
+        return self.digest().hex()
+
+    def __eq__(self, other):
+        return isinstance(other, TopologyFingerprint) and self.digest() == other.digest()
+
+    def __hash__(self):
+        return hash(self.digest())
+
+    def __str__(self):
+        return self.hexdigest()
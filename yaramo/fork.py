@@ -0,0 +1,284 @@
+"""Copy-on-write forks of a Topology for what-if variants.
+
+A fork starts out sharing every element with its parent: its dictionaries (nodes, edges,
+signals, ...) are OverlayDicts, which read through to the parent's dictionaries and only hold
+the elements the fork added, replaced or removed. Creating a fork is therefore O(1) and its
+memory is proportional to its changes.
+
+Shared elements must not be modified through a fork. Before modifying an element, fork.edit
+returns the fork's own shallow copy of it (lists and sets are copied, GeoNodes and other values
+are shared), which replaces the element in the fork's dictionaries. The references of the copies
+to each other are kept up to date, while shared elements keep referring to the parent's
+versions, e.g. the Signals of an edited Edge still refer to the parent's Edge. Code traversing
+a fork therefore follows references with fork.resolve, which returns the fork's version of an
+element:
+
+    edge = fork.edit(fork.edges[uuid])
+    edge.length = 120.0
+    fork.resolve(signal.edge) is edge  # True
+
+To keep the copies up to date, the fork indexes which of its own elements refer to which shared
+elements, so an edit only rewires the elements referring to the copied one. The references of an
+element are indexed when the fork adds it or edit returns it, so modify an element after these
+calls, not after later edits of other elements (fork.resolve is always right).
+
+Changes of the parent after forking show through in the fork, unless the fork has replaced or
+removed the element.
+
+The derived analyses of Topology that traverse the track network by following references
+(signal_distances, lookahead, route_protection, curvature, schematic_layout and freeze) and the
+edits of the network (split_edge, merge_edges, compact) are not supported on forks, they raise
+a NotImplementedError: they would follow shared elements to the parent's versions or modify
+them. Only the dictionaries of a fork, connectivity, the signal_index and the edge_references,
+which are built from the dictionaries, reflect the fork's changes.
+"""
+
+import weakref
+from collections.abc import Mapping, MutableMapping
+from typing import Iterator, Optional, TypeVar
+
+from yaramo.base_element import BaseElement
+from yaramo.bitset import EnumList, EnumSet
+from yaramo.edge import Edge
+from yaramo.node import Node
+from yaramo.ownership import WeakList
+from yaramo.route import Route
+from yaramo.signal import Signal
+from yaramo.topology import Topology
+from yaramo.trip import Trip
+from yaramo.vacancy_section import VacancySection
+
+# The Topology dictionaries by element type
+ELEMENT_DICTIONARIES = (
+    (Node, "nodes"),
+    (Edge, "edges"),
+    (Signal, "signals"),
+    (Route, "routes"),
+    (VacancySection, "vacancy_sections"),
+    (Trip, "trips"),
+)
+
+T = TypeVar("T", bound=BaseElement)
+
+
+class OverlayDict(MutableMapping):
+    """A dictionary that reads through to a base mapping and stores its own changes.
+
+    Keys set in the overlay shadow those of the base, removed keys of the base are remembered
+    and hidden. The base is never modified.
+    """
+
+    def __init__(self, base: Mapping, changed: Optional[set] = None):
+        self.base = base
+        self.local: dict = {}
+        self.removed: set = set()
+        # Collects the keys set in the overlay (if given)
+        self.changed = changed
+
+    def __getitem__(self, key):
+        if key in self.local:
+            return self.local[key]
+        if key in self.removed:
+            raise KeyError(key)
+        return self.base[key]
+
+    def __contains__(self, key):
+        return key in self.local or (key not in self.removed and key in self.base)
+
+    def __setitem__(self, key, value):
+        self.local[key] = value
+        self.removed.discard(key)
+        if self.changed is not None:
+            self.changed.add(key)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self.local.pop(key, None)
+        if key in self.base:
+            self.removed.add(key)
+
+    def __iter__(self) -> Iterator:
+        yield from self.local
+        for key in self.base:
+            if key not in self.local and key not in self.removed:
+                yield key
+
+    def __len__(self):
+        hidden = sum(1 for key in self.removed if key in self.base)
+        added = sum(1 for key in self.local if key not in self.base)
+        return len(self.base) - hidden + added
+
+    def __repr__(self):
+        return f"OverlayDict({len(self.local)} local, {len(self.removed)} removed)"
+
+
+def dictionary_name(element: BaseElement) -> Optional[str]:
+    """Returns the name of the Topology dictionary of the element (None for other values)."""
+
+    for element_type, name in ELEMENT_DICTIONARIES:
+        if isinstance(element, element_type):
+            return name
+    return None
+
+
+def _references(element: BaseElement) -> Iterator[BaseElement]:
+    """The elements referenced by the attributes of element (also in its lists and sets)."""
+
+    for value in list(vars(element).values()):
+        if isinstance(value, (list, WeakList, set)):
+            for item in value:
+                if isinstance(item, BaseElement):
+                    yield item
+        elif isinstance(value, BaseElement):
+            yield value
+        elif isinstance(value, weakref.ReferenceType):
+            referenced = value()
+            if isinstance(referenced, BaseElement):
+                yield referenced
+
+
+def _rewire(element: BaseElement, replacements: dict[str, BaseElement]):
+    """Replaces the references of element (also in its lists and sets) to elements with a uuid
+    in replacements."""
+
+    def replacement(value):
+        if isinstance(value, BaseElement):
+            return replacements.get(value.uuid, value)
+        return value
+
+    for name in list(vars(element)):
+        value = getattr(element, name)
+        if isinstance(value, (list, WeakList)):
+            for index, item in enumerate(value):
+                replaced = replacement(item)
+                if replaced is not item:
+                    value[index] = replaced
+        elif isinstance(value, set):
+            if any(replacement(item) is not item for item in value):
+                setattr(element, name, {replacement(item) for item in value})
+        else:
+            replaced = replacement(value)
+            if replaced is not value:
+                setattr(element, name, replaced)
+
+
+def copy_attributes(element: BaseElement) -> dict:
+    """Returns the attributes of element with copies of its lists, sets (also EnumLists and
+    EnumSets) and dictionaries."""
+
+    attributes = dict(element.__dict__)
+    for name, value in attributes.items():
+        if isinstance(value, WeakList):
+            attributes[name] = WeakList(value)
+        elif isinstance(value, (list, set, dict, EnumList, EnumSet)):
+            attributes[name] = value.copy()
+    return attributes
+
+
+def _unsupported(name: str):
+    def method(self, *args, **kwargs):
+        raise NotImplementedError(
+            f"Topology.{name} is not supported on forks, as it follows the references of shared "
+            "elements to the parent's versions (see yaramo.fork)"
+        )
+
+    method.__name__ = name
+    return method
+
+
+def _copy(element: T) -> T:
+    copy = element.__class__.__new__(element.__class__)
+    copy.__dict__.update(copy_attributes(element))
+    return copy
+
+
+class TopologyFork(Topology):
+    """A copy-on-write variant of a Topology (see Topology.fork)."""
+
+    def __init__(self, parent: Topology, **kwargs):
+        super().__init__(**kwargs)
+        self.parent = parent
+        self.created_with = parent.created_with
+        # The uuids of the own elements whose references are not indexed yet
+        self._pending: set[str] = set()
+        # The uuids of the own elements referring to a shared element, by its uuid
+        self._referrers: dict[str, set[str]] = {}
+        for _, name in ELEMENT_DICTIONARIES:
+            setattr(self, name, OverlayDict(getattr(parent, name), self._pending))
+
+    signal_distances = property(_unsupported("signal_distances"))
+    lookahead = property(_unsupported("lookahead"))
+    prepare_concurrent_reads = _unsupported("prepare_concurrent_reads")
+    route_protection = _unsupported("route_protection")
+    curvature = _unsupported("curvature")
+    schematic_layout = _unsupported("schematic_layout")
+    freeze = _unsupported("freeze")
+    split_edge = _unsupported("split_edge")
+    merge_edges = _unsupported("merge_edges")
+    compact = _unsupported("compact")
+
+    def _own(self, uuid: str) -> Optional[BaseElement]:
+        """The element the fork added or copied with that uuid, or None."""
+
+        for _, name in ELEMENT_DICTIONARIES:
+            element = getattr(self, name).local.get(uuid)
+            if element is not None:
+                return element
+        return None
+
+    def _index_pending(self):
+        for uuid in self._pending:
+            element = self._own(uuid)
+            if element is None:
+                continue
+            for referenced in _references(element):
+                if self._own(referenced.uuid) is None:
+                    self._referrers.setdefault(referenced.uuid, set()).add(uuid)
+        self._pending.clear()
+
+    def resolve(self, element: Optional[T]) -> Optional[T]:
+        """Returns the fork's version of an element (None if the fork removed it). Values that
+        are no Topology elements, like GeoNodes, are returned unchanged."""
+
+        name = dictionary_name(element) if element is not None else None
+        if name is None:
+            return element
+        return getattr(self, name).get(element.uuid)
+
+    def edit(self, element: T) -> T:
+        """Returns the fork's own copy of element, which can be modified without changing the
+        parent. The element is copied on the first call only, elements added to the fork are
+        returned as they are."""
+
+        name = dictionary_name(element)
+        elements = getattr(self, name) if name is not None else None
+        if elements is None or element.uuid not in elements:
+            raise ValueError(f"{element} is not an element of the fork")
+        self._index_pending()
+        if element.uuid in elements.local:
+            # It is probably modified next
+            self._pending.add(element.uuid)
+            return elements.local[element.uuid]
+
+        copy = _copy(elements[element.uuid])
+        replacements = {}
+        for referenced in _references(copy):
+            own = self._own(referenced.uuid)
+            if own is not None and own is not referenced:
+                replacements[own.uuid] = own
+        if replacements:
+            _rewire(copy, replacements)
+        for uuid in self._referrers.pop(copy.uuid, ()):
+            other = self._own(uuid)
+            if other is not None:
+                _rewire(other, {copy.uuid: copy})
+        elements[copy.uuid] = copy
+        return copy
+
+    def is_shared(self, element: BaseElement) -> bool:
+        """Returns whether the fork shares the element with its parent."""
+
+        name = dictionary_name(element)
+        elements = getattr(self, name)
+        return element.uuid not in elements.local and element.uuid in elements
@@ -0,0 +1,591 @@
+import json
+import math
+import weakref
+from array import array
+from collections.abc import Mapping
+from multiprocessing import shared_memory
+from typing import Iterator, Optional
+
+from yaramo.geo_point import DbrefGeoPoint
+from yaramo.signal import SignalDirection, SignalFunction, SignalKind, SignalState, SignalSystem
+
+_MAGIC = b"YRMFRZ01"
+_HEADER_SIZE_BYTES = 8
+_ALIGNMENT = 8
+
+_NO_COORDINATES, _WGS84, _DBREF = 0, 1, 2
+_TURNOUT_SIDES = [None, "left", "right"]
+
+
+def _nan_if_none(value) -> float:
+    return math.nan if value is None else float(value)
+
+
+def _none_if_nan(value: float):
+    return None if math.isnan(value) else value
+
+
+class _Builder(object):
+    """Collects the arrays (sections) of a FrozenTopology while traversing a Topology."""
+
+    def __init__(self):
+        self.sections: dict[str, array] = {}
+        self.strings = bytearray()
+        self.string_offsets = array("q", [0])
+
+    def section(self, name: str, typecode: str) -> array:
+        self.sections[name] = array(typecode)
+        return self.sections[name]
+
+    def string(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        self.strings += str(value).encode("utf-8")
+        self.string_offsets.append(len(self.strings))
+        return len(self.string_offsets) - 2
+
+    def build(self, shared: bool):
+        self.sections["string_offsets"] = self.string_offsets
+        self.sections["strings"] = array("B", self.strings)
+
+        layout, offset = {}, 0
+        for name, values in self.sections.items():
+            layout[name] = [values.typecode, offset, len(values)]
+            offset += -(-len(values) * values.itemsize // _ALIGNMENT) * _ALIGNMENT
+        header = json.dumps(layout).encode("utf-8")
+        data_start = -(-(len(_MAGIC) + _HEADER_SIZE_BYTES + len(header)) // _ALIGNMENT)
+        data_start *= _ALIGNMENT
+        size = data_start + offset
+
+        memory = shared_memory.SharedMemory(create=True, size=max(size, 1)) if shared else None
+        buffer = memory.buf if shared else memoryview(bytearray(size))
+        buffer[: len(_MAGIC)] = _MAGIC
+        header_start = len(_MAGIC) + _HEADER_SIZE_BYTES
+        buffer[len(_MAGIC) : header_start] = len(header).to_bytes(_HEADER_SIZE_BYTES, "little")
+        buffer[header_start : header_start + len(header)] = header
+        for name, values in self.sections.items():
+            start = data_start + layout[name][1]
+            buffer[start : start + len(values) * values.itemsize] = memoryview(values).cast("B")
+        return memory, buffer
+
+
+def _release(views: list[memoryview], buffer: memoryview, memory):
+    for view in reversed(views):
+        view.release()
+    views.clear()
+    buffer.release()
+    if memory is not None:
+        memory.close()
+
+
+class FrozenTopology(object):
+    """An immutable, array-backed snapshot of a Topology.
+
+    All data of the snapshot lives in one contiguous buffer of flat arrays, which is placed in
+    shared memory by default. Other processes can attach to that buffer by its name (or by
+    unpickling the FrozenTopology, which only transfers the name) without copying or parsing
+    anything. The elements can be read through Node, Edge, Signal and Route like views, which
+    are created on access and only hold their index into the arrays.
+
+    The process that froze the Topology owns the shared memory and has to unlink() it when
+    it is not needed anymore. Every process closes its access with close(), which also happens
+    when the FrozenTopology is garbage collected or the process exits.
+    """
+
+    def __init__(self, buffer: memoryview | bytes, memory: shared_memory.SharedMemory = None):
+        buffer = memoryview(buffer)
+        self._memory = memory
+        self._buffer = buffer
+        if bytes(buffer[: len(_MAGIC)]) != _MAGIC:
+            raise ValueError("The buffer does not contain a FrozenTopology")
+        header_start = len(_MAGIC) + _HEADER_SIZE_BYTES
+        header_size = int.from_bytes(buffer[len(_MAGIC) : header_start], "little")
+        layout = json.loads(bytes(buffer[header_start : header_start + header_size]))
+        data_start = -(-(header_start + header_size) // _ALIGNMENT) * _ALIGNMENT
+
+        self._views: list[memoryview] = []
+        for name, (typecode, offset, count) in layout.items():
+            start = data_start + offset
+            raw = buffer[start : start + count * array(typecode).itemsize]
+            view = raw.cast(typecode)
+            self._views.extend([raw, view])
+            setattr(self, "_" + name, view)
+
+        # Releases the views before SharedMemory.__del__ closes the memory, which fails while
+        # views of it exist (e.g. in processes that attached by unpickling)
+        self._finalizer = weakref.finalize(self, _release, self._views, buffer, memory)
+
+        self.nodes = _FrozenElements(self, FrozenNode, self._node_uuid)
+        self.edges = _FrozenElements(self, FrozenEdge, self._edge_uuid)
+        self.signals = _FrozenElements(self, FrozenSignal, self._signal_uuid)
+        self.routes = _FrozenElements(self, FrozenRoute, self._route_uuid)
+
+    @property
+    def name(self) -> Optional[str]:
+        """The name of the shared memory block (None if the snapshot is not shared)."""
+        return self._memory.name if self._memory else None
+
+    @classmethod
+    def from_topology(cls, topology: "Topology", shared: bool = True) -> "FrozenTopology":
+        builder = _Builder()
+        node_index = {uuid: index for index, uuid in enumerate(topology.nodes)}
+        edge_index = {uuid: index for index, uuid in enumerate(topology.edges)}
+        signal_index = {uuid: index for index, uuid in enumerate(topology.signals)}
+
+        def index_of(element, indices: dict) -> int:
+            return indices.get(element.uuid, -1) if element is not None else -1
+
+        node_uuid, node_name = builder.section("node_uuid", "q"), builder.section("node_name", "q")
+        node_x, node_y = builder.section("node_x", "d"), builder.section("node_y", "d")
+        node_coordinate_system = builder.section("node_coordinate_system", "b")
+        node_turnout_side = builder.section("node_turnout_side", "b")
+        node_connections = [
+            builder.section(f"node_{side}", "q") for side in ("head", "left", "right")
+        ]
+        node_speed_left = builder.section("node_speed_left", "d")
+        node_speed_right = builder.section("node_speed_right", "d")
+        adjacency_offsets = builder.section("node_adjacency_offsets", "q")
+        adjacency = builder.section("node_adjacency", "q")
+        adjacency_offsets.append(0)
+        for node in topology.nodes.values():
+            node_uuid.append(builder.string(node.uuid))
+            node_name.append(builder.string(node.name))
+            geo_point = node.geo_node.geo_point if node.geo_node else None
+            node_x.append(geo_point.x if geo_point else math.nan)
+            node_y.append(geo_point.y if geo_point else math.nan)
+            node_coordinate_system.append(
+                _NO_COORDINATES
+                if geo_point is None
+                else (_DBREF if isinstance(geo_point, DbrefGeoPoint) else _WGS84)
+            )
+            node_turnout_side.append(
+                _TURNOUT_SIDES.index(node.turnout_side)
+                if node.turnout_side in _TURNOUT_SIDES
+                else 0
+            )
+            anschluss = (node.connected_on_head, node.connected_on_left, node.connected_on_right)
+            if len(node.connected_nodes) == 3 and anschluss[0] is None:
+                if all(other.geo_node for other in node.connected_nodes + [node]):
+                    anschluss = node.determine_anschluss_of_all_nodes() or anschluss
+            for connection, connected_node in zip(node_connections, anschluss):
+                connection.append(index_of(connected_node, node_index))
+            node_speed_left.append(_nan_if_none(node.maximum_speed_on_left))
+            node_speed_right.append(_nan_if_none(node.maximum_speed_on_right))
+            adjacency.extend(index_of(other, node_index) for other in node.connected_nodes)
+            adjacency_offsets.append(len(adjacency))
+
+        edge_uuid, edge_name = builder.section("edge_uuid", "q"), builder.section("edge_name", "q")
+        edge_node_a = builder.section("edge_node_a", "q")
+        edge_node_b = builder.section("edge_node_b", "q")
+        edge_length = builder.section("edge_length", "d")
+        edge_speed = builder.section("edge_speed", "d")
+        edge_vacancy_section = builder.section("edge_vacancy_section", "q")
+        geometry_offsets = builder.section("edge_geometry_offsets", "q")
+        geometry_x, geometry_y = builder.section("geometry_x", "d"), builder.section(
+            "geometry_y", "d"
+        )
+        edge_signal_offsets = builder.section("edge_signal_offsets", "q")
+        edge_signals = builder.section("edge_signals", "q")
+        geometry_offsets.append(0)
+        edge_signal_offsets.append(0)
+        for edge in topology.edges.values():
+            edge_uuid.append(builder.string(edge.uuid))
+            edge_name.append(builder.string(edge.name))
+            edge_node_a.append(index_of(edge.node_a, node_index))
+            edge_node_b.append(index_of(edge.node_b, node_index))
+            edge_length.append(_nan_if_none(edge.length))
+            edge_speed.append(_nan_if_none(edge.maximum_speed))
+            vacancy_section = edge.vacancy_section
+            edge_vacancy_section.append(
+                builder.string(vacancy_section.uuid if vacancy_section else None)
+            )
+            for geo_node in edge.intermediate_geo_nodes:
+                geometry_x.append(geo_node.geo_point.x)
+                geometry_y.append(geo_node.geo_point.y)
+            geometry_offsets.append(len(geometry_x))
+            edge_signals.extend(index_of(signal, signal_index) for signal in edge.signals)
+            edge_signal_offsets.append(len(edge_signals))
+
+        signal_uuid = builder.section("signal_uuid", "q")
+        signal_name = builder.section("signal_name", "q")
+        signal_edge = builder.section("signal_edge", "q")
+        signal_distance = builder.section("signal_distance", "d")
+        signal_side_distance = builder.section("signal_side_distance", "d")
+        signal_enums = {
+            name: builder.section(f"signal_{name}", "b")
+            for name in ("direction", "function", "kind", "system")
+        }
+        signal_states = builder.section("signal_states", "q")
+        for signal in topology.signals.values():
+            signal_uuid.append(builder.string(signal.uuid))
+            signal_name.append(builder.string(signal.name))
+            signal_edge.append(
+                index_of(signal.edge, edge_index) if not isinstance(signal.edge, str) else -1
+            )
+            signal_distance.append(_nan_if_none(signal.distance_edge))
+            signal_side_distance.append(_nan_if_none(signal.side_distance))
+            for name, section in signal_enums.items():
+                section.append(getattr(signal, name).value)
+            states = 0
+            for state in signal.supported_states:
+                if isinstance(state, SignalState):
+                    states |= 1 << state.value
+            signal_states.append(states)
+
+        route_uuid, route_name = builder.section("route_uuid", "q"), builder.section(
+            "route_name", "q"
+        )
+        route_start = builder.section("route_start_signal", "q")
+        route_end = builder.section("route_end_signal", "q")
+        route_speed = builder.section("route_speed", "d")
+        route_edge_offsets = builder.section("route_edge_offsets", "q")
+        route_edges = builder.section("route_edges", "q")
+        route_edge_offsets.append(0)
+        for route in topology.routes.values():
+            route_uuid.append(builder.string(route.uuid))
+            route_name.append(builder.string(route.name))
+            route_start.append(index_of(route.start_signal, signal_index))
+            route_end.append(index_of(route.end_signal, signal_index))
+            route_speed.append(_nan_if_none(route.maximum_speed))
+            route_edges.extend(index_of(edge, edge_index) for edge in route.edges)
+            route_edge_offsets.append(len(route_edges))
+
+        memory, buffer = builder.build(shared)
+        return cls(buffer, memory)
+
+    @classmethod
+    def attach(cls, name: str) -> "FrozenTopology":
+        """Attaches to the FrozenTopology in the shared memory block with the given name."""
+
+        memory = shared_memory.SharedMemory(name=name)
+        return cls(memory.buf, memory)
+
+    def close(self):
+        """Releases this process' access to the shared memory.
+
+        Views created from this FrozenTopology cannot be used anymore afterwards.
+        """
+
+        self._finalizer()
+
+    def unlink(self):
+        """Frees the shared memory block, which must only be done by the owning process."""
+
+        if self._memory is not None:
+            self._memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __reduce__(self):
+        if self._memory is None:
+            return FrozenTopology, (bytes(self._buffer),)
+        return FrozenTopology.attach, (self._memory.name,)
+
+    def _string(self, index: int) -> Optional[str]:
+        if index < 0:
+            return None
+        return bytes(
+            self._strings[self._string_offsets[index] : self._string_offsets[index + 1]]
+        ).decode("utf-8")
+
+    def get_edge_by_nodes(
+        self, node_a: "FrozenNode", node_b: "FrozenNode"
+    ) -> Optional["FrozenEdge"]:
+        for edge in self.edges.values():
+            if edge._connects(node_a.index, node_b.index):
+                return edge
+        return None
+
+
+class _FrozenElements(Mapping):
+    """A read-only mapping from uuids to views of one kind of element of a FrozenTopology.
+
+    Iterating over the values does not need the uuid index, which is only built on the first
+    lookup by uuid.
+    """
+
+    def __init__(self, topology: FrozenTopology, view_class, uuids: memoryview):
+        self._topology = topology
+        self._view_class = view_class
+        self._uuids = uuids
+        self._index: Optional[dict[str, int]] = None
+
+    def __getitem__(self, uuid: str):
+        if self._index is None:
+            self._index = {
+                self._topology._string(string_index): index
+                for index, string_index in enumerate(self._uuids)
+            }
+        return self._view_class(self._topology, self._index[uuid])
+
+    def __iter__(self) -> Iterator[str]:
+        for string_index in self._uuids:
+            yield self._topology._string(string_index)
+
+    def __len__(self) -> int:
+        return len(self._uuids)
+
+    def values(self):
+        return (self._view_class(self._topology, index) for index in range(len(self._uuids)))
+
+    def at(self, index: int):
+        """Returns the view of the element at the given position (in insertion order)."""
+        return self._view_class(self._topology, index)
+
+
+class _FrozenElement(object):
+    __slots__ = ("_topology", "index")
+    _prefix = None
+
+    def __init__(self, topology: FrozenTopology, index: int):
+        self._topology = topology
+        self.index = index
+
+    def __eq__(self, other):
+        return (
+            type(other) is type(self)
+            and other._topology is self._topology
+            and other.index == self.index
+        )
+
+    def __hash__(self):
+        return hash((type(self), self.index))
+
+    def __str__(self):
+        return self.name or self.uuid
+
+    @property
+    def uuid(self) -> str:
+        return self._topology._string(getattr(self._topology, f"_{self._prefix}_uuid")[self.index])
+
+    @property
+    def name(self) -> Optional[str]:
+        return self._topology._string(getattr(self._topology, f"_{self._prefix}_name")[self.index])
+
+
+class FrozenNode(_FrozenElement):
+    """A read view of a Node of a FrozenTopology."""
+
+    __slots__ = ()
+    _prefix = "node"
+
+    def _node(self, index: int) -> Optional["FrozenNode"]:
+        return FrozenNode(self._topology, index) if index >= 0 else None
+
+    @property
+    def coordinates(self) -> Optional[tuple[float, float]]:
+        """The (x, y) coordinates of the Node's GeoNode or None."""
+        if self._topology._node_coordinate_system[self.index] == _NO_COORDINATES:
+            return None
+        return self._topology._node_x[self.index], self._topology._node_y[self.index]
+
+    @property
+    def coordinate_system(self) -> Optional[str]:
+        """The coordinate system of the coordinates, either "wgs84" or "dbref" (or None)."""
+        return [None, "wgs84", "dbref"][self._topology._node_coordinate_system[self.index]]
+
+    @property
+    def turnout_side(self) -> Optional[str]:
+        return _TURNOUT_SIDES[self._topology._node_turnout_side[self.index]]
+
+    @property
+    def connected_nodes(self) -> list["FrozenNode"]:
+        start = self._topology._node_adjacency_offsets[self.index]
+        end = self._topology._node_adjacency_offsets[self.index + 1]
+        return [
+            FrozenNode(self._topology, index) for index in self._topology._node_adjacency[start:end]
+        ]
+
+    @property
+    def connected_on_head(self) -> Optional["FrozenNode"]:
+        return self._node(self._topology._node_head[self.index])
+
+    @property
+    def connected_on_left(self) -> Optional["FrozenNode"]:
+        return self._node(self._topology._node_left[self.index])
+
+    @property
+    def connected_on_right(self) -> Optional["FrozenNode"]:
+        return self._node(self._topology._node_right[self.index])
+
+    @property
+    def maximum_speed_on_left(self):
+        return _none_if_nan(self._topology._node_speed_left[self.index])
+
+    @property
+    def maximum_speed_on_right(self):
+        return _none_if_nan(self._topology._node_speed_right[self.index])
+
+    def maximum_speed(self, node_a: "FrozenNode", node_b: "FrozenNode"):
+        left = self._topology._node_left[self.index]
+        right = self._topology._node_right[self.index]
+        indices = {node.index for node in (node_a, node_b) if node is not None}
+        if left >= 0 and left in indices:
+            return self.maximum_speed_on_left
+        if right >= 0 and right in indices:
+            return self.maximum_speed_on_right
+        return None
+
+    def get_possible_followers(self, source: Optional["FrozenNode"]) -> list["FrozenNode"]:
+        """See Node.get_possible_followers, the orientation was determined when freezing."""
+        connected_nodes = self.connected_nodes
+        if source is None:
+            return connected_nodes
+        if len(connected_nodes) <= 1:
+            return []
+        topology, index = self._topology, self.index
+        head, left, right = (
+            topology._node_head[index],
+            topology._node_left[index],
+            topology._node_right[index],
+        )
+        if len(connected_nodes) != 3 or min(head, left, right) < 0:
+            return [other for other in connected_nodes if other.index != source.index]
+        if source.index == head:
+            return [self.connected_on_left, self.connected_on_right]
+        return [self.connected_on_head]
+
+
+class FrozenEdge(_FrozenElement):
+    """A read view of an Edge of a FrozenTopology."""
+
+    __slots__ = ()
+    _prefix = "edge"
+
+    def _connects(self, index_a: int, index_b: int) -> bool:
+        node_a = self._topology._edge_node_a[self.index]
+        node_b = self._topology._edge_node_b[self.index]
+        return (node_a == index_a and node_b == index_b) or (
+            node_a == index_b and node_b == index_a
+        )
+
+    @property
+    def node_a(self) -> FrozenNode:
+        return FrozenNode(self._topology, self._topology._edge_node_a[self.index])
+
+    @property
+    def node_b(self) -> FrozenNode:
+        return FrozenNode(self._topology, self._topology._edge_node_b[self.index])
+
+    @property
+    def length(self) -> Optional[float]:
+        return _none_if_nan(self._topology._edge_length[self.index])
+
+    @property
+    def maximum_speed(self):
+        return _none_if_nan(self._topology._edge_speed[self.index])
+
+    @property
+    def vacancy_section_uuid(self) -> Optional[str]:
+        return self._topology._string(self._topology._edge_vacancy_section[self.index])
+
+    @property
+    def intermediate_coordinates(self) -> list[tuple[float, float]]:
+        start = self._topology._edge_geometry_offsets[self.index]
+        end = self._topology._edge_geometry_offsets[self.index + 1]
+        return list(
+            zip(self._topology._geometry_x[start:end], self._topology._geometry_y[start:end])
+        )
+
+    @property
+    def signals(self) -> list["FrozenSignal"]:
+        start = self._topology._edge_signal_offsets[self.index]
+        end = self._topology._edge_signal_offsets[self.index + 1]
+        return [
+            FrozenSignal(self._topology, index) for index in self._topology._edge_signals[start:end]
+        ]
+
+    def is_node_connected(self, other_node: FrozenNode) -> bool:
+        return other_node.index in (
+            self._topology._edge_node_a[self.index],
+            self._topology._edge_node_b[self.index],
+        )
+
+    def get_other_node(self, node: FrozenNode) -> FrozenNode:
+        if self._topology._edge_node_a[self.index] == node.index:
+            return self.node_b
+        return self.node_a
+
+
+class FrozenSignal(_FrozenElement):
+    """A read view of a Signal of a FrozenTopology."""
+
+    __slots__ = ()
+    _prefix = "signal"
+
+    @property
+    def edge(self) -> Optional[FrozenEdge]:
+        index = self._topology._signal_edge[self.index]
+        return FrozenEdge(self._topology, index) if index >= 0 else None
+
+    @property
+    def distance_edge(self) -> Optional[float]:
+        return _none_if_nan(self._topology._signal_distance[self.index])
+
+    @property
+    def side_distance(self) -> Optional[float]:
+        return _none_if_nan(self._topology._signal_side_distance[self.index])
+
+    @property
+    def direction(self) -> SignalDirection:
+        return SignalDirection(self._topology._signal_direction[self.index])
+
+    @property
+    def function(self) -> SignalFunction:
+        return SignalFunction(self._topology._signal_function[self.index])
+
+    @property
+    def kind(self) -> SignalKind:
+        return SignalKind(self._topology._signal_kind[self.index])
+
+    @property
+    def system(self) -> SignalSystem:
+        return SignalSystem(self._topology._signal_system[self.index])
+
+    @property
+    def supported_states(self) -> set[SignalState]:
+        states = self._topology._signal_states[self.index]
+        return {state for state in SignalState if states & (1 << state.value)}
+
+    def previous_node(self) -> FrozenNode:
+        edge = self.edge
+        return edge.node_a if self.direction == SignalDirection.IN else edge.node_b
+
+    def next_node(self) -> FrozenNode:
+        edge = self.edge
+        return edge.node_b if self.direction == SignalDirection.IN else edge.node_a
+
+
+class FrozenRoute(_FrozenElement):
+    """A read view of a Route of a FrozenTopology."""
+
+    __slots__ = ()
+    _prefix = "route"
+
+    @property
+    def start_signal(self) -> FrozenSignal:
+        return FrozenSignal(self._topology, self._topology._route_start_signal[self.index])
+
+    @property
+    def end_signal(self) -> Optional[FrozenSignal]:
+        index = self._topology._route_end_signal[self.index]
+        return FrozenSignal(self._topology, index) if index >= 0 else None
+
+    @property
+    def maximum_speed(self):
+        return _none_if_nan(self._topology._route_speed[self.index])
+
+    @property
+    def edges(self) -> list[FrozenEdge]:
+        start = self._topology._route_edge_offsets[self.index]
+        end = self._topology._route_edge_offsets[self.index + 1]
+        return [
+            FrozenEdge(self._topology, index) for index in self._topology._route_edges[start:end]
+        ]
+
+    def get_length(self) -> float:
+        return sum(edge.length for edge in self.edges)
@@ -7,7 +7,8 @@ from yaramo.geo_point import DbrefGeoPoint, GeoPoint, Wgs84GeoPoint
 class GeoNode(ABC, BaseElement):
     """This is the baseclass of specific GeoNodes that use different coordinate systems.
 
-    A GeoNode refers to a GeoPoint as a means of location.
+    A GeoNode refers to a GeoPoint as a means of location. The specific GeoNodes create their
+    GeoPoint from the coordinates (x, y), with the uuid given as geo_point_uuid (if any).
     """
 
     def __init__(self, **kwargs):
@@ -45,7 +46,7 @@ class GeoNode(ABC, BaseElement):
 class Wgs84GeoNode(GeoNode):
     def __init__(self, x, y, **kwargs):
         super().__init__(**kwargs)
-        self.geo_point = Wgs84GeoPoint(x, y)
+        self.geo_point = Wgs84GeoPoint(x, y, uuid=kwargs.get("geo_point_uuid"))
 
     def get_distance_to_other_geo_node(self, geo_node_b: "Wgs84GeoNode"):
         return self.geo_point.get_distance_to_other_geo_point(geo_node_b.geo_point)
@@ -61,7 +62,7 @@ class Wgs84GeoNode(GeoNode):
 class DbrefGeoNode(GeoNode):
     def __init__(self, x, y, **kwargs):
         super().__init__(**kwargs)
-        self.geo_point = DbrefGeoPoint(x, y)
+        self.geo_point = DbrefGeoPoint(x, y, uuid=kwargs.get("geo_point_uuid"))
 
     def get_distance_to_other_geo_node(self, geo_node_b: "DbrefGeoNode"):
         return self.geo_point.get_distance_to_other_geo_point(geo_node_b.geo_point)
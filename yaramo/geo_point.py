@@ -1,10 +1,21 @@
 import math
 from abc import ABC, abstractmethod
 from decimal import Decimal
-
-import pyproj
+from functools import cache
 
 from yaramo.base_element import BaseElement
+from yaramo.instrumentation import instrumented
+
+
+@cache
+@instrumented(operation="pyproj.Transformer.from_crs")
+def _get_dbref_transformer() -> "pyproj.Transformer":
+    """Returns the Transformer from Wgs84 to DB_REF, which is created on first use only,
+    as importing pyproj and setting up the transformation are expensive."""
+
+    import pyproj
+
+    return pyproj.Transformer.from_crs("epsg:4326", "epsg:31468")
 
 
 class GeoPoint(ABC, BaseElement):
@@ -61,8 +72,9 @@ class Wgs84GeoPoint(GeoPoint):
     def to_wgs84(self):
         return self
 
+    @instrumented
     def to_dbref(self):
-        transformer = pyproj.Transformer.from_crs("epsg:4326", "epsg:31468")
+        transformer = _get_dbref_transformer()
         x, y = transformer.transform(self.y, self.x)
         return DbrefGeoPoint(x, y)
 
@@ -0,0 +1,69 @@
+import math
+from typing import Iterable, Optional
+
+from yaramo.geo_point import DbrefGeoPoint, GeoPoint, Wgs84GeoPoint
+
+EARTH_RADIUS = 6371000.0
+
+
+class LocalProjection(object):
+    """Projects GeoPoints to a local, planar coordinate system in meters and back.
+
+    DbrefGeoPoints already are planar and are only shifted to the origin. Wgs84GeoPoints
+    (x is the latitude, y the longitude) are projected equirectangularly around the origin,
+    which is precise enough for the extent of a station or a line.
+    """
+
+    def __init__(self, origin: GeoPoint):
+        self.origin_x = origin.x
+        self.origin_y = origin.y
+        self.is_wgs84 = isinstance(origin, Wgs84GeoPoint)
+        self.scale_north = math.radians(1) * EARTH_RADIUS if self.is_wgs84 else 1.0
+        self.scale_east = (
+            self.scale_north * math.cos(math.radians(origin.x)) if self.is_wgs84 else 1.0
+        )
+
+    def to_planar(self, geo_point: GeoPoint) -> tuple[float, float]:
+        """Returns the (east, north) coordinates of the point in meters relative to the origin."""
+        if self.is_wgs84:
+            return (
+                (geo_point.y - self.origin_y) * self.scale_east,
+                (geo_point.x - self.origin_x) * self.scale_north,
+            )
+        return geo_point.x - self.origin_x, geo_point.y - self.origin_y
+
+    def from_planar(self, east: float, north: float) -> tuple[float, float]:
+        """Returns the (x, y) coordinates of the point in the origin's coordinate system."""
+        if self.is_wgs84:
+            return self.origin_x + north / self.scale_north, self.origin_y + east / self.scale_east
+        return self.origin_x + east, self.origin_y + north
+
+    def geo_point_class(self):
+        return Wgs84GeoPoint if self.is_wgs84 else DbrefGeoPoint
+
+
+def have_same_coordinate_system(geo_points: Iterable[Optional[GeoPoint]]) -> bool:
+    """Returns whether all points exist and use the same coordinate system."""
+    types = {type(geo_point) for geo_point in geo_points}
+    return len(types) == 1 and type(None) not in types
+
+
+def point_segment_distance(
+    point: tuple[float, float], start: tuple[float, float], end: tuple[float, float]
+) -> float:
+    """Returns the distance of a planar point to the segment between start and end."""
+    dx, dy = end[0] - start[0], end[1] - start[1]
+    squared_length = dx * dx + dy * dy
+    if squared_length == 0:
+        return math.hypot(point[0] - start[0], point[1] - start[1])
+    t = ((point[0] - start[0]) * dx + (point[1] - start[1]) * dy) / squared_length
+    t = min(1.0, max(0.0, t))
+    return math.hypot(point[0] - start[0] - t * dx, point[1] - start[1] - t * dy)
+
+
+def polyline_length(geo_nodes: list["GeoNode"]) -> float:
+    """Returns the sum of the distances between consecutive GeoNodes."""
+    return sum(
+        geo_nodes[index].get_distance_to_other_geo_node(geo_nodes[index + 1])
+        for index in range(len(geo_nodes) - 1)
+    )
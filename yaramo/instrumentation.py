@@ -0,0 +1,200 @@
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Optional
+
+_lock = threading.Lock()
+_enabled = False
+_instrumented_methods: list["_Instrumented"] = []
+_statistics: dict[str, list] = {}
+_trace_hooks: list[Callable[[dict], None]] = []
+
+
+class _Instrumented(object):
+    """Marks a function or method as an instrumented operation.
+
+    Methods are replaced by the plain function as soon as their class is created
+    (see __set_name__) and only swapped for a timing wrapper while instrumentation is
+    enabled, so disabled instrumentation adds no overhead at all. Module level functions
+    keep this object as a callable and check the enabled flag on every call.
+    """
+
+    def __init__(self, func, operation: str = None):
+        self.func = func
+        self.operation = operation or getattr(func, "__func__", func).__qualname__
+        self.owner = None
+        self.attribute = None
+        wraps(getattr(func, "__func__", func))(self)
+
+    def __set_name__(self, owner, attribute):
+        self.owner = owner
+        self.attribute = attribute
+        setattr(owner, attribute, self.func)
+        with _lock:
+            _instrumented_methods.append(self)
+            if _enabled:
+                self._install()
+
+    def __call__(self, *args, **kwargs):
+        if not _enabled:
+            return self.func(*args, **kwargs)
+        return _timed(self.func, self.operation)(*args, **kwargs)
+
+    def _install(self):
+        if isinstance(self.func, (classmethod, staticmethod)):
+            wrapper = type(self.func)(_timed(self.func.__func__, self.operation))
+        else:
+            wrapper = _timed(self.func, self.operation)
+        setattr(self.owner, self.attribute, wrapper)
+
+    def _uninstall(self):
+        setattr(self.owner, self.attribute, self.func)
+
+
+def _timed(func, operation: str):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        timestamp = time.time()
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _record(operation, timestamp, time.perf_counter() - start)
+
+    return wrapper
+
+
+def _record(operation: str, timestamp: float, duration: float):
+    with _lock:
+        entry = _statistics.get(operation)
+        if entry is None:
+            _statistics[operation] = [1, duration, duration]
+        else:
+            entry[0] += 1
+            entry[1] += duration
+            entry[2] = max(entry[2], duration)
+        hooks = list(_trace_hooks)
+
+    if hooks:
+        event = {
+            "name": operation,
+            "timestamp": timestamp,
+            "duration": duration,
+            "thread": threading.get_ident(),
+        }
+        for hook in hooks:
+            hook(event)
+
+
+def instrumented(func=None, *, operation: str = None):
+    """Decorator registering a function or method as an instrumented operation.
+
+    Parameters
+    ----------
+    operation: str
+        The name the operation is reported under (default is the qualified function name)
+    """
+
+    if func is None:
+        return lambda _func: _Instrumented(_func, operation)
+    return _Instrumented(func, operation)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable():
+    """Starts counting calls and measuring wall time of all instrumented operations."""
+
+    global _enabled
+    with _lock:
+        if _enabled:
+            return
+        _enabled = True
+        for method in _instrumented_methods:
+            method._install()
+
+
+def disable():
+    """Stops instrumentation and restores the uninstrumented functions."""
+
+    global _enabled
+    with _lock:
+        if not _enabled:
+            return
+        _enabled = False
+        for method in _instrumented_methods:
+            method._uninstall()
+
+
+def reset():
+    """Discards all statistics collected so far."""
+
+    with _lock:
+        _statistics.clear()
+
+
+def stats() -> dict[str, dict]:
+    """Returns a snapshot of the collected statistics.
+
+    Returns:
+        A dictionary mapping operation names to their number of calls, their accumulated
+        wall time and the wall time of their slowest call (both in seconds).
+    """
+
+    with _lock:
+        return {
+            operation: {"calls": calls, "total_time": total_time, "max_time": max_time}
+            for operation, (calls, total_time, max_time) in _statistics.items()
+        }
+
+
+def add_trace_hook(hook: Callable[[dict], None]):
+    """Registers a callable that receives a structured trace event for every instrumented call.
+
+    An event is a dictionary with the keys name, timestamp (wall clock at the start of the
+    call), duration (in seconds) and thread (the identifier of the calling thread).
+    Hooks are only called while instrumentation is enabled.
+    """
+
+    with _lock:
+        _trace_hooks.append(hook)
+
+
+def remove_trace_hook(hook: Callable[[dict], None]):
+    with _lock:
+        if hook in _trace_hooks:
+            _trace_hooks.remove(hook)
+
+
+@contextmanager
+def profiling(trace_hook: Optional[Callable[[dict], None]] = None):
+    """Enables instrumentation for the duration of the with block.
+
+    Yields a dictionary that is filled on exit with the number of calls and the accumulated
+    wall time of every operation called inside the block.
+    """
+
+    was_enabled = _enabled
+    before = stats()
+    report: dict[str, dict] = {}
+    if trace_hook is not None:
+        add_trace_hook(trace_hook)
+    enable()
+    try:
+        yield report
+    finally:
+        if not was_enabled:
+            disable()
+        if trace_hook is not None:
+            remove_trace_hook(trace_hook)
+        for operation, after in stats().items():
+            previous = before.get(operation, {"calls": 0, "total_time": 0.0})
+            calls = after["calls"] - previous["calls"]
+            if calls > 0:
+                report[operation] = {
+                    "calls": calls,
+                    "total_time": after["total_time"] - previous["total_time"],
+                }
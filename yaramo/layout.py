@@ -0,0 +1,321 @@
+"""Schematic layout of Nodes without geo location.
+
+Topologies built from logical data have no GeoNodes, so neither the turnout connections can be
+determined from the geo locations nor the lengths of the Edges computed. compute_layout
+assigns planar coordinates to all Nodes in two steps:
+
+1. Every connected component is traversed breadth-first and the Nodes are placed along their
+   track direction at the length of the Edges (the default_length for Edges without length).
+   At turnouts, the left branch leaves at turnout_angle counterclockwise of the direction from
+   the head, the right branch clockwise, after which the tracks continue in parallel (and
+   converge again into turnouts reached from their branches). Turnouts without set connections
+   are oriented with their first connected Node as head. Nodes with a GeoNode are anchors, the
+   components with anchors are rotated and moved onto them.
+2. Where the Edges form cycles (e.g. passing loops) or anchors are given, the Edge lengths are
+   in conflict. An iterative solver moves all Nodes at once per iteration (Jacobi-style) along
+   the length errors of their Edges, until the largest relative error is below the tolerance.
+   Every iteration only visits the Edges at the Nodes moved before, as the placement already
+   fits the Edges of the breadth-first trees. Anchors do not move.
+
+Like GeoNode.get_distance_to_other_geo_node, the lengths of the Edges are in meters for
+DbrefGeoNodes and in kilometers for Wgs84GeoNodes. Left is counterclockwise in the coordinate
+plane of the x and y coordinates of the GeoPoints, like in Node.determine_anschluss_of_all_nodes.
+The SchematicLayout applies the coordinates as GeoNodes (in the coordinate system of the
+anchors, DbrefGeoNodes without anchors):
+
+    layout = topology.schematic_layout()
+    layout.apply(topology)
+"""
+
+import math
+from array import array
+from collections import deque
+from typing import Optional
+
+from yaramo.geo_node import DbrefGeoNode, Wgs84GeoNode
+from yaramo.geo_point import DbrefGeoPoint
+from yaramo.geometry import LocalProjection, have_same_coordinate_system
+from yaramo.node import Node
+
+# Distance between the bounding boxes of components without anchors
+COMPONENT_GAP = 100.0
+
+
+class SchematicLayout(object):
+    """The coordinates of all Nodes of a Topology by their uuid.
+
+    Parameters
+    ----------
+    positions: dict[str, tuple[float, float]]
+        The (x, y) coordinates in meters relative to the origin of the projection
+    projection: LocalProjection
+        The projection of the coordinates to the coordinate system of the anchors
+    iterations: int
+        The number of iterations of the solver
+    error: float
+        The largest relative length error of an Edge after the last iteration
+    """
+
+    def __init__(
+        self,
+        positions: dict[str, tuple[float, float]],
+        projection: LocalProjection,
+        iterations: int,
+        error: float,
+    ):
+        self.positions = positions
+        self.projection = projection
+        self.iterations = iterations
+        self.error = error
+
+    def coordinates(self, node: Node) -> tuple[float, float]:
+        """Returns the (x, y) coordinates of the Node in the coordinate system of the anchors."""
+        x, y = self.positions[node.uuid]
+        if self.projection.is_wgs84:
+            # x is the latitude, so the planar x axis points north
+            return self.projection.from_planar(y, x)
+        return self.projection.from_planar(x, y)
+
+    def apply(self, topology: "Topology", update_lengths: bool = True) -> int:
+        """Assigns a GeoNode to every Node without one and returns their number.
+
+        Parameters
+        ----------
+        update_lengths: bool
+            Whether the Edges without length get the length of their geometry (default is True)
+        """
+
+        geo_node_class = Wgs84GeoNode if self.projection.is_wgs84 else DbrefGeoNode
+        assigned = 0
+        for node in topology.nodes.values():
+            if node.geo_node is None and node.uuid in self.positions:
+                node.geo_node = geo_node_class(*self.coordinates(node))
+                topology.update_node(node)
+                assigned += 1
+        if update_lengths:
+            for edge in topology.edges.values():
+                if edge.length is None and not edge.intermediate_geo_nodes:
+                    edge.update_length()
+                    topology.update_edge(edge)
+        return assigned
+
+
+def _to_plane(projection: LocalProjection, geo_point) -> tuple[float, float]:
+    east, north = projection.to_planar(geo_point)
+    return (north, east) if projection.is_wgs84 else (east, north)
+
+
+def _connections(node: Node) -> Optional[tuple[Node, Node, Node]]:
+    """The head, left and right of a turnout (the order of connected_nodes if they are not
+    known), or None for other Nodes."""
+
+    if len(node.connected_nodes) != 3:
+        return None
+    return node.turnout_connections() or tuple(node.connected_nodes)
+
+
+def _branch_directions(node: Node, source: Optional[Node], heading: float, angle: float):
+    """Returns the (neighbour, direction of the Edge, track heading) of the neighbours of node
+    reached with the track heading, coming from source."""
+
+    connections = _connections(node)
+    if connections is not None:
+        head, left, right = connections
+        # forward is the direction from the head to the branches
+        forward = heading if source is None or source is head else heading + math.pi
+        return [
+            (head, forward + math.pi, forward + math.pi),
+            (left, forward + angle, forward),
+            (right, forward - angle, forward),
+        ]
+    result = []
+    others = [neighbour for neighbour in node.connected_nodes if neighbour is not source]
+    if source is None and len(others) == 2:
+        # Starting within a track, both directions are straight
+        return [(others[0], heading, heading), (others[1], heading + math.pi, heading + math.pi)]
+    for index, neighbour in enumerate(others):
+        # Straight ahead first, then alternating to the left and right
+        offset = (index + 1) // 2 * angle * (1 if index % 2 else -1)
+        result.append((neighbour, heading + offset, heading))
+    return result
+
+
+def _fit_anchors(indices, xs, ys, anchors):
+    """Rotates and moves the Nodes at indices so that their anchors fit best."""
+
+    pairs = [(index, anchors[index]) for index in indices if index in anchors]
+    count = len(pairs)
+    center_x = sum(xs[index] for index, _ in pairs) / count
+    center_y = sum(ys[index] for index, _ in pairs) / count
+    target_x = sum(anchor[0] for _, anchor in pairs) / count
+    target_y = sum(anchor[1] for _, anchor in pairs) / count
+    dot = cross = 0.0
+    for index, (anchor_x, anchor_y) in pairs:
+        x, y = xs[index] - center_x, ys[index] - center_y
+        u, v = anchor_x - target_x, anchor_y - target_y
+        dot += x * u + y * v
+        cross += x * v - y * u
+    rotation = math.atan2(cross, dot) if count > 1 else 0.0
+    cos_r, sin_r = math.cos(rotation), math.sin(rotation)
+    for index in indices:
+        x, y = xs[index] - center_x, ys[index] - center_y
+        xs[index] = target_x + cos_r * x - sin_r * y
+        ys[index] = target_y + sin_r * x + cos_r * y
+    for index, (anchor_x, anchor_y) in pairs:
+        xs[index], ys[index] = anchor_x, anchor_y
+
+
+def compute_layout(
+    topology: "Topology",
+    default_length: Optional[float] = None,
+    turnout_angle: float = math.radians(20.0),
+    iterations: int = 200,
+    tolerance: float = 1e-3,
+) -> SchematicLayout:
+    """Computes the schematic coordinates of all Nodes (see yaramo.layout).
+
+    Parameters
+    ----------
+    default_length: float
+        The length of Edges without length in the unit of the Edge lengths (default is 100 m)
+    turnout_angle: float
+        The angle between the branches and the direction from the head of turnouts in radians,
+        less than 45° (default is 20°)
+    iterations: int
+        The maximum number of iterations of the solver (default is 200)
+    tolerance: float
+        The largest relative length error of an Edge at which the solver stops (default is 0.001)
+    """
+
+    nodes = list(topology.nodes.values())
+    index_of = {node.uuid: index for index, node in enumerate(nodes)}
+    count = len(nodes)
+
+    anchor_points = [node.geo_node.geo_point for node in nodes if node.geo_node is not None]
+    if anchor_points and not have_same_coordinate_system(anchor_points):
+        raise ValueError("The GeoNodes of the Topology use different coordinate systems")
+    projection = LocalProjection(anchor_points[0] if anchor_points else DbrefGeoPoint(0.0, 0.0))
+    # The positions are in meters, the Edge lengths of Wgs84 coordinates in kilometers
+    scale = 1000.0 if projection.is_wgs84 else 1.0
+    if default_length is None:
+        default_length = 100.0 / scale
+    anchors = {
+        index_of[node.uuid]: _to_plane(projection, node.geo_node.geo_point)
+        for node in nodes
+        if node.geo_node is not None
+    }
+
+    edge_a, edge_b, targets = array("l"), array("l"), array("d")
+    lengths: dict[tuple[int, int], float] = {}
+    for edge in topology.edges.values():
+        a, b = index_of.get(edge.node_a.uuid), index_of.get(edge.node_b.uuid)
+        if a is None or b is None or a == b:
+            continue
+        length = (edge.length if edge.length else default_length) * scale
+        edge_a.append(a)
+        edge_b.append(b)
+        targets.append(length)
+        lengths.setdefault((a, b), length)
+        lengths.setdefault((b, a), length)
+
+    # 1. Breadth-first placement per component
+    xs, ys = array("d", bytes(8 * count)), array("d", bytes(8 * count))
+    placed = bytearray(count)
+    bottom: Optional[float] = None
+    # Start at track ends, so that the tracks of a component run from left to right
+    order = sorted(range(count), key=lambda index: len(nodes[index].connected_nodes) != 1)
+    for root in order:
+        if placed[root]:
+            continue
+        placed[root] = 1
+        component = [root]
+        queue = deque([(root, None, 0.0)])
+        while queue:
+            index, source, heading = queue.popleft()
+            node = nodes[index]
+            for neighbour, direction, track_heading in _branch_directions(
+                node, source, heading, turnout_angle
+            ):
+                neighbour_index = index_of.get(neighbour.uuid)
+                if neighbour_index is None or placed[neighbour_index]:
+                    continue
+                placed[neighbour_index] = 1
+                component.append(neighbour_index)
+                # Tracks converge into turnouts reached from a branch (between two turnouts
+                # facing each other, the Edge takes the mean of both branch directions)
+                connections = _connections(neighbour)
+                if connections is not None and node in connections[1:]:
+                    side = 1 if node is connections[1] else -1
+                    converging = track_heading + side * turnout_angle
+                    if direction == track_heading:
+                        direction = converging
+                    else:
+                        direction = (direction + converging) / 2
+                length = lengths.get((index, neighbour_index), default_length * scale)
+                xs[neighbour_index] = xs[index] + length * math.cos(direction)
+                ys[neighbour_index] = ys[index] + length * math.sin(direction)
+                queue.append((neighbour_index, node, track_heading))
+
+        if any(index in anchors for index in component):
+            _fit_anchors(component, xs, ys, anchors)
+            continue
+        if bottom is None and anchors:
+            bottom = min(anchor[1] for anchor in anchors.values())
+        if bottom is not None:
+            # Below the components placed before (and the anchors)
+            shift = bottom - COMPONENT_GAP - max(ys[index] for index in component)
+            for index in component:
+                ys[index] += shift
+        bottom = min(ys[index] for index in component)
+
+    # 2. Relaxation of the Edge lengths, starting with the Edges that are too long or short
+    movable = [index not in anchors for index in range(count)]
+    incident: list[list[int]] = [[] for _ in range(count)]
+    for edge_index, (a, b) in enumerate(zip(edge_a, edge_b)):
+        incident[a].append(edge_index)
+        incident[b].append(edge_index)
+    active = range(len(targets))
+    iteration = 0
+    while active and iteration < iterations:
+        shift_x, shift_y = array("d", bytes(8 * count)), array("d", bytes(8 * count))
+        weights = array("d", bytes(8 * count))
+        moved = set()
+        for edge_index in active:
+            a, b, target = edge_a[edge_index], edge_b[edge_index], targets[edge_index]
+            dx, dy = xs[b] - xs[a], ys[b] - ys[a]
+            distance = math.hypot(dx, dy)
+            if abs(distance - target) <= tolerance * target:
+                continue
+            if distance == 0.0:
+                dx, dy, distance = 1e-6, 1e-6, math.hypot(1e-6, 1e-6)
+            # Each end moves half of the error, or all of it if the other end is an anchor
+            correction = (distance - target) / distance
+            move_a, move_b = movable[a], movable[b]
+            share = 0.5 if move_a and move_b else 1.0
+            if move_a:
+                shift_x[a] += share * correction * dx
+                shift_y[a] += share * correction * dy
+                weights[a] += 1.0
+                moved.add(a)
+            if move_b:
+                shift_x[b] -= share * correction * dx
+                shift_y[b] -= share * correction * dy
+                weights[b] += 1.0
+                moved.add(b)
+        for index in moved:
+            weight = weights[index]
+            xs[index] += shift_x[index] / weight
+            ys[index] += shift_y[index] / weight
+        # Only the Edges at moved Nodes can have changed
+        active = {edge_index for index in moved for edge_index in incident[index]}
+        iteration += 1
+
+    error = max(
+        (
+            abs(math.hypot(xs[b] - xs[a], ys[b] - ys[a]) - target) / target
+            for a, b, target in zip(edge_a, edge_b, targets)
+        ),
+        default=0.0,
+    )
+    positions = {node.uuid: (xs[index], ys[index]) for index, node in enumerate(nodes)}
+    return SchematicLayout(positions, projection, iteration, error)
@@ -0,0 +1,313 @@
+"""Movement-authority lookahead for running trains.
+
+For a train at (edge, offset, direction), topology.lookahead.ahead returns the events ahead of
+it in order of their distance up to a horizon: the Signals of its travel direction, changes of
+the speed restriction, entries into VacancySections and the end of the lookahead. The events
+are (distance, kind, element, value) tuples:
+
+- (distance, SIGNAL, Signal, None)
+- (distance, SPEED, Edge, speed) when entering an Edge with another speed restriction (the
+  minimum of Edge.maximum_speed and the speed of the passed turnout branch, None if unknown)
+- (distance, VACANCY_SECTION, VacancySection, None) when entering another VacancySection
+- (distance, END, Node, reason) where the lookahead cannot continue: at a buffer stop
+  (BUFFER_STOP), at a facing turnout whose branch is not given by the path of the train
+  (TURNOUT) or at the Node where the train enters an Edge without a length or geometry
+  (UNKNOWN_LENGTH)
+
+The lookahead is answered from tracks precompiled per Edge and direction: their length, their
+events sorted by position and their successors with the speed restriction at the transition.
+A query only walks these tracks and allocates nothing but the result. Changes announced via
+the add_, remove_ and update_ methods of Nodes, Edges and Signals invalidate the tracks of the
+affected Edges, which are compiled again before the next query.
+
+    events = topology.lookahead.ahead(edge, 120.0, SignalDirection.IN, max_signals=3)
+    for distance, kind, element, value in events:
+        ...
+"""
+
+from typing import Container, Iterable, Optional, Sequence
+
+from yaramo.concurrency import build_lock
+from yaramo.edge import Edge
+from yaramo.editing import edge_length
+from yaramo.node import Node
+from yaramo.signal import Signal, SignalDirection
+
+DEFAULT_HORIZON = 5000.0
+
+# The kinds of events
+SIGNAL = "signal"
+SPEED = "speed"
+VACANCY_SECTION = "vacancy_section"
+END = "end"
+
+# The reasons of END events
+BUFFER_STOP = "buffer_stop"
+TURNOUT = "turnout"
+UNKNOWN_LENGTH = "unknown_length"
+
+
+def _minimum_speed(first: Optional[float], second: Optional[float]) -> Optional[float]:
+    if first is None:
+        return second
+    if second is None:
+        return first
+    return min(first, second)
+
+
+class _Track(object):
+    """An Edge in one direction, compiled for the lookahead."""
+
+    __slots__ = ("edge", "forward", "end_node", "length", "signals", "successors")
+
+    def __init__(self, edge: Edge, forward: bool):
+        self.edge = edge
+        self.forward = forward
+        self.end_node: Node = edge.node_b if forward else edge.node_a
+        self.length: Optional[float] = None
+        # (position, Signal) of the Signals in this direction, by position
+        self.signals: list[tuple[float, Signal]] = []
+        # (track, speed restriction when entering it) of the possible followers
+        self.successors: list[tuple["_Track", Optional[float]]] = []
+
+
+class LookaheadTable(object):
+    """Precompiled tracks of the Edges of a Topology for lookahead queries (see
+    yaramo.lookahead).
+
+    Parameters
+    ----------
+    horizon: float
+        The default horizon of the queries in the unit of Edge.length (default is 5000)
+    """
+
+    def __init__(self, topology: "Topology", horizon: float = DEFAULT_HORIZON):
+        self.topology = topology
+        self.horizon = horizon
+        self._tracks: dict[tuple[str, bool], _Track] = {}
+        self._adjacency: dict[str, list[Edge]] = {}
+        # The Edge of every Signal when it was compiled, to invalidate it after a move
+        self._signal_edges: dict[str, str] = {}
+        for edge in topology.edges.values():
+            self._connect(edge)
+        self._dirty: set[str] = set(topology.edges)
+
+    def _connect(self, edge: Edge):
+        self._adjacency.setdefault(edge.node_a.uuid, []).append(edge)
+        if edge.node_b is not edge.node_a:
+            self._adjacency.setdefault(edge.node_b.uuid, []).append(edge)
+
+    def _disconnect(self, edge: Edge):
+        for node in (edge.node_a, edge.node_b):
+            edges = self._adjacency.get(node.uuid, [])
+            if edge in edges:
+                edges.remove(edge)
+
+    def _invalidate_node(self, node: Node):
+        """Invalidates the Edges at the Node, as their successors depend on it."""
+        self._dirty.update(edge.uuid for edge in self._adjacency.get(node.uuid, ()))
+
+    def add_edge(self, edge: Edge):
+        self._connect(edge)
+        self._dirty.add(edge.uuid)
+        self._invalidate_node(edge.node_a)
+        self._invalidate_node(edge.node_b)
+
+    def remove_edge(self, edge: Edge):
+        self._disconnect(edge)
+        for forward in (True, False):
+            self._tracks.pop((edge.uuid, forward), None)
+        self._dirty.discard(edge.uuid)
+        self._invalidate_node(edge.node_a)
+        self._invalidate_node(edge.node_b)
+
+    def update_edge(self, edge: Edge):
+        self._dirty.add(edge.uuid)
+        self._invalidate_node(edge.node_a)
+        self._invalidate_node(edge.node_b)
+
+    def update_node(self, node: Node):
+        self._invalidate_node(node)
+
+    def add_signal(self, signal: Signal):
+        self.update_signal(signal)
+
+    def remove_signal(self, signal: Signal):
+        edge_uuid = self._signal_edges.pop(signal.uuid, None)
+        if edge_uuid is not None:
+            self._dirty.add(edge_uuid)
+        if signal.edge is not None:
+            self._dirty.add(signal.edge.uuid)
+
+    def update_signal(self, signal: Signal):
+        self.remove_signal(signal)
+        if signal.edge is not None:
+            self._signal_edges[signal.uuid] = signal.edge.uuid
+
+    def refresh(self):
+        """Compiles the invalidated tracks (queries call it)."""
+
+        if not self._dirty:
+            return
+        with build_lock:
+            if not self._dirty:
+                return
+            edges = self.topology.edges
+            dirty = [edges[uuid] for uuid in self._dirty if uuid in edges]
+            for edge in dirty:
+                for forward in (True, False):
+                    self._compile_track(self._track(edge, forward))
+            for edge in dirty:
+                for forward in (True, False):
+                    self._compile_successors(self._tracks[edge.uuid, forward])
+            self._dirty = set()
+
+    def _track(self, edge: Edge, forward: bool) -> _Track:
+        track = self._tracks.get((edge.uuid, forward))
+        if track is None:
+            track = self._tracks[edge.uuid, forward] = _Track(edge, forward)
+        return track
+
+    def _compile_track(self, track: _Track):
+        edge = track.edge
+        track.end_node = edge.node_b if track.forward else edge.node_a
+        length = edge_length(edge)
+        track.length = length
+        if length is None:
+            track.signals = []
+            return
+        direction = SignalDirection.IN if track.forward else SignalDirection.GEGEN
+        signals = []
+        for signal in edge.signals:
+            if signal.direction == direction:
+                position = signal.distance_edge if track.forward else length - signal.distance_edge
+                signals.append((position, signal))
+                self._signal_edges[signal.uuid] = edge.uuid
+        signals.sort(key=lambda item: item[0])
+        track.signals = signals
+
+    def _compile_successors(self, track: _Track):
+        edge, node = track.edge, track.end_node
+        source = edge.get_other_node(node)
+        successors = []
+        for follower in node.get_possible_followers(source):
+            for next_edge in self._adjacency.get(node.uuid, ()):
+                if next_edge is not edge and next_edge.get_other_node(node) is follower:
+                    speed = _minimum_speed(
+                        next_edge.maximum_speed, node.maximum_speed(source, follower)
+                    )
+                    successors.append((self._track(next_edge, next_edge.node_a is node), speed))
+        track.successors = successors
+
+    def ahead(
+        self,
+        edge: Edge,
+        offset: float,
+        direction: SignalDirection,
+        max_signals: Optional[int] = None,
+        horizon: Optional[float] = None,
+        path: Optional[Container[Edge]] = None,
+    ) -> list[tuple[float, str, object, object]]:
+        """Returns the events ahead of a train in order of their distance.
+
+        Parameters
+        ----------
+        offset: float
+            The position of the train on the Edge as distance to edge.node_a
+        direction: SignalDirection
+            IN if the train travels from edge.node_a to edge.node_b
+        max_signals: int
+            The lookahead ends with the max_signals-th Signal (default is no limit)
+        horizon: float
+            The maximum distance of the events (default is the horizon of the table)
+        path: Container[Edge]
+            The Edges the train will use (e.g. a set of the Edges of its Route), which choose the
+            branches at facing turnouts (default is to end the lookahead there)
+        """
+
+        self.refresh()
+        return self._ahead(edge, offset, direction, max_signals, horizon, path)
+
+    def ahead_many(
+        self,
+        trains: Iterable[Sequence],
+        max_signals: Optional[int] = None,
+        horizon: Optional[float] = None,
+    ) -> list[list[tuple[float, str, object, object]]]:
+        """Returns the events ahead of many trains given as (edge, offset, direction) or
+        (edge, offset, direction, path), see ahead."""
+
+        self.refresh()
+        results = []
+        for train in trains:
+            path = train[3] if len(train) > 3 else None
+            results.append(self._ahead(train[0], train[1], train[2], max_signals, horizon, path))
+        return results
+
+    def _ahead(
+        self,
+        edge: Edge,
+        offset: float,
+        direction: SignalDirection,
+        max_signals: Optional[int],
+        horizon: Optional[float],
+        path: Optional[Container[Edge]],
+    ) -> list[tuple[float, str, object, object]]:
+        if horizon is None:
+            horizon = self.horizon
+        track = self._tracks[edge.uuid, direction == SignalDirection.IN]
+        result = []
+        if track.length is None:
+            result.append((0.0, END, edge.get_other_node(track.end_node), UNKNOWN_LENGTH))
+            return result
+        entered = -(offset if track.forward else track.length - offset)
+        speed = _minimum_speed(edge.maximum_speed, None)
+        section = edge.vacancy_section
+        signals = 0
+        while True:
+            for position, signal in track.signals:
+                distance = entered + position
+                if distance <= 0.0:
+                    continue
+                if distance > horizon:
+                    return result
+                result.append((distance, SIGNAL, signal, None))
+                signals += 1
+                if max_signals is not None and signals >= max_signals:
+                    return result
+
+            entered += track.length
+            if entered > horizon:
+                return result
+            successors = track.successors
+            if len(successors) == 1:
+                track, next_speed = successors[0]
+            elif not successors:
+                result.append((entered, END, track.end_node, BUFFER_STOP))
+                return result
+            else:
+                chosen = None
+                if path is not None:
+                    for successor in successors:
+                        if successor[0].edge in path:
+                            if chosen is not None:
+                                chosen = None
+                                break
+                            chosen = successor
+                if chosen is None:
+                    result.append((entered, END, track.end_node, TURNOUT))
+                    return result
+                track, next_speed = chosen
+
+            next_edge = track.edge
+            if next_speed != speed:
+                speed = next_speed
+                result.append((entered, SPEED, next_edge, speed))
+            if next_edge.vacancy_section is not section:
+                section = next_edge.vacancy_section
+                if section is not None:
+                    result.append((entered, VACANCY_SECTION, section, None))
+            if track.length is None:
+                node = next_edge.get_other_node(track.end_node)
+                result.append((entered, END, node, UNKNOWN_LENGTH))
+                return result
@@ -1,14 +1,39 @@
-from yaramo.edge import Edge  # pylint: noqa
-from yaramo.geo_node import DbrefGeoNode, GeoNode, Wgs84GeoNode  # pylint: noqa
-from yaramo.node import Node, NodeConnectionDirection  # pylint: noqa
-from yaramo.route import Route  # pylint: noqa
-from yaramo.signal import (  # pylint: noqa
-    Signal,
-    SignalDirection,
-    SignalFunction,
-    SignalKind,
-    SignalState,
-    SignalSystem,
-)
-from yaramo.topology import Topology  # pylint: noqa
-from yaramo.trip import Trip  # pylint: noqa
+"""Provides all model classes of yaramo.
+
+The classes are imported lazily on first access, so that importing yaramo.model
+only loads the modules (and their dependencies) that are actually used.
+"""
+
+from importlib import import_module
+
+_MODULES = {
+    "Edge": "yaramo.edge",
+    "DbrefGeoNode": "yaramo.geo_node",
+    "GeoNode": "yaramo.geo_node",
+    "Wgs84GeoNode": "yaramo.geo_node",
+    "Node": "yaramo.node",
+    "NodeConnectionDirection": "yaramo.node",
+    "Route": "yaramo.route",
+    "Signal": "yaramo.signal",
+    "SignalDirection": "yaramo.signal",
+    "SignalFunction": "yaramo.signal",
+    "SignalKind": "yaramo.signal",
+    "SignalState": "yaramo.signal",
+    "SignalSystem": "yaramo.signal",
+    "Topology": "yaramo.topology",
+    "Trip": "yaramo.trip",
+}
+
+__all__ = list(_MODULES)
+
+
+def __getattr__(name: str):
+    if name not in _MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_MODULES[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -2,10 +2,12 @@ import sys
 from enum import Enum
 from itertools import permutations
 from math import atan2, cos, sin
+from typing import Optional, Tuple
 
 from yaramo.base_element import BaseElement
 from yaramo.geo_node import GeoNode
 from yaramo.geo_point import GeoPoint
+from yaramo.instrumentation import instrumented
 
 
 class NodeConnectionDirection(Enum):
@@ -66,47 +68,81 @@ class Node(BaseElement):
         self.connected_on_right = node
         self.connected_nodes.append(node)
 
+    def turnout_connections(self) -> Optional[Tuple["Node", "Node", "Node"]]:
+        """Returns the Nodes connected on head, left and right without setting them.
+
+        If the connections are not set, they are determined from the geo locations (see
+        determine_anschluss_of_all_nodes); returns None if that is not possible either.
+        """
+
+        head, left, right = self.connected_on_head, self.connected_on_left, self.connected_on_right
+        if head is not None and left is not None and right is not None:
+            return head, left, right
+        if len(self.connected_nodes) == 3 and all(
+            other.geo_node is not None for other in (self, *self.connected_nodes)
+        ):
+            return self.determine_anschluss_of_all_nodes()
+        return None
+
     def get_possible_followers(self, source):
-        """Returns the Nodes that could follow (head, left, right) when comming from a source Node connected to this Node."""
+        """Returns the Nodes that could follow (head, left, right) when comming from a source Node connected to this Node.
+
+        The Node is not modified. If the connections on head, left and right are neither set nor
+        can be determined, all other connected Nodes are returned.
+        """
         if source is None:
             return self.connected_nodes
 
         if len(self.connected_nodes) <= 1:
             return []
 
-        if self.connected_on_head is None:
-            self.calc_anschluss_of_all_nodes()
+        connections = self.turnout_connections() if len(self.connected_nodes) == 3 else None
+        if connections is None:
+            return [other for other in self.connected_nodes if other is not source]
 
-        if source.uuid == self.connected_on_head.uuid:
-            return [self.connected_on_left, self.connected_on_right]
+        head, left, right = connections
+        if source.uuid == head.uuid:
+            return [left, right]
         else:
-            return [self.connected_on_head]
+            return [head]
 
     def get_anschluss_of_other(self, other: "Node") -> NodeConnectionDirection:
         """Gets the Anschluss (Ende, Links, Rechts, Spitze) of other node.
 
         Idea: We assume, the current node is a point and we want to estimate the Anschluss of the other node.
+        The Node is not modified.
         """
 
         if len(self.connected_nodes) != 3:
             raise Exception(f"Try to get Anschluss of Ende (Node ID: {self.uuid})")
 
         # TODO allow for different metrics to estimate the anschluss of the other nodes
-        if not all([self.connected_on_left, self.connected_on_right, self.connected_on_head]):
-            self.calc_anschluss_of_all_nodes()
+        connections = self.turnout_connections()
+        if connections is None:
+            return None
+        head, left, right = connections
 
-        if other.uuid == self.connected_on_head.uuid:
+        if other.uuid == head.uuid:
             return NodeConnectionDirection.Spitze
-        if other.uuid == self.connected_on_left.uuid:
+        if other.uuid == left.uuid:
             return NodeConnectionDirection.Links
-        if other.uuid == self.connected_on_right.uuid:
+        if other.uuid == right.uuid:
             return NodeConnectionDirection.Rechts
         return None
 
+    @instrumented
     def calc_anschluss_of_all_nodes(self):
         """Calculates and sets the 'Anschluss' or connection side of
         the connected_nodes based on their geo location."""
 
+        anschluss = self.determine_anschluss_of_all_nodes()
+        if anschluss is not None:
+            self.connected_on_head, self.connected_on_left, self.connected_on_right = anschluss
+
+    def determine_anschluss_of_all_nodes(self) -> Optional[Tuple["Node", "Node", "Node"]]:
+        """Returns the connected_nodes on head, left and right based on their geo location
+        without setting them (or None if there is no plausible assignment)."""
+
         def get_rad_between_nodes(node_a: Node, node_b: Node) -> float:
             """
             Returns the angle of an (maybe imaginary) line between
@@ -140,10 +176,8 @@ class Node(BaseElement):
                 # away potentially saves cycles:
                 left, right = right, left
 
-            self.connected_on_head = head
-            self.connected_on_left = left
-            self.connected_on_right = right
-            break
+            return head, left, right
+        return None
 
     def to_serializable(self):
         """See the description in the BaseElement class.
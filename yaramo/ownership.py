@@ -0,0 +1,230 @@
+"""An ownership layout without reference cycles.
+
+By default the elements of a Topology reference each other in both directions (Edge.signals and
+Signal.edge, Node.connected_nodes of neighbouring Nodes, ...), so a discarded Topology can only
+be freed by the cyclic garbage collector, which also has to traverse all of these objects on
+every full collection.
+
+While the layout is enabled, the Topology is the owner of its elements and the back-references
+that would close a cycle are stored as weak references:
+
+- Signal.edge
+- Node.connected_nodes and Node.connected_on_head / connected_on_left / connected_on_right
+
+Signal.trip stays a strong reference, as a Trip does not have to be added to a Topology, so a
+Signal with a Trip still closes the cycle over trip.edges.
+
+Reading these attributes is unchanged (they return the elements, or None once the element has
+been freed). All elements therefore have to be owned by a Topology (or otherwise be referenced
+strongly), e.g. a Signal does not keep its Edge alive. Like the instrumentation, the layout
+costs nothing until it is enabled for the first time: enable() installs descriptors for the
+attributes above, which store weak references from then on, and disable() makes them store
+strong references again. Elements created before enable() can be converted with convert().
+
+Pickled (and copied) Signals and Nodes store strong references, which are stored weakly again
+when they are unpickled while the layout is enabled.
+"""
+
+import threading
+import weakref
+from collections.abc import MutableSequence
+from typing import Iterable
+
+_lock = threading.Lock()
+_enabled = False
+_installed = False
+
+_REFERENCES = {
+    "Signal": ("edge",),
+    "Node": ("connected_on_head", "connected_on_left", "connected_on_right"),
+}
+_REFERENCE_LISTS = {"Node": ("connected_nodes",)}
+
+
+def _ref(value):
+    # Values that are no elements (like the uuids from_json assigns first) are kept as they are
+    try:
+        return weakref.ref(value)
+    except TypeError:
+        return value
+
+
+def _deref(reference):
+    return reference() if type(reference) is weakref.ReferenceType else reference
+
+
+class WeakList(MutableSequence):
+    """A list of weakly referenced elements, which otherwise behaves like a list."""
+
+    def __init__(self, values: Iterable = ()):
+        self._references = [_ref(value) for value in values]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [_deref(reference) for reference in self._references[index]]
+        return _deref(self._references[index])
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            self._references[index] = [_ref(item) for item in value]
+        else:
+            self._references[index] = _ref(value)
+
+    def __delitem__(self, index):
+        del self._references[index]
+
+    def __len__(self):
+        return len(self._references)
+
+    def __iter__(self):
+        for reference in self._references:
+            yield _deref(reference)
+
+    def insert(self, index, value):
+        self._references.insert(index, _ref(value))
+
+    def __eq__(self, other):
+        if isinstance(other, (list, WeakList)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"WeakList({list(self)!r})"
+
+    def __reduce__(self):
+        return WeakList, (list(self),)
+
+
+class WeakReference(object):
+    """A data descriptor storing its value in the instance __dict__ (under the same name),
+    as a weak reference while the layout is enabled."""
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        try:
+            return _deref(instance.__dict__[self.name])
+        except KeyError:
+            # Like a missing plain attribute, so that __getattr__ of the class is used
+            raise AttributeError(self.name) from None
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.name] = _ref(value) if _enabled else value
+
+
+class WeakReferenceList(WeakReference):
+    """A data descriptor for lists of elements, stored as WeakList while the layout is enabled.
+
+    Reading returns the stored (Weak)List itself, so that it can be modified in place.
+    """
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        try:
+            return instance.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name) from None
+
+    def __set__(self, instance, value):
+        if _enabled and not isinstance(value, WeakList):
+            value = WeakList(value)
+        instance.__dict__[self.name] = value
+
+
+def _classes() -> dict:
+    from yaramo.node import Node
+    from yaramo.signal import Signal
+
+    return {"Signal": Signal, "Node": Node}
+
+
+def _getstate(element) -> dict:
+    """The attributes of a Signal or Node with its weak references dereferenced."""
+
+    state = dict(element.__dict__)
+    class_name = type(element).__name__
+    for name in _REFERENCES.get(class_name, ()):
+        if name in state:
+            state[name] = _deref(state[name])
+    for name in _REFERENCE_LISTS.get(class_name, ()):
+        if isinstance(state.get(name), WeakList):
+            state[name] = list(state[name])
+    return state
+
+
+def _setstate(element, state: dict):
+    element.__dict__.update(state)
+    if not _enabled:
+        return
+    class_name = type(element).__name__
+    for name in _REFERENCES.get(class_name, ()):
+        if name in state:
+            element.__dict__[name] = _ref(state[name])
+    for name in _REFERENCE_LISTS.get(class_name, ()):
+        if name in state:
+            element.__dict__[name] = WeakList(state[name])
+
+
+def _install():
+    global _installed
+    if _installed:
+        return
+    for class_name, element_class in _classes().items():
+        element_class.__getstate__ = _getstate
+        element_class.__setstate__ = _setstate
+        for name in _REFERENCES.get(class_name, ()):
+            descriptor = WeakReference()
+            descriptor.__set_name__(element_class, name)
+            setattr(element_class, name, descriptor)
+        for name in _REFERENCE_LISTS.get(class_name, ()):
+            descriptor = WeakReferenceList()
+            descriptor.__set_name__(element_class, name)
+            setattr(element_class, name, descriptor)
+    _installed = True
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable():
+    """Stores the back-references of elements weakly from now on."""
+
+    global _enabled
+    with _lock:
+        _install()
+        _enabled = True
+
+
+def disable():
+    """Stores the back-references of elements strongly again (existing weak references stay
+    weak until they are assigned again or converted)."""
+
+    global _enabled
+    with _lock:
+        _enabled = False
+
+
+def convert(topology: "Topology", weak: bool = True):
+    """Converts the back-references of all Signals and Nodes of the Topology to weak
+    (or, with weak=False, strong) references.
+
+    The Topology must own all elements referred to.
+    """
+
+    _install()
+    for elements, class_name in ((topology.signals, "Signal"), (topology.nodes, "Node")):
+        names = _REFERENCES.get(class_name, ())
+        list_names = _REFERENCE_LISTS.get(class_name, ())
+        for element in elements.values():
+            attributes = element.__dict__
+            for name in names:
+                value = getattr(element, name)
+                attributes[name] = _ref(value) if weak else value
+            for name in list_names:
+                values = getattr(element, name)
+                attributes[name] = WeakList(values) if weak else list(values)
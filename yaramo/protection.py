@@ -0,0 +1,324 @@
+"""Overlaps and flank protection of Routes.
+
+The overlap of a Route is the track beyond its end Signal up to a configurable length, in
+travel direction of the end Signal. Where it passes a turnout from the head, it branches, so an
+Overlap holds every alternative path.
+
+A turnout the Route passes must be protected against trains coming out of the branch the
+Route does not use. The flank protection search follows that branch away from the turnout and
+stops at the first protecting element of every path: a main Signal facing the turnout (which
+can show stop), or a turnout entered on its left or right, which protects when it is set to
+the other branch. Turnouts entered from the head let trains through from both branches, so
+the search continues on both. Buffer stops end a path without any element.
+
+Overlaps are computed once per end Signal and flank protection once per turnout and unused
+branch, so Routes ending at the same Signal or passing the same turnouts share the results.
+"""
+
+from typing import Optional
+
+from yaramo.edge import Edge
+from yaramo.editing import edge_length
+from yaramo.node import Node, NodeConnectionDirection
+from yaramo.signal import Signal, SignalDirection, SignalKind
+
+DEFAULT_OVERLAP_LENGTH = 200.0
+DEFAULT_FLANK_SEARCH_LENGTH = 1000.0
+# The kinds of Signals that can show stop to protect a flank
+PROTECTING_SIGNAL_KINDS = frozenset(
+    (SignalKind.Hauptsignal, SignalKind.Hauptsperrsignal, SignalKind.Sperrsignal)
+)
+
+
+class OverlapSection(object):
+    """The part of an Edge between the distances start and end from its node_a."""
+
+    def __init__(self, edge: Edge, start: float, end: float):
+        self.edge = edge
+        self.start = start
+        self.end = end
+
+    @property
+    def length(self) -> float:
+        return self.end - self.start
+
+    def __repr__(self):
+        return f"OverlapSection({self.edge.uuid}, {self.start}, {self.end})"
+
+
+class Overlap(object):
+    """The alternative paths of OverlapSections beyond an end Signal.
+
+    A path is shorter than the overlap length if it ends at a buffer stop (or an Edge without
+    length).
+    """
+
+    def __init__(self, end_signal: Signal, length: float, paths: list[list[OverlapSection]]):
+        self.end_signal = end_signal
+        self.length = length
+        self.paths = paths
+
+    @property
+    def edges(self) -> set[Edge]:
+        return {section.edge for path in self.paths for section in path}
+
+    @property
+    def turnouts(self) -> list[Node]:
+        """The turnouts within the overlap in the order they are passed."""
+
+        turnouts = {}
+        for path in self.paths:
+            for section, following in zip(path, path[1:]):
+                node = _common_node(section.edge, following.edge)
+                if node is not None and len(node.connected_nodes) == 3:
+                    turnouts.setdefault(node.uuid, node)
+        return list(turnouts.values())
+
+
+class FlankProtection(object):
+    """The elements protecting the unused branch of a turnout.
+
+    Parameters
+    ----------
+    turnout: Node
+        The turnout passed by the Route
+    branch: Node
+        The Node connected to turnout that the Route does not lead to
+    signals: list[Signal]
+        The Signals that have to show stop
+    turnouts: list[tuple[Node, NodeConnectionDirection]]
+        The turnouts that have to be set to the given branch (Links or Rechts)
+    complete: bool
+        False if a path reached the search length or a turnout without known connections
+    """
+
+    def __init__(self, turnout: Node, branch: Node):
+        self.turnout = turnout
+        self.branch = branch
+        self.signals: list[Signal] = []
+        self.turnouts: list[tuple[Node, NodeConnectionDirection]] = []
+        self.complete = True
+
+
+class RouteProtection(object):
+    """The Overlap and the FlankProtection of every turnout (in travel order) of a Route."""
+
+    def __init__(
+        self,
+        route: "Route",
+        overlap: Optional[Overlap],
+        flank_protection: list[FlankProtection],
+    ):
+        self.route = route
+        self.overlap = overlap
+        self.flank_protection = flank_protection
+
+
+def _common_node(edge: Edge, other: Edge) -> Optional[Node]:
+    if edge.node_a is other.node_a or edge.node_a is other.node_b:
+        return edge.node_a
+    if edge.node_b is other.node_a or edge.node_b is other.node_b:
+        return edge.node_b
+    return None
+
+
+class ProtectionCalculator(object):
+    """Computes and caches Overlaps and FlankProtection for the Routes of a Topology.
+
+    The Topology must not change while the calculator is used.
+
+    Parameters
+    ----------
+    overlap_length: float
+        The length of the overlaps in the unit of Edge.length (default is 200)
+    flank_search_length: float
+        The maximum distance from a turnout to its flank protection elements (default is 1000)
+    """
+
+    def __init__(
+        self,
+        topology: "Topology",
+        overlap_length: float = DEFAULT_OVERLAP_LENGTH,
+        flank_search_length: float = DEFAULT_FLANK_SEARCH_LENGTH,
+    ):
+        self.topology = topology
+        self.overlap_length = overlap_length
+        self.flank_search_length = flank_search_length
+        self._edges: dict[tuple[str, str], Edge] = {}
+        for edge in topology.edges.values():
+            self._edges.setdefault((edge.node_a.uuid, edge.node_b.uuid), edge)
+            self._edges.setdefault((edge.node_b.uuid, edge.node_a.uuid), edge)
+        self._overlaps: dict[str, Overlap] = {}
+        self._flank_protection: dict[tuple[str, str], FlankProtection] = {}
+
+    def _edge(self, node: Node, other: Node) -> Optional[Edge]:
+        return self._edges.get((node.uuid, other.uuid))
+
+    def overlap(self, end_signal: Signal) -> Overlap:
+        """Returns the Overlap beyond the Signal."""
+
+        if end_signal.uuid not in self._overlaps:
+            self._overlaps[end_signal.uuid] = Overlap(
+                end_signal, self.overlap_length, self._overlap_paths(end_signal)
+            )
+        return self._overlaps[end_signal.uuid]
+
+    def _overlap_paths(self, signal: Signal) -> list[list[OverlapSection]]:
+        edge = signal.edge
+        length = edge_length(edge) if edge is not None else None
+        if length is None:
+            return []
+        remaining = self.overlap_length
+        if signal.direction == SignalDirection.IN:
+            ahead = length - signal.distance_edge
+            first = OverlapSection(
+                edge, signal.distance_edge, min(length, signal.distance_edge + remaining)
+            )
+        else:
+            ahead = signal.distance_edge
+            first = OverlapSection(edge, max(0.0, ahead - remaining), ahead)
+        if remaining <= ahead:
+            return [[first]]
+
+        paths = []
+        # (Node entered, Node coming from, path so far, remaining length)
+        stack = [(signal.next_node(), signal.previous_node(), [first], remaining - ahead)]
+        while stack:
+            node, source, path, remaining = stack.pop()
+            extended = False
+            for follower in node.get_possible_followers(source):
+                edge = self._edge(node, follower)
+                if edge is None or any(section.edge is edge for section in path):
+                    continue
+                length = edge_length(edge)
+                if length is None:
+                    continue
+                if edge.node_a is node:
+                    section = OverlapSection(edge, 0.0, min(length, remaining))
+                else:
+                    section = OverlapSection(edge, max(0.0, length - remaining), length)
+                extended = True
+                if remaining <= length:
+                    paths.append(path + [section])
+                else:
+                    stack.append((follower, node, path + [section], remaining - length))
+            if not extended:
+                paths.append(path)
+        return paths
+
+    def flank_protection(self, turnout: Node, branch: Node) -> FlankProtection:
+        """Returns the elements protecting turnout against trains coming from branch."""
+
+        key = turnout.uuid, branch.uuid
+        if key not in self._flank_protection:
+            self._flank_protection[key] = self._search_flank(turnout, branch)
+        return self._flank_protection[key]
+
+    def _search_flank(self, turnout: Node, branch: Node) -> FlankProtection:
+        protection = FlankProtection(turnout, branch)
+        # (Node closer to the turnout, Node entered, distance from the turnout)
+        stack = [(turnout, branch, 0.0)]
+        visited = set()
+        while stack:
+            previous, node, distance = stack.pop()
+            if (previous.uuid, node.uuid) in visited:
+                continue
+            visited.add((previous.uuid, node.uuid))
+            edge = self._edge(previous, node)
+            length = edge_length(edge) if edge is not None else None
+            if length is None:
+                protection.complete = False
+                continue
+
+            # Trains towards the turnout travel from node to previous
+            towards_b = edge.node_a is node
+            direction = SignalDirection.IN if towards_b else SignalDirection.GEGEN
+            signals = [
+                signal
+                for signal in edge.signals
+                if signal.direction == direction and signal.kind in PROTECTING_SIGNAL_KINDS
+            ]
+            if signals:
+                nearest = max if towards_b else min
+                signal = nearest(signals, key=lambda signal: signal.distance_edge)
+                if signal not in protection.signals:
+                    protection.signals.append(signal)
+                continue
+
+            distance += length
+            if distance > self.flank_search_length:
+                protection.complete = False
+                continue
+            connected = node.connected_nodes
+            if len(connected) == 3:
+                connections = node.turnout_connections()
+                if connections is None:
+                    protection.complete = False
+                    continue
+                head, left, right = connections
+                if previous is head:
+                    stack.extend([(node, right, distance), (node, left, distance)])
+                else:
+                    position = (
+                        NodeConnectionDirection.Rechts
+                        if previous is left
+                        else NodeConnectionDirection.Links
+                    )
+                    if (node, position) not in protection.turnouts:
+                        protection.turnouts.append((node, position))
+            else:
+                stack.extend(
+                    (node, other, distance) for other in connected if other is not previous
+                )
+        return protection
+
+    def _passed_nodes(self, route: "Route") -> Optional[list[tuple[Node, Node, Node]]]:
+        """Returns (previous Node, Node, next Node) for the Nodes between the Edges of the Route
+        in travel order, or None if its Edges do not lead from the start to the end Signal."""
+
+        end_edge = route.end_signal.edge
+        edge = route.start_signal.edge
+        node = route.start_signal.next_node()
+        passed = []
+        while edge is not end_edge:
+            previous = edge.get_other_node(node)
+            following = None
+            for other in route.edges:
+                if other is not edge and other.is_node_connected(node):
+                    candidate = other.get_other_node(node)
+                    if candidate is not previous:
+                        following, edge = candidate, other
+                        break
+            if following is None or len(passed) > len(route.edges):
+                return None
+            passed.append((previous, node, following))
+            node = following
+        return passed
+
+    def route_protection(self, route: "Route") -> RouteProtection:
+        """Returns the Overlap (None without end Signal) and the FlankProtection of the
+        Route."""
+
+        if route.end_signal is None:
+            return RouteProtection(route, None, [])
+        flank_protection = []
+        for previous, node, following in self._passed_nodes(route) or ():
+            if len(node.connected_nodes) != 3:
+                continue
+            for branch in node.connected_nodes:
+                if branch is not previous and branch is not following:
+                    flank_protection.append(self.flank_protection(node, branch))
+        return RouteProtection(route, self.overlap(route.end_signal), flank_protection)
+
+
+def compute_route_protection(
+    topology: "Topology",
+    overlap_length: float = DEFAULT_OVERLAP_LENGTH,
+    flank_search_length: float = DEFAULT_FLANK_SEARCH_LENGTH,
+) -> dict[str, RouteProtection]:
+    """Returns the RouteProtection of every Route of the Topology by the Route's uuid."""
+
+    calculator = ProtectionCalculator(
+        topology, overlap_length=overlap_length, flank_search_length=flank_search_length
+    )
+    return {uuid: calculator.route_protection(route) for uuid, route in topology.routes.items()}
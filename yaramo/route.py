@@ -2,6 +2,7 @@ from typing import Dict, Optional
 
 from yaramo.base_element import BaseElement
 from yaramo.edge import Edge
+from yaramo.instrumentation import instrumented
 from yaramo.node import Node
 from yaramo.signal import Signal
 from yaramo.vacancy_section import VacancySection
@@ -39,6 +40,7 @@ class Route(BaseElement):
             length_sum = length_sum + float(edge.length)
         return length_sum
 
+    @instrumented
     def get_edges_in_order(self):
         """Returns all Edges comprising the Route in order starting at the start Signal Edge."""
         if self.end_signal is None:
@@ -117,7 +119,11 @@ class Route(BaseElement):
             "edges": [edge.uuid for edge in self.edges],
             "start_signal": self.start_signal.uuid,
             "end_signal": self.end_signal.uuid if self.end_signal else None,
-            "vacancy_sections": self.vacancy_sections,
+            "vacancy_sections": [
+                vacancy_section.uuid
+                for vacancy_section in self.vacancy_sections
+                if vacancy_section is not None
+            ],
         }
 
         return {**attributes, **references}, {}
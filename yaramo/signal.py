@@ -5,6 +5,7 @@ from uuid import uuid4
 
 from yaramo.additional_signal import AdditionalSignal
 from yaramo.base_element import BaseElement
+from yaramo.bitset import EnumSet, EnumSetAttribute
 from yaramo.edge import Edge
 from yaramo.trip import Trip
 
@@ -103,6 +104,7 @@ class SignalState(Enum):
             return SignalState.MS_GE_D
         if state_string == "verkuerzter Abstand des Bremswegs, weißes Zusatzlicht über Signallicht":
             return SignalState.ZLO
+
         logging.warning(
             f"The Signal State with the string {state_string} does not exists. Return None instead"
         )
@@ -116,6 +118,9 @@ class Signal(BaseElement):
     an Edge symbolises.
     """
 
+    # Stored as a bitmask, assigned sets (or lists) of SignalStates are converted to an EnumSet
+    supported_states = EnumSetAttribute(SignalState)
+
     def __init__(
         self,
         edge: Edge,
@@ -143,7 +148,8 @@ class Signal(BaseElement):
         additional_signals: list[AdditionalSignal]
             Additional_signals connected to that Signal
         supported_states: Set[SignalState]
-            Different SignalStates a Signal can show
+            Different SignalStates a Signal can show (also as their strings, e.g.
+            "SignalState.HP0")
         """
 
         super().__init__(**kwargs)
@@ -151,9 +157,9 @@ class Signal(BaseElement):
         self.edge = edge
         self.distance_edge = distance_edge
         self.classification_number = classification_number
-        self.control_member_uuid = str(uuid4())
+        self.control_member_uuid = kwargs.get("control_member_uuid") or str(uuid4())
         self.additional_signals: list[AdditionalSignal] = []
-        self.supported_states: Set[SignalState] = supported_states if supported_states else set()
+        self.supported_states: EnumSet = supported_states
 
         if isinstance(direction, str):
             self.direction = SignalDirection.GEGEN if direction == "gegen" else SignalDirection.IN
@@ -205,16 +211,18 @@ class Signal(BaseElement):
             "edge": self.edge.uuid if self.edge else None,
             "trip": self.trip.uuid if self.trip else None,
             "additional_signals": [signal.uuid for signal in self.additional_signals],
-            "supported_states": [str(state) for state in self.supported_states],
+            "supported_states": self.supported_states.strings(),
             "direction": str(self.direction),
             "side_distance": self.side_distance,
             "function": str(self.function),
             "kind": str(self.kind),
+            "system": str(self.system),
         }
         objects = {}
         items = [self.trip] + self.additional_signals if self.trip else self.additional_signals
         for item in items:
             item_object, serialized_item = item.to_serializable()
-            objects = {**objects, item.uuid: item_object, **serialized_item}
+            objects[item.uuid] = item_object
+            objects.update(serialized_item)
 
         return {**attributes, **references}, objects
@@ -0,0 +1,260 @@
+"""A cached table of along-track distances between Signals.
+
+For every Signal, the table holds the shortest distance along the track (in travel direction,
+respecting the turnouts, see Node.get_possible_followers) to all Signals of the same travel
+direction within a horizon, and which of them follow without another Signal in between.
+
+All missing rows are computed in one sweep of searches bounded by the horizon, which share the
+states of the Edges (length, Signals and successors in each direction). The Edges a source's
+search has visited are remembered, so that changes of Edges and Signals only invalidate the rows
+of the sources that could be affected; they are recomputed in the next sweep, which runs on the
+next lookup.
+"""
+
+import heapq
+from typing import Optional
+
+from yaramo.concurrency import build_lock
+from yaramo.edge import Edge
+from yaramo.editing import edge_length
+from yaramo.node import Node
+from yaramo.signal import Signal, SignalDirection
+
+DEFAULT_HORIZON = 5000.0
+
+
+class SignalDistanceTable(object):
+    """Along-track distances between the Signals of a Topology up to a horizon.
+
+    Parameters
+    ----------
+    horizon: float
+        The maximum distance in the unit of Edge.length (default is 5000)
+    """
+
+    def __init__(self, topology: "Topology", horizon: float = DEFAULT_HORIZON):
+        self.topology = topology
+        self.horizon = horizon
+        self._adjacency: dict[str, list[Edge]] = {}
+        for edge in topology.edges.values():
+            self._connect(edge)
+        self._distances: dict[str, dict[str, float]] = {}
+        self._next: dict[str, dict[str, float]] = {}
+        # The Edges visited by the search of every source and the sources per Edge and target
+        self._edges_of_source: dict[str, set[str]] = {}
+        self._sources_by_edge: dict[str, set[str]] = {}
+        self._sources_by_target: dict[str, set[str]] = {}
+        self._dirty: set[str] = set(topology.signals)
+
+    def _connect(self, edge: Edge):
+        self._adjacency.setdefault(edge.node_a.uuid, []).append(edge)
+        if edge.node_b is not edge.node_a:
+            self._adjacency.setdefault(edge.node_b.uuid, []).append(edge)
+
+    def distance(self, source: Signal, target: Signal) -> Optional[float]:
+        """Returns the shortest distance from source to target in travel direction of source,
+        or None if target is not within the horizon (or faces the other direction)."""
+
+        return self.distances_from(source).get(target.uuid)
+
+    def distances_from(self, source: Signal) -> dict[str, float]:
+        """Returns the distances to all Signals within the horizon by their uuid (do not
+        modify it)."""
+
+        self.refresh()
+        return self._distances.get(source.uuid, {})
+
+    def next_signals(self, source: Signal) -> dict[str, float]:
+        """Returns the distances to the Signals that follow source without another Signal of
+        the same direction in between (one per branch of the turnouts) by their uuid."""
+
+        self.refresh()
+        return self._next.get(source.uuid, {})
+
+    def _invalidate_sources(self, sources):
+        self._dirty.update(sources)
+
+    def _sources_near(self, edge: Edge) -> set[str]:
+        """The sources whose search visited the Edge or an Edge connected to it."""
+
+        sources = set(self._sources_by_edge.get(edge.uuid, ()))
+        for node in (edge.node_a, edge.node_b):
+            for other in self._adjacency.get(node.uuid, ()):
+                sources |= self._sources_by_edge.get(other.uuid, set())
+        return sources
+
+    def add_edge(self, edge: Edge):
+        self._invalidate_sources(self._sources_near(edge))
+        self._connect(edge)
+
+    def remove_edge(self, edge: Edge):
+        for node in (edge.node_a, edge.node_b):
+            edges = self._adjacency.get(node.uuid, [])
+            if edge in edges:
+                edges.remove(edge)
+        self._invalidate_sources(self._sources_by_edge.get(edge.uuid, ()))
+
+    def update_edge(self, edge: Edge):
+        """Invalidates the affected distances after the length or the Signals of an added
+        Edge have changed (Edges with other Nodes have to be removed and added)."""
+        self._invalidate_sources(self._sources_by_edge.get(edge.uuid, ()))
+
+    def update_node(self, node: Node):
+        """Invalidates the affected distances after the connections on head, left and right of
+        a Node have changed."""
+        sources = set()
+        for edge in self._adjacency.get(node.uuid, ()):
+            sources |= self._sources_by_edge.get(edge.uuid, set())
+        self._invalidate_sources(sources)
+
+    def add_signal(self, signal: Signal):
+        self._dirty.add(signal.uuid)
+        if signal.edge is not None:
+            self._invalidate_sources(self._sources_by_edge.get(signal.edge.uuid, ()))
+
+    def remove_signal(self, signal: Signal):
+        self._invalidate_sources(self._sources_by_target.get(signal.uuid, ()))
+        self._dirty.add(signal.uuid)
+
+    def update_signal(self, signal: Signal):
+        """Invalidates the affected distances after the Edge, distance_edge or direction of an
+        added Signal have changed."""
+        self.remove_signal(signal)
+        self.add_signal(signal)
+
+    def _drop(self, source: str):
+        for target in self._distances.pop(source, ()):
+            sources = self._sources_by_target.get(target)
+            if sources is not None:
+                sources.discard(source)
+                if not sources:
+                    del self._sources_by_target[target]
+        self._next.pop(source, None)
+        for edge_uuid in self._edges_of_source.pop(source, ()):
+            sources = self._sources_by_edge.get(edge_uuid)
+            if sources is not None:
+                sources.discard(source)
+                if not sources:
+                    del self._sources_by_edge[edge_uuid]
+
+    def refresh(self):
+        """Recomputes the invalidated rows (lookups call it). Concurrent readers wait for the
+        refresh, the rows are not changed while no rows are invalidated."""
+
+        if not self._dirty:
+            return
+        with build_lock:
+            if not self._dirty:
+                return
+            dirty = self._dirty
+            for source in dirty:
+                self._drop(source)
+            signals = self.topology.signals
+            self._sweep([signals[uuid] for uuid in dirty if uuid in signals])
+            self._dirty = set()
+
+    def _sweep(self, sources: list[Signal]):
+        """Computes the rows of the sources. The searches share the states (an Edge in one
+        direction) with their length, Signals and successors, which are built on first use."""
+
+        horizon = self.horizon
+        state_ids: dict[tuple[str, bool], int] = {}
+        state_edges: list[Edge] = []
+        state_forward: list[bool] = []
+        state_lengths: list[Optional[float]] = []
+        # The Signals of the state's travel direction as (position, Signal), by position
+        state_signals: list[list[tuple[float, Signal]]] = []
+        state_successors: list[Optional[list[int]]] = []
+
+        def state(edge: Edge, forward: bool) -> int:
+            key = edge.uuid, forward
+            if key not in state_ids:
+                state_ids[key] = len(state_edges)
+                length = edge_length(edge)
+                direction = SignalDirection.IN if forward else SignalDirection.GEGEN
+                state_edges.append(edge)
+                state_forward.append(forward)
+                state_lengths.append(length)
+                state_signals.append(
+                    sorted(
+                        (
+                            (
+                                signal.distance_edge if forward else length - signal.distance_edge,
+                                signal,
+                            )
+                            for signal in edge.signals
+                            if signal.direction == direction and length is not None
+                        ),
+                        key=lambda item: item[0],
+                    )
+                )
+                state_successors.append(None)
+            return state_ids[key]
+
+        def successors(current: int) -> list[int]:
+            if state_successors[current] is None:
+                edge = state_edges[current]
+                node = edge.node_b if state_forward[current] else edge.node_a
+                result = []
+                for follower in node.get_possible_followers(edge.get_other_node(node)):
+                    for next_edge in self._adjacency.get(node.uuid, ()):
+                        if next_edge is not edge and next_edge.get_other_node(node) is follower:
+                            next_state = state(next_edge, next_edge.node_a is node)
+                            if state_lengths[next_state] is not None:
+                                result.append(next_state)
+                state_successors[current] = result
+            return state_successors[current]
+
+        sources_by_edge = self._sources_by_edge
+        sources_by_target = self._sources_by_target
+        for source in sources:
+            distances: dict[str, float] = {}
+            following: dict[str, float] = {}
+            visited_edges: set[str] = set()
+            self._distances[source.uuid] = distances
+            self._next[source.uuid] = following
+            self._edges_of_source[source.uuid] = visited_edges
+            if source.edge is None:
+                continue
+            first = state(source.edge, source.direction == SignalDirection.IN)
+            if state_lengths[first] is None:
+                continue
+            position = source.distance_edge
+            if not state_forward[first]:
+                position = state_lengths[first] - position
+
+            # An Edge is entered at distance 0, the source's own Edge at -position. The first
+            # state is not marked as visited, since it can be entered again through a loop.
+            # States are settled separately with and without a passed Signal, as a longer branch
+            # without a Signal leads to further following Signals than a shorter one with one.
+            queue = [(-position, first, False)]
+            visited: set[tuple[int, bool]] = set()
+            while queue:
+                entered, current, passed = heapq.heappop(queue)
+                if entered >= 0:
+                    if (current, passed) in visited or (current, False) in visited:
+                        continue
+                    visited.add((current, passed))
+                edge_uuid = state_edges[current].uuid
+                if edge_uuid not in visited_edges:
+                    visited_edges.add(edge_uuid)
+                    sources_by_edge.setdefault(edge_uuid, set()).add(source.uuid)
+
+                for position, signal in state_signals[current]:
+                    distance = entered + position
+                    if distance > horizon:
+                        break
+                    if distance < 0 or signal is source:
+                        continue
+                    if distance < distances.get(signal.uuid, horizon + 1):
+                        distances[signal.uuid] = distance
+                        sources_by_target.setdefault(signal.uuid, set()).add(source.uuid)
+                    if not passed:
+                        following[signal.uuid] = min(distance, following.get(signal.uuid, distance))
+                        passed = True
+
+                end = entered + state_lengths[current]
+                if end <= horizon:
+                    for next_state in successors(current):
+                        if (next_state, passed) not in visited:
+                            heapq.heappush(queue, (end, next_state, passed))
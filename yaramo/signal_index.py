@@ -0,0 +1,232 @@
+from typing import Callable, Iterable, Iterator, Optional
+
+from yaramo.bitset import BitColumns, lookup_table, select
+from yaramo.signal import (
+    Signal,
+    SignalDirection,
+    SignalFunction,
+    SignalKind,
+    SignalState,
+    SignalSystem,
+)
+
+INDEXED_ATTRIBUTES = (
+    "function",
+    "kind",
+    "system",
+    "direction",
+    "supported_state",
+    "additional_signal",
+)
+
+
+def _index_keys(signal: Signal) -> list[tuple[str, object]]:
+    keys = [
+        ("function", signal.function),
+        ("kind", signal.kind),
+        ("system", signal.system),
+        ("direction", signal.direction),
+    ]
+    keys.extend(
+        ("additional_signal", type(additional_signal))
+        for additional_signal in signal.additional_signals
+    )
+    return keys
+
+
+class SignalIndex(object):
+    """Secondary indexes of Signals by function, kind, system, direction, supported SignalStates
+    and the types of their AdditionalSignals.
+
+    Each index maps an attribute value to the set of uuids of the Signals having that value.
+    The supported SignalStates are stored as one bit column per state over the rows of the
+    Signals instead (see yaramo.bitset), so that the Signals supporting several states are
+    found by intersecting whole columns at once. A Signal has to be updated in the index
+    whenever one of these attributes changes.
+    """
+
+    def __init__(self, signals: Iterable[Signal] = ()):
+        self._indexes: dict[str, dict[object, set[str]]] = {
+            attribute: {} for attribute in INDEXED_ATTRIBUTES if attribute != "supported_state"
+        }
+        self._keys: dict[str, list[tuple[str, object]]] = {}
+        self._states = BitColumns()
+        self._rows: dict[str, int] = {}
+        self._row_uuids: list[Optional[str]] = []
+        self._free_rows: list[int] = []
+        self._state_masks: dict[str, int] = {}
+        for signal in signals:
+            self.add(signal)
+
+    def add(self, signal: Signal):
+        if signal.uuid in self._keys:
+            self.remove(signal)
+        keys = _index_keys(signal)
+        self._keys[signal.uuid] = keys
+        for attribute, value in keys:
+            self._indexes[attribute].setdefault(value, set()).add(signal.uuid)
+
+        if self._free_rows:
+            row = self._free_rows.pop()
+            self._row_uuids[row] = signal.uuid
+        else:
+            row = len(self._row_uuids)
+            self._row_uuids.append(signal.uuid)
+        self._rows[signal.uuid] = row
+        states = signal.supported_states
+        self._state_masks[signal.uuid] = states.mask
+        for state in states:
+            self._states.set(state, row)
+
+    def remove(self, signal: Signal):
+        for attribute, value in self._keys.pop(signal.uuid, []):
+            uuids = self._indexes[attribute][value]
+            uuids.discard(signal.uuid)
+            if not uuids:
+                del self._indexes[attribute][value]
+
+        row = self._rows.pop(signal.uuid, None)
+        if row is None:
+            return
+        for state in lookup_table(SignalState).decode(self._state_masks.pop(signal.uuid)):
+            self._states.clear(state, row)
+        self._row_uuids[row] = None
+        self._free_rows.append(row)
+
+    def update(self, signal: Signal):
+        """Reindexes a Signal after its indexed attributes have changed."""
+        self.add(signal)
+
+    def get(self, attribute: str, value) -> set[str]:
+        """Returns the uuids of all Signals with that value of attribute (do not modify it)."""
+        if attribute == "supported_state":
+            return self.supporting((value,))
+        return self._indexes[attribute].get(value, set())
+
+    def supporting_mask(self, states: Iterable[SignalState], all_states: bool = True) -> int:
+        """Returns the bitmask of the rows of the Signals supporting all (or any) of states."""
+        if all_states:
+            return self._states.all(states)
+        return self._states.any(states)
+
+    def uuids_of(self, mask: int) -> set[str]:
+        """Returns the uuids of the Signals in the rows of mask."""
+        return set(select(self._row_uuids, mask))
+
+    def supporting(self, states: Iterable[SignalState], all_states: bool = True) -> set[str]:
+        """Returns the uuids of all Signals supporting all (or any) of states."""
+        return self.uuids_of(self.supporting_mask(states, all_states))
+
+    def __len__(self):
+        return len(self._keys)
+
+
+class SignalQuery(object):
+    """A composable, immutable query on the Signals of a Topology.
+
+    Every filter method returns a new query. Filters on different attributes are combined
+    with AND, several values passed to one filter with OR (except for supporting(), which
+    requires all given states). The result is computed by intersecting the index sets,
+    starting with the smallest one, the constraints on the supported states are combined on
+    the bit columns of the states first.
+
+    Example
+    -------
+    topology.query_signals().function(SignalFunction.Block_Signal).direction(SignalDirection.IN)
+    """
+
+    def __init__(
+        self,
+        topology: "Topology",
+        constraints: tuple[tuple[str, tuple], ...] = (),
+        predicates: tuple[Callable[[Signal], bool], ...] = (),
+    ):
+        self._topology = topology
+        self._constraints = constraints
+        self._predicates = predicates
+
+    def _with(self, attribute: str, values: tuple) -> "SignalQuery":
+        return SignalQuery(
+            self._topology, self._constraints + ((attribute, values),), self._predicates
+        )
+
+    def function(self, *functions: SignalFunction) -> "SignalQuery":
+        return self._with("function", functions)
+
+    def kind(self, *kinds: SignalKind) -> "SignalQuery":
+        return self._with("kind", kinds)
+
+    def system(self, *systems: SignalSystem) -> "SignalQuery":
+        return self._with("system", systems)
+
+    def direction(self, *directions: SignalDirection) -> "SignalQuery":
+        return self._with("direction", directions)
+
+    def supporting(self, *states: SignalState) -> "SignalQuery":
+        """Only Signals supporting all the given states."""
+        query = self
+        for state in states:
+            query = query._with("supported_state", (state,))
+        return query
+
+    def supporting_any(self, *states: SignalState) -> "SignalQuery":
+        """Only Signals supporting at least one of the given states."""
+        return self._with("supported_state", states)
+
+    def with_additional_signal(self, *types: type) -> "SignalQuery":
+        """Only Signals with an AdditionalSignal of one of the given types
+        (e.g. AdditionalSignalZs3)."""
+        return self._with("additional_signal", types)
+
+    def where(self, predicate: Callable[[Signal], bool]) -> "SignalQuery":
+        """Filters the Signals matching the indexed constraints with an arbitrary predicate."""
+        return SignalQuery(self._topology, self._constraints, self._predicates + (predicate,))
+
+    def uuids(self) -> set[str]:
+        index = self._topology.signal_index
+        candidates: list[set[str]] = []
+        states = None
+        for attribute, values in self._constraints:
+            if attribute == "supported_state":
+                mask = index.supporting_mask(values, all_states=False)
+                states = mask if states is None else states & mask
+            elif len(values) == 1:
+                candidates.append(index.get(attribute, values[0]))
+            else:
+                candidates.append(set().union(*(index.get(attribute, value) for value in values)))
+        if states is not None:
+            candidates.append(index.uuids_of(states))
+
+        if not candidates:
+            result = set(self._topology.signals)
+        else:
+            candidates.sort(key=len)
+            result = set(candidates[0])
+            for uuids in candidates[1:]:
+                if not result:
+                    break
+                result.intersection_update(uuids)
+
+        if self._predicates:
+            signals = self._topology.signals
+            result = {
+                uuid
+                for uuid in result
+                if all(predicate(signals[uuid]) for predicate in self._predicates)
+            }
+        return result
+
+    def all(self) -> list[Signal]:
+        signals = self._topology.signals
+        return [signals[uuid] for uuid in self.uuids()]
+
+    def first(self) -> Optional[Signal]:
+        for signal in self:
+            return signal
+        return None
+
+    def __iter__(self) -> Iterator[Signal]:
+        return iter(self.all())
+
+    def __len__(self) -> int:
+        return len(self.uuids())
@@ -0,0 +1,613 @@
+"""Persistence of Topologies in SQLite files with partial, on-demand loading.
+
+A TopologyStore keeps Nodes, Edges, the intermediate GeoPoints of Edges, Signals, Routes and
+VacancySections in indexed tables. Nodes are additionally indexed by a grid of their
+coordinates, so that the Nodes within a bounding box are found without a full scan.
+
+A StoredTopology is a Topology backed by a store that starts empty and loads only the elements
+that are queried (by bounding box, uuid or graph neighbourhood). The Nodes referred to by loaded
+elements (e.g. the neighbours of a Node or the Nodes of an Edge) are placeholders that know
+only their uuid and load themselves on the first access of another attribute, so a traversal
+faults in the Nodes it reaches. The Edges between loaded Nodes are loaded with edges_of or
+get_edge_by_nodes. commit() writes back only the elements whose digest (see
+yaramo.fingerprint) differs from the one they had when they were loaded.
+"""
+
+import os
+import sqlite3
+from typing import Iterable, Optional
+
+import simplejson as json
+
+from yaramo import additional_signal as additional_signals
+from yaramo import ownership
+from yaramo.base_element import BaseElement
+from yaramo.edge import Edge
+from yaramo.fingerprint import ELEMENT_KINDS, element_digest
+from yaramo.geo_node import DbrefGeoNode, GeoNode, Wgs84GeoNode
+from yaramo.node import Node
+from yaramo.route import Route
+from yaramo.signal import Signal, SignalState
+from yaramo.topology import Topology
+from yaramo.vacancy_section import VacancySection
+
+SCHEMA_VERSION = 1
+
+_GEO_NODE_CLASSES = {"wgs84": Wgs84GeoNode, "dbref": DbrefGeoNode}
+_SYSTEMS = {geo_node_class: system for system, geo_node_class in _GEO_NODE_CLASSES.items()}
+# The edge length of a grid cell in the unit of the coordinate system (about 1 km)
+GRID_CELL_SIZES = {"wgs84": 0.01, "dbref": 1000.0}
+
+# SQLite limits the number of parameters of a statement
+_CHUNK_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS nodes (
+    uuid TEXT PRIMARY KEY, name TEXT, turnout_side TEXT, connected_nodes TEXT,
+    connected_on_head TEXT, connected_on_left TEXT, connected_on_right TEXT,
+    maximum_speed_on_left REAL, maximum_speed_on_right REAL,
+    geo_uuid TEXT, geo_name TEXT, system TEXT, x REAL, y REAL, cell_x INTEGER, cell_y INTEGER
+);
+CREATE INDEX IF NOT EXISTS nodes_grid ON nodes (system, cell_x, cell_y);
+CREATE TABLE IF NOT EXISTS edges (
+    uuid TEXT PRIMARY KEY, name TEXT, node_a TEXT, node_b TEXT, length REAL,
+    maximum_speed REAL, vacancy_section TEXT
+);
+CREATE INDEX IF NOT EXISTS edges_node_a ON edges (node_a);
+CREATE INDEX IF NOT EXISTS edges_node_b ON edges (node_b);
+CREATE TABLE IF NOT EXISTS geo_points (
+    uuid TEXT, name TEXT, edge TEXT, position INTEGER, system TEXT, x REAL, y REAL,
+    PRIMARY KEY (edge, position)
+);
+CREATE TABLE IF NOT EXISTS signals (
+    uuid TEXT PRIMARY KEY, name TEXT, edge TEXT, position INTEGER, distance_edge REAL,
+    direction TEXT, side_distance REAL, function TEXT, kind TEXT, system TEXT,
+    classification_number TEXT, control_member_uuid TEXT, supported_states TEXT,
+    additional_signals TEXT
+);
+CREATE INDEX IF NOT EXISTS signals_edge ON signals (edge);
+CREATE TABLE IF NOT EXISTS routes (
+    uuid TEXT PRIMARY KEY, name TEXT, start_signal TEXT, end_signal TEXT, maximum_speed REAL,
+    edges TEXT, vacancy_sections TEXT
+);
+CREATE INDEX IF NOT EXISTS routes_start_signal ON routes (start_signal);
+CREATE TABLE IF NOT EXISTS vacancy_sections (uuid TEXT PRIMARY KEY, name TEXT);
+"""
+
+
+def _uuid(element: Optional[BaseElement]) -> Optional[str]:
+    return element.uuid if element is not None else None
+
+
+def _chunks(values: list) -> Iterable[list]:
+    for start in range(0, len(values), _CHUNK_SIZE):
+        yield values[start : start + _CHUNK_SIZE]
+
+
+def _cell(system: Optional[str], value: Optional[float]) -> Optional[int]:
+    if system not in GRID_CELL_SIZES or value is None:
+        return None
+    return int(value // GRID_CELL_SIZES[system])
+
+
+def _geo(geo_node: Optional[GeoNode]) -> tuple:
+    """Returns the uuid, name, coordinate system, x and y of the GeoNode."""
+
+    if geo_node is None or geo_node.geo_point is None:
+        return None, None, None, None, None
+    return (
+        geo_node.uuid,
+        geo_node.name,
+        _SYSTEMS.get(type(geo_node)),
+        geo_node.geo_point.x,
+        geo_node.geo_point.y,
+    )
+
+
+def _geo_node(uuid: str, name: Optional[str], system: Optional[str], x, y) -> Optional[GeoNode]:
+    if system not in _GEO_NODE_CLASSES:
+        return None
+    return _GEO_NODE_CLASSES[system](x, y, uuid=uuid, name=name)
+
+
+def _enum_name(value) -> str:
+    # Enum members are stored by name, after from_json they may be strings like "SignalState.HP0"
+    return value.name if hasattr(value, "name") else str(value).split(".")[-1]
+
+
+def _additional_signal_row(additional_signal) -> dict:
+    return {
+        "class": type(additional_signal).__name__,
+        "uuid": additional_signal.uuid,
+        "name": additional_signal.name,
+        "symbols": [
+            [type(symbol).__qualname__, symbol.name] for symbol in additional_signal.symbols
+        ],
+    }
+
+
+def _additional_signal(row: dict):
+    symbols = []
+    for qualname, name in row["symbols"]:
+        symbol_class = additional_signals
+        for part in qualname.split("."):
+            symbol_class = getattr(symbol_class, part)
+        symbols.append(symbol_class[name])
+    additional_signal_class = getattr(additional_signals, row["class"])
+    return additional_signal_class(symbols, uuid=row["uuid"], name=row["name"])
+
+
+class StoredNode(Node):
+    """A Node of a StoredTopology, which may be a placeholder that knows only its uuid until
+    another attribute is accessed (then it is loaded from the store)."""
+
+    def __getattr__(self, name):
+        topology = self.__dict__.get("_stored_topology")
+        if topology is None or name.startswith("__"):
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        topology._fault_nodes([self.__dict__["uuid"]])
+        if "_stored_topology" in self.__dict__:
+            raise AttributeError(f"Node {self.__dict__['uuid']} does not exist in the store")
+        return getattr(self, name)
+
+    def is_loaded(self) -> bool:
+        return "_stored_topology" not in self.__dict__
+
+
+class TopologyStore(object):
+    """A Topology persisted in an SQLite file.
+
+    Parameters
+    ----------
+    path: str | os.PathLike
+        The SQLite file, created if it does not exist
+    """
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        with self.connection:
+            self.connection.executescript(_SCHEMA)
+            self.connection.execute(
+                "INSERT OR IGNORE INTO metadata VALUES ('schema_version', ?)",
+                (str(SCHEMA_VERSION),),
+            )
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def save(self, topology: Topology):
+        """Replaces the content of the store by the Topology (Trips are not stored)."""
+
+        with self.connection:
+            for table in ("nodes", "edges", "geo_points", "signals", "routes", "vacancy_sections"):
+                self.connection.execute(f"DELETE FROM {table}")
+            for kind in ELEMENT_KINDS:
+                self.write(kind, getattr(topology, kind).values())
+
+    def open(self) -> "StoredTopology":
+        """Returns an empty StoredTopology that loads its elements from this store."""
+        return StoredTopology(self)
+
+    def select(self, table: str, column: str, values: Iterable, order: str = "") -> list:
+        """Returns the rows of the table whose column is one of the values."""
+
+        rows = []
+        for chunk in _chunks(list(values)):
+            placeholders = ", ".join("?" * len(chunk))
+            rows.extend(
+                self.connection.execute(
+                    f"SELECT * FROM {table} WHERE {column} IN ({placeholders}) {order}", chunk
+                )
+            )
+        return rows
+
+    def _node_row(self, node: Node) -> tuple:
+        geo_uuid, geo_name, system, x, y = _geo(node.geo_node)
+        return (
+            node.uuid,
+            node.name,
+            node.turnout_side,
+            json.dumps([other.uuid for other in node.connected_nodes]),
+            _uuid(node.connected_on_head),
+            _uuid(node.connected_on_left),
+            _uuid(node.connected_on_right),
+            node.maximum_speed_on_left,
+            node.maximum_speed_on_right,
+            geo_uuid,
+            geo_name,
+            system,
+            x,
+            y,
+            _cell(system, x),
+            _cell(system, y),
+        )
+
+    def _edge_row(self, edge: Edge) -> tuple:
+        return (
+            edge.uuid,
+            edge.name,
+            edge.node_a.uuid,
+            edge.node_b.uuid,
+            edge.length,
+            edge.maximum_speed,
+            _uuid(edge.vacancy_section),
+        )
+
+    def _signal_row(self, signal: Signal) -> tuple:
+        position = signal.edge.signals.index(signal) if signal in signal.edge.signals else 0
+        return (
+            signal.uuid,
+            signal.name,
+            signal.edge.uuid,
+            position,
+            signal.distance_edge,
+            str(signal.direction),
+            signal.side_distance,
+            _enum_name(signal.function),
+            _enum_name(signal.kind),
+            _enum_name(signal.system),
+            signal.classification_number,
+            signal.control_member_uuid,
+            json.dumps(sorted(_enum_name(state) for state in signal.supported_states)),
+            json.dumps([_additional_signal_row(item) for item in signal.additional_signals]),
+        )
+
+    def _route_row(self, route: Route) -> tuple:
+        return (
+            route.uuid,
+            route.name,
+            _uuid(route.start_signal),
+            _uuid(route.end_signal),
+            route.maximum_speed,
+            json.dumps([edge.uuid for edge in route.edges if edge is not None]),
+            json.dumps(
+                [
+                    vacancy_section.uuid
+                    for vacancy_section in route.vacancy_sections
+                    if vacancy_section is not None
+                ]
+            ),
+        )
+
+    def write(self, kind: str, elements: Iterable[BaseElement]):
+        """Inserts or replaces the rows of the elements of a kind (see ELEMENT_KINDS)."""
+
+        elements = list(elements)
+        execute_many = self.connection.executemany
+        if kind == "nodes":
+            execute_many(
+                f"INSERT OR REPLACE INTO nodes VALUES ({', '.join('?' * 16)})",
+                (self._node_row(node) for node in elements),
+            )
+        elif kind == "edges":
+            execute_many(
+                "INSERT OR REPLACE INTO edges VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self._edge_row(edge) for edge in elements),
+            )
+            self.delete("geo_points", "edge", [edge.uuid for edge in elements])
+            execute_many(
+                "INSERT INTO geo_points VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (geo_uuid, geo_name, edge.uuid, position, system, x, y)
+                    for edge in elements
+                    for position, geo_node in enumerate(edge.intermediate_geo_nodes)
+                    for geo_uuid, geo_name, system, x, y in (_geo(geo_node),)
+                ),
+            )
+        elif kind == "signals":
+            execute_many(
+                f"INSERT OR REPLACE INTO signals VALUES ({', '.join('?' * 14)})",
+                (self._signal_row(signal) for signal in elements),
+            )
+        elif kind == "routes":
+            execute_many(
+                "INSERT OR REPLACE INTO routes VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self._route_row(route) for route in elements),
+            )
+        elif kind == "vacancy_sections":
+            execute_many(
+                "INSERT OR REPLACE INTO vacancy_sections VALUES (?, ?)",
+                ((vacancy_section.uuid, vacancy_section.name) for vacancy_section in elements),
+            )
+        else:
+            raise ValueError(f"Unknown element kind {kind!r}")
+
+    def delete(self, table: str, column: str, values: Iterable[str]):
+        for chunk in _chunks(list(values)):
+            placeholders = ", ".join("?" * len(chunk))
+            self.connection.execute(
+                f"DELETE FROM {table} WHERE {column} IN ({placeholders})", chunk
+            )
+
+
+class StoredTopology(Topology):
+    """A Topology that loads its elements on demand from a TopologyStore.
+
+    The dictionaries of the Topology (nodes, edges, ...) contain the loaded elements only.
+    The weak ownership layout (see yaramo.ownership) is not supported.
+    """
+
+    def __init__(self, store: TopologyStore, **kwargs):
+        if ownership.is_enabled():
+            raise RuntimeError("StoredTopology does not support the weak ownership layout")
+        super().__init__(**kwargs)
+        self.store = store
+        self._placeholders: dict[str, StoredNode] = {}
+        # The digests of the loaded (or committed) elements, to find the modified ones
+        self._stored_digests: dict[str, dict[str, bytes]] = {kind: {} for kind in ELEMENT_KINDS}
+
+    def _node(self, uuid: Optional[str]) -> Optional[Node]:
+        """Returns the loaded Node or a placeholder for it."""
+
+        if uuid is None:
+            return None
+        node = self.nodes.get(uuid) or self._placeholders.get(uuid)
+        if node is None:
+            node = StoredNode.__new__(StoredNode)
+            node.__dict__.update(uuid=uuid, _stored_topology=self)
+            self._placeholders[uuid] = node
+        return node
+
+    def _fault_nodes(self, uuids: Iterable[str]):
+        """Loads the Nodes (the loaded ones are skipped)."""
+
+        uuids = [uuid for uuid in uuids if uuid not in self.nodes]
+        for row in self.store.select("nodes", "uuid", uuids):
+            node = self._node(row["uuid"])
+            del node.__dict__["_stored_topology"]
+            Node.__init__(
+                node,
+                uuid=row["uuid"],
+                name=row["name"],
+                turnout_side=row["turnout_side"],
+                geo_node=_geo_node(
+                    row["geo_uuid"], row["geo_name"], row["system"], row["x"], row["y"]
+                ),
+            )
+            node.connected_nodes = [
+                self._node(other) for other in json.loads(row["connected_nodes"])
+            ]
+            node.connected_on_head = self._node(row["connected_on_head"])
+            node.connected_on_left = self._node(row["connected_on_left"])
+            node.connected_on_right = self._node(row["connected_on_right"])
+            node.maximum_speed_on_left = row["maximum_speed_on_left"]
+            node.maximum_speed_on_right = row["maximum_speed_on_right"]
+            del self._placeholders[node.uuid]
+            self.add_node(node)
+            self._stored_digests["nodes"][node.uuid] = element_digest(node)
+
+    def _vacancy_sections(self, uuids: Iterable[str]):
+        uuids = {uuid for uuid in uuids if uuid is not None and uuid not in self.vacancy_sections}
+        for row in self.store.select("vacancy_sections", "uuid", uuids):
+            vacancy_section = VacancySection(uuid=row["uuid"], name=row["name"])
+            self.add_vacancy_section(vacancy_section)
+            self._stored_digests["vacancy_sections"][row["uuid"]] = element_digest(vacancy_section)
+
+    def _load_edge_rows(self, rows: list) -> list[Edge]:
+        rows = [row for row in rows if row["uuid"] not in self.edges]
+        uuids = [row["uuid"] for row in rows]
+        self._vacancy_sections(row["vacancy_section"] for row in rows)
+        geo_nodes: dict[str, list[GeoNode]] = {}
+        for row in self.store.select("geo_points", "edge", uuids, order="ORDER BY edge, position"):
+            geo_nodes.setdefault(row["edge"], []).append(
+                _geo_node(row["uuid"], row["name"], row["system"], row["x"], row["y"])
+            )
+
+        edges = []
+        for row in rows:
+            edge = Edge(
+                self._node(row["node_a"]),
+                self._node(row["node_b"]),
+                vacancy_section=self.vacancy_sections.get(row["vacancy_section"]),
+                length=row["length"],
+                intermediate_geo_nodes=geo_nodes.get(row["uuid"], []),
+                maximum_speed=row["maximum_speed"],
+                uuid=row["uuid"],
+                name=row["name"],
+            )
+            self.add_edge(edge)
+            edges.append(edge)
+
+        for row in self.store.select("signals", "edge", uuids, order="ORDER BY edge, position"):
+            edge = self.edges[row["edge"]]
+            signal = Signal(
+                edge,
+                row["distance_edge"],
+                row["direction"],
+                row["function"],
+                row["kind"],
+                system=row["system"],
+                supported_states={
+                    SignalState[state] for state in json.loads(row["supported_states"])
+                },
+                classification_number=row["classification_number"],
+                uuid=row["uuid"],
+                name=row["name"],
+            )
+            # The constructor negates the side_distance of opposing Signals
+            signal.side_distance = row["side_distance"]
+            signal.control_member_uuid = row["control_member_uuid"]
+            signal.additional_signals = [
+                _additional_signal(item) for item in json.loads(row["additional_signals"])
+            ]
+            edge.signals.append(signal)
+            self.add_signal(signal)
+            self._stored_digests["signals"][signal.uuid] = element_digest(signal)
+
+        for edge in edges:
+            self._stored_digests["edges"][edge.uuid] = element_digest(edge)
+        return edges
+
+    def edges_of(self, nodes: Iterable[Node]) -> list[Edge]:
+        """Loads and returns all Edges connected to the Nodes."""
+
+        uuids = {node.uuid for node in nodes}
+        rows = {}
+        for column in ("node_a", "node_b"):
+            for row in self.store.select("edges", column, uuids):
+                rows[row["uuid"]] = row
+        self._load_edge_rows(list(rows.values()))
+        return [self.edges[uuid] for uuid in rows if uuid in self.edges]
+
+    def get_edge_by_nodes(self, node_a: Node, node_b: Node):
+        edge = super().get_edge_by_nodes(node_a, node_b)
+        if edge is None:
+            for candidate in self.edges_of([node_a]):
+                if candidate.is_node_connected(node_b):
+                    return candidate
+        return edge
+
+    def load_bbox(
+        self, min_x: float, min_y: float, max_x: float, max_y: float, coordinate_system="wgs84"
+    ) -> list[Node]:
+        """Loads the Nodes within the bounding box (in the coordinates of their GeoPoints, x is
+        the latitude for WGS84) and the Edges connected to them. Returns the Nodes."""
+
+        rows = self.store.connection.execute(
+            "SELECT uuid FROM nodes WHERE system = ? AND cell_x BETWEEN ? AND ? "
+            "AND cell_y BETWEEN ? AND ? AND x BETWEEN ? AND ? AND y BETWEEN ? AND ?",
+            (
+                coordinate_system,
+                _cell(coordinate_system, min_x),
+                _cell(coordinate_system, max_x),
+                _cell(coordinate_system, min_y),
+                _cell(coordinate_system, max_y),
+                min_x,
+                max_x,
+                min_y,
+                max_y,
+            ),
+        )
+        uuids = [row["uuid"] for row in rows]
+        self._fault_nodes(uuids)
+        nodes = [self.nodes[uuid] for uuid in uuids]
+        self.edges_of(nodes)
+        return nodes
+
+    def load_neighbourhood(self, node: Node, depth: int = 1) -> list[Node]:
+        """Loads the Nodes reachable from node over at most depth Edges, and the Edges connected
+        to them. Returns the Nodes."""
+
+        reached = {node.uuid}
+        frontier = [node]
+        for _ in range(depth):
+            next_frontier = []
+            for edge in self.edges_of(frontier):
+                for other in (edge.node_a, edge.node_b):
+                    if other.uuid not in reached:
+                        reached.add(other.uuid)
+                        next_frontier.append(other)
+            frontier = next_frontier
+        self._fault_nodes(reached)
+        self.edges_of(frontier)
+        return [self.nodes[uuid] for uuid in reached if uuid in self.nodes]
+
+    def load_routes(self, signals: Optional[Iterable[Signal]] = None) -> list[Route]:
+        """Loads the Routes starting at the Signals (default is all loaded Signals), with their
+        Edges. Returns the Routes."""
+
+        if signals is None:
+            signals = list(self.signals.values())
+        rows = self.store.select("routes", "start_signal", [signal.uuid for signal in signals])
+        return self._load_route_rows(rows)
+
+    def _load_route_rows(self, rows: list) -> list[Route]:
+        rows = [row for row in rows if row["uuid"] not in self.routes]
+        edge_uuids = set()
+        signal_uuids = set()
+        for row in rows:
+            edge_uuids.update(json.loads(row["edges"]))
+            signal_uuids.update(uuid for uuid in (row["start_signal"], row["end_signal"]) if uuid)
+        for row in self.store.select("signals", "uuid", signal_uuids - set(self.signals)):
+            edge_uuids.add(row["edge"])
+        self._load_edge_rows(self.store.select("edges", "uuid", edge_uuids - set(self.edges)))
+        self._vacancy_sections(uuid for row in rows for uuid in json.loads(row["vacancy_sections"]))
+
+        routes = []
+        for row in rows:
+            route = Route(
+                self.signals[row["start_signal"]],
+                maximum_speed=row["maximum_speed"],
+                uuid=row["uuid"],
+                name=row["name"],
+            )
+            route.end_signal = self.signals.get(row["end_signal"])
+            route.edges = {self.edges[uuid] for uuid in json.loads(row["edges"])}
+            route.vacancy_sections = {
+                self.vacancy_sections[uuid] for uuid in json.loads(row["vacancy_sections"])
+            }
+            self.add_route(route)
+            self._stored_digests["routes"][route.uuid] = element_digest(route)
+            routes.append(route)
+        return routes
+
+    def load(self, uuid: str) -> Optional[BaseElement]:
+        """Loads the Node, Edge, Signal, Route or VacancySection with the uuid (and the elements
+        it needs) or returns None if there is none."""
+
+        for kind in ELEMENT_KINDS:
+            if uuid in getattr(self, kind):
+                return getattr(self, kind)[uuid]
+        connection = self.store.connection
+        if connection.execute("SELECT 1 FROM nodes WHERE uuid = ?", (uuid,)).fetchone():
+            self._fault_nodes([uuid])
+            return self.nodes[uuid]
+        rows = self.store.select("edges", "uuid", [uuid])
+        if rows:
+            return self._load_edge_rows(rows)[0]
+        row = connection.execute("SELECT edge FROM signals WHERE uuid = ?", (uuid,)).fetchone()
+        if row:
+            self._load_edge_rows(self.store.select("edges", "uuid", [row["edge"]]))
+            return self.signals[uuid]
+        rows = self.store.select("routes", "uuid", [uuid])
+        if rows:
+            return self._load_route_rows(rows)[0]
+        self._vacancy_sections([uuid])
+        return self.vacancy_sections.get(uuid)
+
+    def load_all(self):
+        """Loads all elements of the store."""
+
+        connection = self.store.connection
+        self._fault_nodes(row["uuid"] for row in connection.execute("SELECT uuid FROM nodes"))
+        self._vacancy_sections(
+            row["uuid"] for row in connection.execute("SELECT uuid FROM vacancy_sections")
+        )
+        self._load_edge_rows(list(connection.execute("SELECT * FROM edges")))
+        self._load_route_rows(list(connection.execute("SELECT * FROM routes")))
+
+    def commit(self) -> dict[str, int]:
+        """Writes the added and modified elements to the store and deletes the removed ones.
+
+        Returns the number of written and deleted elements by kind.
+        """
+
+        changes = {}
+        with self.store.connection:
+            for kind in ELEMENT_KINDS:
+                elements = getattr(self, kind)
+                stored = self._stored_digests[kind]
+                modified = {}
+                for uuid, element in elements.items():
+                    digest = element_digest(element)
+                    if stored.get(uuid) != digest:
+                        modified[uuid] = digest
+                removed = [uuid for uuid in stored if uuid not in elements]
+                self.store.write(kind, (elements[uuid] for uuid in modified))
+                self.store.delete(kind, "uuid", removed)
+                if kind == "edges":
+                    self.store.delete("geo_points", "edge", removed)
+                for uuid in removed:
+                    del stored[uuid]
+                stored.update(modified)
+                changes[kind] = len(modified) + len(removed)
+        return changes
@@ -0,0 +1,361 @@
+"""Conflicts between the section occupations of scheduled Trips.
+
+A Trip is scheduled with an (entry, exit) time per Edge, in the order of trip.edges. It claims
+the VacancySection of every Edge (an Edge without a VacancySection is a section of its own) and,
+if the Topology is known, every Route containing the Edge, for the time it is on these Edges.
+Claims of a Trip that follow each other without a gap are merged. Two claims of different Trips
+on the same section or Route conflict if their time windows overlap. The windows are half-open,
+so a Trip may enter a section at the time the previous one left it.
+
+The claims on every section and Route are kept in an IntervalTree, so adding a Trip to a
+ConflictDetector finds its conflicts in about O(log n) per claim instead of comparing it with all
+other Trips, which makes the detector usable for interactive timetable editing:
+
+    detector = topology.conflict_detector()
+    conflicts = detector.add_trip(trip, [(0.0, 60.0), (60.0, 95.0)])
+
+The sections are independent of each other, detect_conflicts therefore distributes the claims
+of a whole timetable over shards of sections, which run in an Executor (e.g. a
+ProcessPoolExecutor) if one is given.
+"""
+
+import heapq
+import random
+import zlib
+from concurrent.futures import Executor
+from typing import Iterable, Iterator, Optional, Sequence
+
+from yaramo.edge import Edge
+from yaramo.trip import Trip
+
+# The kinds of claimed resources, the first element of a claim key
+SECTION = "section"
+EDGE = "edge"
+ROUTE = "route"
+
+
+class Claim(object):
+    """The occupation of a section (or Route) by a Trip from entry until exit.
+
+    Parameters
+    ----------
+    trip: str
+        The uuid of the Trip
+    key: tuple[str, str]
+        The claimed resource: (SECTION, uuid of the VacancySection), (EDGE, uuid of an Edge
+        without VacancySection) or (ROUTE, uuid of the Route)
+    """
+
+    def __init__(self, trip: str, key: tuple[str, str], entry: float, exit: float):
+        self.trip = trip
+        self.key = key
+        self.entry = entry
+        self.exit = exit
+
+    def overlaps(self, entry: float, exit: float) -> bool:
+        return self.entry < exit and entry < self.exit
+
+    def __repr__(self):
+        return f"Claim({self.trip}, {self.key}, {self.entry}, {self.exit})"
+
+
+class Conflict(object):
+    """Two overlapping claims of different Trips on the same section or Route."""
+
+    def __init__(self, first: Claim, second: Claim):
+        self.first = first
+        self.second = second
+
+    @property
+    def key(self) -> tuple[str, str]:
+        return self.first.key
+
+    @property
+    def trips(self) -> tuple[str, str]:
+        return self.first.trip, self.second.trip
+
+    @property
+    def start(self) -> float:
+        return max(self.first.entry, self.second.entry)
+
+    @property
+    def end(self) -> float:
+        return min(self.first.exit, self.second.exit)
+
+    def __repr__(self):
+        return f"Conflict({self.key}, {self.trips}, {self.start}, {self.end})"
+
+
+def section_key(edge: Edge) -> tuple[str, str]:
+    if edge.vacancy_section is not None:
+        return SECTION, edge.vacancy_section.uuid
+    return EDGE, edge.uuid
+
+
+def trip_claims(
+    trip: Trip, times: Sequence[tuple[float, float]], topology: Optional["Topology"] = None
+) -> list[Claim]:
+    """Returns the claims of a Trip with an (entry, exit) time per Edge of trip.edges. With a
+    Topology, the Trip also claims the Routes containing its Edges."""
+
+    if len(times) != len(trip.edges):
+        raise ValueError(f"Trip {trip.uuid} has {len(trip.edges)} Edges, but {len(times)} times")
+    references = topology.edge_references if topology is not None else None
+    windows: dict[tuple[str, str], list[tuple[float, float]]] = {}
+    for edge, (entry, exit) in zip(trip.edges, times):
+        if exit < entry:
+            raise ValueError(f"Trip {trip.uuid} leaves Edge {edge.uuid} before entering it")
+        windows.setdefault(section_key(edge), []).append((entry, exit))
+        if references is not None:
+            for route_uuid in references.routes(edge.uuid):
+                windows.setdefault((ROUTE, route_uuid), []).append((entry, exit))
+
+    claims = []
+    for key, key_windows in windows.items():
+        key_windows.sort()
+        entry, exit = key_windows[0]
+        for next_entry, next_exit in key_windows[1:]:
+            if next_entry > exit:
+                claims.append(Claim(trip.uuid, key, entry, exit))
+                entry = next_entry
+            exit = max(exit, next_exit)
+        claims.append(Claim(trip.uuid, key, entry, exit))
+    return claims
+
+
+class _TreeNode(object):
+    __slots__ = ("claim", "order", "priority", "left", "right", "max_exit")
+
+    def __init__(self, claim: Claim, order: tuple, priority: float):
+        self.claim = claim
+        self.order = order
+        self.priority = priority
+        self.left: Optional[_TreeNode] = None
+        self.right: Optional[_TreeNode] = None
+        self.max_exit = claim.exit
+
+    def update(self):
+        max_exit = self.claim.exit
+        if self.left is not None and self.left.max_exit > max_exit:
+            max_exit = self.left.max_exit
+        if self.right is not None and self.right.max_exit > max_exit:
+            max_exit = self.right.max_exit
+        self.max_exit = max_exit
+
+
+def _order(claim: Claim) -> tuple:
+    return claim.entry, claim.exit, claim.trip
+
+
+def _split(node: Optional[_TreeNode], order: tuple, inclusive: bool):
+    """Splits a treap into the nodes before order (or up to order, if inclusive) and the rest."""
+
+    if node is None:
+        return None, None
+    if node.order < order or (inclusive and node.order == order):
+        node.right, right = _split(node.right, order, inclusive)
+        node.update()
+        return node, right
+    left, node.left = _split(node.left, order, inclusive)
+    node.update()
+    return left, node
+
+
+def _merge(left: Optional[_TreeNode], right: Optional[_TreeNode]) -> Optional[_TreeNode]:
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        left.update()
+        return left
+    right.left = _merge(left, right.left)
+    right.update()
+    return right
+
+
+class IntervalTree(object):
+    """The claims on one section: a treap ordered by entry time, whose nodes know the latest
+    exit time in their subtree, so that overlapping claims are found without visiting the
+    subtrees ending before a time window."""
+
+    def __init__(self, claims: Iterable[Claim] = ()):
+        self._root: Optional[_TreeNode] = None
+        self._size = 0
+        for claim in claims:
+            self.add(claim)
+
+    def add(self, claim: Claim):
+        order = _order(claim)
+        left, right = _split(self._root, order, inclusive=False)
+        middle, right = _split(right, order, inclusive=True)
+        if middle is None:
+            self._size += 1
+        middle = _TreeNode(claim, order, random.random())
+        self._root = _merge(_merge(left, middle), right)
+
+    def remove(self, claim: Claim):
+        order = _order(claim)
+        left, right = _split(self._root, order, inclusive=False)
+        middle, right = _split(right, order, inclusive=True)
+        if middle is not None:
+            self._size -= 1
+        self._root = _merge(left, right)
+
+    def overlapping(self, entry: float, exit: float) -> list[Claim]:
+        """Returns the claims overlapping the time window from entry until exit."""
+
+        result = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None or node.max_exit <= entry:
+                continue
+            stack.append(node.left)
+            if node.claim.entry < exit:
+                if node.claim.exit > entry:
+                    result.append(node.claim)
+                stack.append(node.right)
+        return result
+
+    def __iter__(self) -> Iterator[Claim]:
+        """The claims ordered by their entry time."""
+
+        stack, node = [], self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.claim
+            node = node.right
+
+    def __len__(self):
+        return self._size
+
+
+def _sweep(claims: Iterable[Claim]) -> list[Conflict]:
+    """Returns the conflicts among claims on the same section ordered by entry time."""
+
+    conflicts = []
+    active: list[tuple[float, int, Claim]] = []
+    for index, claim in enumerate(claims):
+        while active and active[0][0] <= claim.entry:
+            heapq.heappop(active)
+        conflicts.extend(
+            Conflict(other, claim)
+            for _, _, other in active
+            if other.trip != claim.trip and other.overlaps(claim.entry, claim.exit)
+        )
+        heapq.heappush(active, (claim.exit, index, claim))
+    return conflicts
+
+
+class ConflictDetector(object):
+    """The claims of scheduled Trips, indexed per section and Route (see yaramo.timetable).
+
+    Parameters
+    ----------
+    topology: Topology
+        If given, the Trips also claim the Routes containing their Edges
+    """
+
+    def __init__(self, topology: Optional["Topology"] = None):
+        self.topology = topology
+        self._trees: dict[tuple[str, str], IntervalTree] = {}
+        self._claims: dict[str, list[Claim]] = {}
+
+    def add_trip(self, trip: Trip, times: Sequence[tuple[float, float]]) -> list[Conflict]:
+        """Adds (or reschedules) a Trip with an (entry, exit) time per Edge and returns its
+        conflicts with the Trips added before."""
+
+        if trip.uuid in self._claims:
+            self.remove_trip(trip)
+        claims = trip_claims(trip, times, self.topology)
+        conflicts = []
+        for claim in claims:
+            tree = self._trees.get(claim.key)
+            if tree is None:
+                tree = self._trees[claim.key] = IntervalTree()
+            conflicts.extend(
+                Conflict(other, claim)
+                for other in tree.overlapping(claim.entry, claim.exit)
+                if other.trip != claim.trip
+            )
+            tree.add(claim)
+        self._claims[trip.uuid] = claims
+        return conflicts
+
+    def remove_trip(self, trip: Trip):
+        for claim in self._claims.pop(trip.uuid, ()):
+            tree = self._trees[claim.key]
+            tree.remove(claim)
+            if not tree:
+                del self._trees[claim.key]
+
+    def claims(self, key: tuple[str, str]) -> list[Claim]:
+        """Returns the claims on a section or Route ordered by entry time."""
+        tree = self._trees.get(key)
+        return list(tree) if tree is not None else []
+
+    def trip_conflicts(self, trip: Trip) -> list[Conflict]:
+        """Returns the conflicts of an added Trip with all other added Trips."""
+        return [
+            Conflict(other, claim)
+            for claim in self._claims.get(trip.uuid, ())
+            for other in self._trees[claim.key].overlapping(claim.entry, claim.exit)
+            if other.trip != claim.trip
+        ]
+
+    def conflicts(self) -> list[Conflict]:
+        """Returns all conflicts among the added Trips."""
+        return [conflict for tree in self._trees.values() for conflict in _sweep(tree)]
+
+    def __len__(self):
+        return len(self._claims)
+
+
+def _shard_conflicts(claims: list[Claim]) -> list[Conflict]:
+    claims.sort(key=lambda claim: (claim.key, claim.entry))
+    conflicts = []
+    start = 0
+    for index in range(1, len(claims) + 1):
+        if index == len(claims) or claims[index].key != claims[start].key:
+            conflicts.extend(_sweep(claims[start:index]))
+            start = index
+    return conflicts
+
+
+def detect_conflicts(
+    schedule: Iterable[tuple[Trip, Sequence[tuple[float, float]]]],
+    topology: Optional["Topology"] = None,
+    executor: Optional[Executor] = None,
+    shards: Optional[int] = None,
+) -> list[Conflict]:
+    """Returns all conflicts among the (Trip, times) of a timetable.
+
+    Parameters
+    ----------
+    topology: Topology
+        If given, the Trips also claim the Routes containing their Edges
+    executor: Executor
+        Runs the shards, e.g. a ProcessPoolExecutor (default is to run them in this thread)
+    shards: int
+        The number of shards the sections are distributed over (default is the number of
+        workers of the executor, or 1)
+    """
+
+    if shards is None:
+        shards = getattr(executor, "_max_workers", 1) if executor is not None else 1
+    shard_claims: list[list[Claim]] = [[] for _ in range(max(shards, 1))]
+    for trip, times in schedule:
+        for claim in trip_claims(trip, times, topology):
+            shard = zlib.crc32(claim.key[1].encode()) % len(shard_claims)
+            shard_claims[shard].append(claim)
+    shard_claims = [claims for claims in shard_claims if claims]
+    if executor is None:
+        results = map(_shard_conflicts, shard_claims)
+    else:
+        results = executor.map(_shard_conflicts, shard_claims)
+    return [conflict for conflicts in results for conflict in conflicts]
@@ -1,13 +1,24 @@
+import math
+import os
 from datetime import datetime
+from typing import Optional, TextIO
 
 import simplejson as json
 
 from yaramo.base_element import BaseElement
+from yaramo.concurrency import ReadWriteLock, build_lock
+from yaramo.connectivity import ConnectivityIndex
 from yaramo.edge import Edge
+from yaramo.edge_references import EdgeReferences
 from yaramo.geo_node import Wgs84GeoNode
+from yaramo.instrumentation import instrumented
+from yaramo.lookahead import LookaheadTable
 from yaramo.node import Node
 from yaramo.route import Route
 from yaramo.signal import Signal
+from yaramo.signal_distances import SignalDistanceTable
+from yaramo.signal_index import SignalIndex, SignalQuery
+from yaramo.trip import Trip
 from yaramo.vacancy_section import VacancySection
 
 
@@ -15,6 +26,7 @@ class Topology(BaseElement):
     """The Topology is a collection of all track elements comprising that topology.
 
     Elements like Signals, Nodes, Edges, Routes and Vacancy Sections can be accessed by their uuid in their respective dictionary.
+    Trips can be registered as well, so that edits of the track network keep them consistent.
     """
 
     def __init__(self, **kwargs):
@@ -24,25 +36,262 @@ class Topology(BaseElement):
         self.signals: dict[str, Signal] = {}
         self.routes: dict[str, Route] = {}
         self.vacancy_sections: dict[str, VacancySection] = {}
+        self.trips: dict[str, Trip] = {}
 
         self.created_at: datetime = datetime.now()
         self.created_with: str = "unknown"
 
+        self._signal_index: Optional[SignalIndex] = None
+        self._edge_references: Optional[EdgeReferences] = None
+        self._connectivity: Optional[ConnectivityIndex] = None
+        self._signal_distances: Optional[SignalDistanceTable] = None
+        self._lookahead: Optional[LookaheadTable] = None
+        self._batch: Optional["Batch"] = None
+        self._lock: Optional[ReadWriteLock] = None
+
+    @property
+    def lock(self) -> ReadWriteLock:
+        """The reader/writer lock for the concurrent use of the Topology from several threads,
+        see yaramo.concurrency."""
+        if self._lock is None:
+            with build_lock:
+                if self._lock is None:
+                    self._lock = ReadWriteLock()
+        return self._lock
+
+    def prepare_concurrent_reads(self):
+        """Sets the turnout connections that can be determined from the geo locations and builds
+        all derived structures, so that concurrent readers do not have to build them."""
+
+        with self.lock.write():
+            for node in self.nodes.values():
+                if len(node.connected_nodes) == 3 and node.connected_on_head is None:
+                    connections = node.turnout_connections()
+                    if connections is not None:
+                        head, left, right = connections
+                        node.connected_on_head = head
+                        node.connected_on_left = left
+                        node.connected_on_right = right
+            self.signal_index
+            self.edge_references
+            self.connectivity.prepare()
+            self.signal_distances.refresh()
+            self.lookahead.refresh()
+
+    def _defer(self, dictionary: str, element: BaseElement, operation: str) -> bool:
+        """Records the operation in the active batch, whose commit announces it to the derived
+        indexes (returns False without a batch)."""
+        if self._batch is None:
+            return False
+        self._batch.record(dictionary, element, operation)
+        return True
+
     def add_node(self, node: Node):
+        deferred = self._defer("nodes", node, "add")
         self.nodes[node.uuid] = node
+        if not deferred and self._connectivity is not None:
+            self._connectivity.add_node(node)
+
+    def remove_node(self, node: Node):
+        deferred = self._defer("nodes", node, "remove")
+        self.nodes.pop(node.uuid, None)
+        if not deferred and self._connectivity is not None:
+            self._connectivity.remove_node(node)
+
+    def update_node(self, node: Node):
+        """Updates the connectivity, the signal_distances and the lookahead after the
+        connections on head, left and right or the speeds of an added Node have changed (in a
+        batch, the lengths of its Edges and the speeds of the Routes over it are recomputed as
+        well)."""
+        if self._defer("nodes", node, "update"):
+            return
+        if self._connectivity is not None:
+            self._connectivity.update_node(node)
+        if self._signal_distances is not None:
+            self._signal_distances.update_node(node)
+        if self._lookahead is not None:
+            self._lookahead.update_node(node)
 
     def add_edge(self, edge: Edge):
+        deferred = self._defer("edges", edge, "add")
         self.edges[edge.uuid] = edge
+        if deferred:
+            return
+        if self._connectivity is not None:
+            self._connectivity.add_edge(edge)
+        if self._signal_distances is not None:
+            self._signal_distances.add_edge(edge)
+        if self._lookahead is not None:
+            self._lookahead.add_edge(edge)
+
+    def remove_edge(self, edge: Edge):
+        deferred = self._defer("edges", edge, "remove")
+        self.edges.pop(edge.uuid, None)
+        if deferred:
+            return
+        if self._connectivity is not None:
+            self._connectivity.remove_edge(edge)
+        if self._signal_distances is not None:
+            self._signal_distances.remove_edge(edge)
+        if self._lookahead is not None:
+            self._lookahead.remove_edge(edge)
+
+    def update_edge(self, edge: Edge):
+        """Updates the signal_distances and the lookahead after the length, the maximum_speed,
+        the vacancy_section or the Signals of an added Edge have changed."""
+        if self._defer("edges", edge, "update"):
+            return
+        if self._signal_distances is not None:
+            self._signal_distances.update_edge(edge)
+        if self._lookahead is not None:
+            self._lookahead.update_edge(edge)
+
+    @property
+    def connectivity(self) -> ConnectivityIndex:
+        """The connected components, articulation points and directional reachability of the
+        track network, built on first access and afterwards kept in sync by the add_ and remove_
+        methods of Nodes and Edges (see yaramo.connectivity)."""
+        if self._connectivity is None:
+            with build_lock:
+                if self._connectivity is None:
+                    self._connectivity = ConnectivityIndex(self.nodes.values(), self.edges.values())
+        return self._connectivity
 
     def add_signal(self, signal: Signal):
+        deferred = self._defer("signals", signal, "add")
         self.signals[signal.uuid] = signal
+        if deferred:
+            return
+        if self._signal_index is not None:
+            self._signal_index.add(signal)
+        if self._signal_distances is not None:
+            self._signal_distances.add_signal(signal)
+        if self._lookahead is not None:
+            self._lookahead.add_signal(signal)
+
+    def remove_signal(self, signal: Signal):
+        deferred = self._defer("signals", signal, "remove")
+        self.signals.pop(signal.uuid, None)
+        if deferred:
+            return
+        if self._signal_index is not None:
+            self._signal_index.remove(signal)
+        if self._signal_distances is not None:
+            self._signal_distances.remove_signal(signal)
+        if self._lookahead is not None:
+            self._lookahead.remove_signal(signal)
+
+    def update_signal(self, signal: Signal):
+        """Updates the signal_index, signal_distances and lookahead after the function, kind,
+        system, direction, supported_states, additional_signals, edge or distance_edge of an
+        added Signal have changed."""
+        if self._defer("signals", signal, "update"):
+            return
+        if self._signal_index is not None:
+            self._signal_index.update(signal)
+        if self._signal_distances is not None:
+            self._signal_distances.update_signal(signal)
+        if self._lookahead is not None:
+            self._lookahead.update_signal(signal)
+
+    @property
+    def signal_index(self) -> SignalIndex:
+        """The secondary indexes of the Signals, built on first access and afterwards kept in sync
+        by add_signal, remove_signal and update_signal."""
+        if self._signal_index is None:
+            with build_lock:
+                if self._signal_index is None:
+                    self._signal_index = SignalIndex(self.signals.values())
+        return self._signal_index
+
+    @property
+    def signal_distances(self) -> SignalDistanceTable:
+        """The along-track distances between Signals (up to 5000 m), built on first access and
+        afterwards invalidated by the add_, remove_ and update_ methods of Edges and Signals."""
+        if self._signal_distances is None:
+            with build_lock:
+                if self._signal_distances is None:
+                    self._signal_distances = SignalDistanceTable(self)
+        return self._signal_distances
+
+    @property
+    def lookahead(self) -> LookaheadTable:
+        """The Signals, speed restrictions and VacancySections ahead of running trains, compiled
+        per Edge on first access and afterwards invalidated by the add_, remove_ and update_
+        methods of Nodes, Edges and Signals (see yaramo.lookahead)."""
+        if self._lookahead is None:
+            with build_lock:
+                if self._lookahead is None:
+                    self._lookahead = LookaheadTable(self)
+        return self._lookahead
+
+    def query_signals(self) -> SignalQuery:
+        """Returns a query on all Signals, see SignalQuery for the available filters."""
+        return SignalQuery(self)
 
     def add_route(self, route: Route):
+        deferred = self._defer("routes", route, "add")
         self.routes[route.uuid] = route
+        if not deferred and self._edge_references is not None:
+            self._edge_references.add_route(route)
+
+    def remove_route(self, route: Route):
+        deferred = self._defer("routes", route, "remove")
+        self.routes.pop(route.uuid, None)
+        if not deferred and self._edge_references is not None:
+            self._edge_references.remove_route(route)
+
+    def update_route(self, route: Route):
+        """Updates the edge_references after the edges of an added Route have changed."""
+        if not self._defer("routes", route, "update") and self._edge_references is not None:
+            self._edge_references.update_route(route)
+
+    def add_trip(self, trip: Trip):
+        deferred = self._defer("trips", trip, "add")
+        self.trips[trip.uuid] = trip
+        if not deferred and self._edge_references is not None:
+            self._edge_references.add_trip(trip)
+
+    def remove_trip(self, trip: Trip):
+        deferred = self._defer("trips", trip, "remove")
+        self.trips.pop(trip.uuid, None)
+        if not deferred and self._edge_references is not None:
+            self._edge_references.remove_trip(trip)
+
+    def update_trip(self, trip: Trip):
+        """Updates the edge_references after the edges of an added Trip have changed."""
+        if not self._defer("trips", trip, "update") and self._edge_references is not None:
+            self._edge_references.update_trip(trip)
+
+    @property
+    def edge_references(self) -> EdgeReferences:
+        """The reverse indexes from Edges to Routes and Trips, built on first access and
+        afterwards kept in sync by the add_, remove_ and update_ methods of Routes and Trips."""
+        if self._edge_references is None:
+            with build_lock:
+                if self._edge_references is None:
+                    self._edge_references = EdgeReferences(
+                        self.routes.values(), self.trips.values()
+                    )
+        return self._edge_references
 
     def add_vacancy_section(self, vacancy_section: VacancySection):
+        self._defer("vacancy_sections", vacancy_section, "add")
         self.vacancy_sections[vacancy_section.uuid] = vacancy_section
 
+    def batch(self, update_lengths: bool = True, update_speeds: bool = True) -> "Batch":
+        """Returns a transaction for many edits, to be used as `with topology.batch():`.
+
+        The derived indexes are updated once at the end of the batch, which also recomputes the
+        lengths of changed Edges and the maximum speeds of affected Routes. If the block raises
+        an exception, all changes are rolled back, see yaramo.batch.
+        """
+
+        from yaramo.batch import Batch
+
+        return Batch(self, update_lengths=update_lengths, update_speeds=update_speeds)
+
+    @instrumented
     def get_edge_by_nodes(self, node_a: Node, node_b: Node):
         for edge_uuid in self.edges:
             edge = self.edges[edge_uuid]
@@ -55,6 +304,166 @@ class Topology(BaseElement):
                 return edge
         return None
 
+    def split_edge(
+        self, edge: Edge, offset: float, node: Optional[Node] = None
+    ) -> tuple[Node, Edge, Edge]:
+        """Splits an Edge at offset (from node_a) by inserting a Node, see
+        yaramo.editing.split_edge. Returns the Node and the two new Edges."""
+
+        from yaramo.editing import split_edge
+
+        return split_edge(self, edge, offset, node=node)
+
+    def merge_edges(self, first: Edge, second: Edge) -> Edge:
+        """Merges two Edges at a shared Node with two neighbours into one Edge, see
+        yaramo.editing.merge_edges."""
+
+        from yaramo.editing import merge_edges
+
+        return merge_edges(self, first, second)
+
+    def compact(
+        self, tolerance: float = 0.5, max_length_error: float = 0.001, contract: bool = True
+    ) -> "CompactionReport":
+        """Simplifies the geometry of all Edges and contracts chains of Nodes with two neighbours.
+
+        See yaramo.compaction.compact for the parameters.
+        """
+
+        from yaramo.compaction import compact
+
+        return compact(
+            self, tolerance=tolerance, max_length_error=max_length_error, contract=contract
+        )
+
+    @instrumented
+    def curvature(self) -> "CurvatureAnalysis":
+        """Returns the curvature of every vertex and the minimum radius of every Edge, see
+        yaramo.curvature (apply_speed_limits derives speed limits from it)."""
+
+        from yaramo.curvature import CurvatureAnalysis
+
+        return CurvatureAnalysis(self.edges.values())
+
+    @instrumented
+    def route_protection(
+        self, overlap_length: float = 200.0, flank_search_length: float = 1000.0
+    ) -> dict[str, "RouteProtection"]:
+        """Returns the overlap and the flank protection elements of every Route by its uuid,
+        see yaramo.protection."""
+
+        from yaramo.protection import compute_route_protection
+
+        return compute_route_protection(
+            self, overlap_length=overlap_length, flank_search_length=flank_search_length
+        )
+
+    def conflict_detector(self) -> "ConflictDetector":
+        """Returns an empty detector of conflicts between scheduled Trips, which also claim the
+        Routes of this Topology, see yaramo.timetable."""
+
+        from yaramo.timetable import ConflictDetector
+
+        return ConflictDetector(self)
+
+    def schematic_layout(
+        self,
+        default_length: Optional[float] = None,
+        turnout_angle: float = math.radians(20.0),
+        iterations: int = 200,
+        tolerance: float = 1e-3,
+    ) -> "SchematicLayout":
+        """Returns schematic coordinates for all Nodes, respecting the turnout connections, the
+        lengths of the Edges and the GeoNodes of the Nodes having one, see yaramo.layout."""
+
+        from yaramo.layout import compute_layout
+
+        return compute_layout(
+            self,
+            default_length=default_length,
+            turnout_angle=turnout_angle,
+            iterations=iterations,
+            tolerance=tolerance,
+        )
+
+    @instrumented
+    def fingerprint(self) -> "TopologyFingerprint":
+        """Returns a stable content hash of the Nodes, Edges, Signals, Routes and VacancySections.
+
+        The returned TopologyFingerprint can be kept and updated per changed element,
+        see yaramo.fingerprint.
+        """
+
+        from yaramo.fingerprint import TopologyFingerprint
+
+        return TopologyFingerprint(self)
+
+    @instrumented
+    def diff(
+        self, other: "Topology", match_geometry: bool = False, tolerance: float = 0.01
+    ) -> "TopologyDiff":
+        """Returns the added, removed and changed elements of other compared to this Topology.
+
+        See yaramo.diff.diff_topologies for the parameters.
+        """
+
+        from yaramo.diff import diff_topologies
+
+        return diff_topologies(self, other, match_geometry=match_geometry, tolerance=tolerance)
+
+    @instrumented
+    def to_arrow(self, directory: str | os.PathLike, format: str = "parquet") -> dict[str, str]:
+        """Writes the Nodes, Edges, Signals and Routes as Parquet or Arrow IPC files into
+        directory, see yaramo.export.write_arrow (requires pyarrow)."""
+
+        from yaramo.export import write_arrow
+
+        return write_arrow(self, directory, format=format)
+
+    @instrumented
+    def to_geojson(self, file: str | os.PathLike | TextIO):
+        """Writes all elements as line-delimited GeoJSON features, see yaramo.export."""
+
+        from yaramo.export import write_geojson
+
+        write_geojson(self, file)
+
+    @instrumented
+    def to_sqlite(self, path: str | os.PathLike):
+        """Saves the Topology in an SQLite file, which can be loaded partially, see
+        yaramo.storage."""
+
+        from yaramo.storage import TopologyStore
+
+        with TopologyStore(path) as store:
+            store.save(self)
+
+    def fork(self) -> "TopologyFork":
+        """Returns a copy-on-write variant of the Topology, which shares all elements with it
+        until they are copied with fork.edit. Analyses following the references between
+        elements (signal_distances, lookahead, route_protection, ...) are not supported on
+        forks and raise a NotImplementedError, see yaramo.fork."""
+
+        from yaramo.fork import TopologyFork
+
+        return TopologyFork(self)
+
+    @instrumented
+    def freeze(self, shared: bool = True) -> "FrozenTopology":
+        """Returns an immutable, array-backed snapshot of the Topology.
+
+        Parameters
+        ----------
+        shared: bool
+            Whether the snapshot is placed in shared memory, so that other processes can attach
+            to it without copying (default is True)
+        """
+
+        from yaramo.frozen_topology import FrozenTopology
+
+        return FrozenTopology.from_topology(self, shared=shared)
+
+    @instrumented
     def to_serializable(self):
         """See the description in the BaseElement class.
 
@@ -74,7 +483,7 @@ class Topology(BaseElement):
             for item in items:
                 reference, serialized = item.to_serializable()
                 _list.append(reference)
-                objects = {**objects, **serialized}
+                objects.update(serialized)
 
         return {
             "nodes": nodes,
@@ -85,6 +494,7 @@ class Topology(BaseElement):
             "vacany_sections": vacancy_sections,
         }, {}
 
+    @instrumented
     @classmethod
     def from_json(cls, json_str: str):
         obj = json.loads(json_str)
@@ -102,6 +512,8 @@ class Topology(BaseElement):
                 )
                 node_obj.geo_node = geo_node_obj
 
+        for vacancy_section in obj.get("vacany_sections", []):
+            topology.add_vacancy_section(VacancySection(**vacancy_section))
         for signal in obj["signals"]:
             topology.add_signal(Signal(**signal))
         for edge in obj["edges"]:
@@ -120,6 +532,9 @@ class Topology(BaseElement):
                         **edge,
                         "node_a": node_a,
                         "node_b": node_b,
+                        "vacancy_section": topology.vacancy_sections.get(
+                            edge.get("vacancy_section")
+                        ),
                         "signals": [
                             topology.signals[signal_uuid] for signal_uuid in edge["signals"]
                         ],
@@ -138,3 +553,36 @@ class Topology(BaseElement):
         for signal in obj["signals"]:
             topology.signals[signal["uuid"]].edge = topology.edges[signal["edge"]]
         return topology
+
+    @classmethod
+    async def aload(cls, path: str | os.PathLike, executor: Optional["Executor"] = None):
+        """Loads a Topology from a JSON file without blocking the event loop.
+
+        Reading and parsing run in the executor (default is the event loop's default executor).
+        """
+
+        from yaramo import aio
+
+        return await aio.load(path, executor=executor, topology_class=cls)
+
+    async def asave(self, path: str | os.PathLike, executor: Optional["Executor"] = None):
+        """Atomically saves the Topology as a JSON file without blocking the event loop."""
+
+        from yaramo import aio
+
+        await aio.save(self, path, executor=executor)
+
+    @classmethod
+    async def aload_stream(cls, stream, executor: Optional["Executor"] = None):
+        """Loads a Topology from an async byte stream (see yaramo.aio.load_stream)."""
+
+        from yaramo import aio
+
+        return await aio.load_stream(stream, executor=executor, topology_class=cls)
+
+    async def asave_stream(self, stream, executor: Optional["Executor"] = None):
+        """Writes the Topology in chunks to an async byte stream (see yaramo.aio.save_stream)."""
+
+        from yaramo import aio
+
+        await aio.save_stream(self, stream, executor=executor)